@@ -1,8 +1,11 @@
-from django.contrib import admin
-from .models import LottoRound, Purchase, SalesPerformance
+import re
 
-# 1. utils.py 파일에서 당첨 판별 함수 가져오기
-from lotto.utils import determine_lotto_rank 
+from django.contrib import admin, messages
+from .models import LottoRound, Purchase, SalesPerformance, DrawRun, UserStats
+from .search import parse_numbers, validate_query
+
+# 관리자 번호 검색어: 'n:7,13,42' 또는 'n4:1,2,3,4,5,6'
+NUMBER_SEARCH_PATTERN = re.compile(r'^n(\d)?:(.+)$', re.IGNORECASE)
 
 # --- LottoRound 모델 ---
 @admin.register(LottoRound)
@@ -17,6 +20,79 @@ class LottoRoundAdmin(admin.ModelAdmin):
         return ", ".join(map(str, obj.get_winning_numbers()))
     get_winning_numbers_display.short_description = "당첨 번호"
 
+# --- Purchase 목록 필터 ---
+class WinningRankFilter(admin.SimpleListFilter):
+    """저장된 당첨 등수(rank) 컬럼으로 DB에서 바로 거르는 필터 (예: N회차 1·2등 티켓)"""
+    title = "당첨 등수"
+    parameter_name = 'rank'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('win', "당첨 전체 (1~5등)"),
+            ('1,2', "1·2등"),
+            ('1', "1등"),
+            ('2', "2등"),
+            ('3', "3등"),
+            ('4', "4등"),
+            ('5', "5등"),
+            ('0', "낙첨"),
+            ('pending', "추첨 전"),
+        )
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value == 'win':
+            return queryset.filter(rank__gte=1)
+        if value == 'pending':
+            return queryset.filter(rank__isnull=True)
+        if value:
+            ranks = [int(rank) for rank in value.split(',') if rank.strip().isdigit()]
+            return queryset.filter(rank__in=ranks)
+        return queryset
+
+
+def parse_round_range(value):
+    """'1200' 또는 '1190-1200' 형태의 입력을 (시작 회차, 끝 회차)로 변환합니다. 잘못된 입력은 None"""
+    first, _, last = (value or '').replace(' ', '').partition('-')
+    if not first.isdigit() or (last and not last.isdigit()):
+        return None
+    first, last = int(first), int(last or first)
+    return min(first, last), max(first, last)
+
+
+class RoundNumberFilter(admin.SimpleListFilter):
+    """
+    회차 번호(또는 범위)를 직접 입력하는 필터.
+    회차마다 선택지를 만드는 기본 FK 필터와 달리 회차 수와 관계없이 추가 쿼리가 없습니다.
+    """
+    title = "회차"
+    parameter_name = 'round_no'
+    template = 'admin/lotto/round_number_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        bounds = parse_round_range(self.value())
+        if bounds is None:
+            return queryset
+        return queryset.filter(round__round__range=bounds)
+
+    def choices(self, changelist):
+        # 입력 폼 하나만 그리며, 다른 필터/정렬/검색 조건은 hidden 값으로 유지합니다.
+        yield {
+            'value': self.value() or '',
+            'hidden_params': [
+                (key, value) for key, value in changelist.params.items()
+                if key != self.parameter_name
+            ],
+            'clear_query_string': changelist.get_query_string(remove=[self.parameter_name]),
+        }
+
+
 # --- Purchase 모델 (핵심 수정 부분) ---
 @admin.register(Purchase)
 class PurchaseAdmin(admin.ModelAdmin):
@@ -31,9 +107,40 @@ class PurchaseAdmin(admin.ModelAdmin):
         'purchase_date',
     )
     
-    list_filter = ('lotto_type', 'round', 'purchase_date')
+    # 회차는 입력형 필터로, 당첨 등수는 저장된 rank 컬럼으로 거릅니다.
+    list_filter = (RoundNumberFilter, WinningRankFilter, 'lotto_type', 'purchase_date')
     search_fields = ('user__username', 'round__round') # 사용자 이름 및 회차 번호 검색
-    ordering = ('-purchase_date',)
+    search_help_text = (
+        "사용자 이름/회차 검색. 번호 검색: 'n:7,13,42'(모두 포함), "
+        "'n4:1,2,3,4,5,6'(4개 이상 포함)"
+    )
+    # 사용자와 회차를 목록 쿼리 하나에서 JOIN으로 읽어 행마다 추가 쿼리가 나가지 않게 합니다.
+    list_select_related = ('user', 'round')
+    # 구매 id 순서는 구매 시각 순서와 같으므로, 기본 키 인덱스로 정렬하여 전체 정렬을 피합니다.
+    ordering = ('-id',)
+    # 필터 없는 전체 건수 COUNT(*)를 따로 실행하지 않습니다.
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        'n:번호들' 또는 'nK:번호들' 형태의 검색어는 번호 부분집합 검색으로 처리합니다.
+        number_mask 비트 연산으로 DB에서 거르며, 회차/등수 필터와 함께 쓸 수 있습니다.
+        """
+        number_search = NUMBER_SEARCH_PATTERN.match(search_term.strip())
+        if not number_search:
+            return super().get_search_results(request, queryset, search_term)
+
+        min_matches, numbers = number_search.groups()
+        try:
+            numbers, min_matches = validate_query(
+                parse_numbers(numbers), int(min_matches) if min_matches else None,
+            )
+        except ValueError as error:
+            self.message_user(request, f"번호 검색 조건이 잘못되었습니다: {error}", level=messages.WARNING)
+            return queryset.none(), False
+        if min_matches == len(numbers):
+            return queryset.containing_numbers(numbers), False
+        return queryset.overlapping_numbers(numbers, min_matches), False
 
     def get_purchased_numbers_display(self, obj):
         """구매 번호를 보기 쉽게 표시"""
@@ -42,35 +149,57 @@ class PurchaseAdmin(admin.ModelAdmin):
 
     def get_winning_rank_display(self, obj):
         """
-        [핵심 로직] determine_lotto_rank 함수를 사용하여 당첨 등수를 계산하고 반환합니다.
+        [핵심 로직] 추첨 시점에 저장된 당첨 등수(rank)를 문자열로 반환합니다.
         """
-        # 1. 해당 구매 회차의 당첨 번호 정보(LottoRound)가 존재하는지 확인
-        if obj.round and obj.round.num1 and obj.round.bonus_number:
-            # 당첨 번호 리스트 (6개)
-            winning_numbers = obj.round.get_winning_numbers()
-            # 보너스 번호
-            bonus_number = obj.round.bonus_number
-            # 구매 번호 리스트 (6개)
-            purchased_numbers = obj.get_purchased_numbers()
-            
-            # 2. 당첨 등수 판별 함수 호출
-            rank = determine_lotto_rank(purchased_numbers, winning_numbers, bonus_number)
-            
-            # 3. 등수에 따라 표시할 문자열 반환
-            if rank == 0:
-                return "낙첨 (0)"
-            elif 1 <= rank <= 5:
-                return f"✅ {rank}등 당첨"
-            else:
-                return "오류"
-        
-        # 당첨 번호 정보가 아직 입력되지 않은 경우
-        return "추첨 전"
+        # 회차가 삭제된 구매(round = NULL)는 등수를 판단할 수 없습니다.
+        if obj.round is None:
+            return "-"
+        rank = obj.rank
+
+        # 아직 추첨(당첨 결과 저장)이 되지 않은 경우
+        if rank is None:
+            # 회차는 select_related로 함께 읽었으므로 추가 쿼리가 없습니다.
+            if obj.round.winning_mask is not None:
+                return "집계 중"
+            return "추첨 전"
+        # 등수에 따라 표시할 문자열 반환
+        if rank == 0:
+            return "낙첨 (0)"
+        elif 1 <= rank <= 5:
+            return f"✅ {rank}등 당첨"
+        return "오류"
 
     get_winning_rank_display.short_description = "당첨 등수"
+    get_winning_rank_display.admin_order_field = 'rank'
 
 # --- SalesPerformance 모델 ---
 @admin.register(SalesPerformance)
 class SalesPerformanceAdmin(admin.ModelAdmin):
-    list_display = ('round', 'total_sales', 'total_winners', 'rank1_winners', 'rank2_winners', 'rank3_winners')
-    ordering = ('-round__round',)
\ No newline at end of file
+    list_display = (
+        'round', 'total_sales', 'total_winners',
+        'rank1_winners', 'rank2_winners', 'rank3_winners', 'rank4_winners', 'rank5_winners',
+        'prize_pool', 'rank1_prize', 'total_payout', 'carryover_out',
+    )
+    list_select_related = ('round',)
+    ordering = ('-round__round',)
+
+# --- UserStats 모델 ---
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        'user', 'tickets', 'spend',
+        'rank1_wins', 'rank2_wins', 'rank3_wins', 'rank4_wins', 'rank5_wins',
+        'prize_won', 'updated_at',
+    )
+    list_select_related = ('user',)
+    search_fields = ('user__username',)
+    ordering = ('-prize_won',)
+
+# --- DrawRun 모델 ---
+@admin.register(DrawRun)
+class DrawRunAdmin(admin.ModelAdmin):
+    list_display = ('round', 'state', 'phase', 'processed_tickets', 'total_tickets', 'created_at', 'finished_at')
+    list_filter = ('state',)
+    list_select_related = ('round',)
+    ordering = ('-created_at',)
+    readonly_fields = [field.name for field in DrawRun._meta.fields]
\ No newline at end of file
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class LottoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lotto'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+
+        from .db import configure_sqlite_connection
+        from .models import LottoRound
+        from .round_cache import invalidate_on_round_change
+
+        # SQLite 연결이 만들어질 때마다 WAL/busy_timeout 등 운영용 PRAGMA를 적용합니다.
+        connection_created.connect(configure_sqlite_connection, dispatch_uid='lotto_sqlite_tuning')
+
+        # 회차가 만들어지거나 추첨되면 회차 상태 캐시를 무효화합니다.
+        post_save.connect(invalidate_on_round_change, sender=LottoRound, dispatch_uid='lotto_round_cache_save')
+        post_delete.connect(invalidate_on_round_change, sender=LottoRound, dispatch_uid='lotto_round_cache_delete')
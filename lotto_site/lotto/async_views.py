@@ -0,0 +1,102 @@
+# lotto/async_views.py
+"""
+요청이 많은 사용자 뷰(메인, 구매, 당첨 확인)의 비동기 버전.
+
+ASGI 서버(uvicorn, daphne 등)에서 실행하면 DB를 기다리는 동안 요청이 스레드를 붙잡지 않도록
+비동기 ORM(afirst, async for)과 request.auser()를 사용합니다.
+settings.LOTTO_ASYNC_VIEWS = True일 때 lotto/urls.py가 같은 URL 이름으로 이 뷰들을 연결합니다.
+(WSGI에서도 동작하지만 요청마다 이벤트 루프를 거치므로 동기 뷰보다 느립니다)
+
+  - 템플릿이 request.user를 지연 평가하며 DB를 조회하지 않도록, 뷰 시작 시 await request.auser()로 확정합니다.
+  - 템플릿에 넘기는 모델은 모두 미리 조회하고, 관련 객체는 select_related로 함께 가져옵니다.
+  - 구매 저장은 트랜잭션(transaction.atomic)이 필요하므로 비동기 ORM 대신 sync_to_async로 기존 함수를 호출합니다.
+    (Django ORM은 비동기 트랜잭션을 지원하지 않음)
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+
+from . import round_cache
+from .forms import BulkPurchaseForm, ManualPurchaseForm
+from .pagination import akeyset_page
+from .sales import RoundClosedError, purchase_tickets
+from .user_stats import aget_user_stats
+from .views import filter_winnings, winnings_context
+
+
+async def _resolve_user(request):
+    """요청의 사용자를 비동기로 확정하여 request.user에 넣고 반환합니다."""
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+async def lotto_home(request):
+    """메인 페이지 뷰 (비동기)"""
+    user = await _resolve_user(request)
+    if user.is_authenticated:
+        message = f"안녕하세요, {user.username}님! 로또 구매를 시작하려면 메뉴를 이용하세요."
+        user_stats = await aget_user_stats(user)
+    else:
+        message = '로또 서비스를 이용하려면 로그인해 주세요.'
+        user_stats = None
+
+    return render(request, 'lotto/index.html', {
+        'message': message,
+        'latest_drawn_round': await round_cache.aget_latest_drawn_round(),
+        'user_stats': user_stats,
+    })
+
+
+@login_required
+async def lotto_purchase(request):
+    """로또 구매 (수동/자동) 처리 뷰 (비동기)"""
+    user = await _resolve_user(request)
+    current_round = await round_cache.aget_current_round()
+    if not current_round:
+        messages.error(request, "현재 구매 가능한 로또 회차가 없습니다. 관리자에게 문의하세요.")
+        return redirect('lotto_home')
+
+    form = ManualPurchaseForm()
+    if request.method == 'POST':
+        if 'manual_purchase' in request.POST:
+            form = ManualPurchaseForm(request.POST)
+            if form.is_valid():
+                sorted_numbers = sorted(form.cleaned_data[f'p_num{index}'] for index in range(1, 7))
+                try:
+                    await sync_to_async(purchase_tickets)(user, current_round, manual_rows=[sorted_numbers])
+                except (RoundClosedError, TimeoutError) as error:
+                    messages.error(request, str(error))
+                    return redirect('lotto_purchase')
+                messages.success(request, f"로또 (수동) 구매가 완료되었습니다. 번호: {sorted_numbers}")
+                return redirect('lotto_purchase')
+
+        elif 'auto_purchase' in request.POST:
+            try:
+                purchases = await sync_to_async(purchase_tickets)(user, current_round, auto_count=1)
+            except (RoundClosedError, TimeoutError) as error:
+                messages.error(request, str(error))
+                return redirect('lotto_purchase')
+            messages.success(
+                request, f"로또 (자동) 구매가 완료되었습니다. 번호: {purchases[0].get_purchased_numbers()}",
+            )
+            return redirect('lotto_purchase')
+
+    return render(request, 'lotto/purchase.html', {
+        'form': form,
+        'bulk_form': BulkPurchaseForm(),
+        'current_round': current_round,
+    })
+
+
+@login_required
+async def check_winnings(request):
+    """구매 내역과 당첨 결과 뷰 (비동기). 필터와 페이지 규칙은 동기 뷰(views.check_winnings)와 같습니다."""
+    user = await _resolve_user(request)
+    purchases, round_filter, rank_filter = filter_winnings(request, user)
+    page, next_cursor = await akeyset_page(purchases, request.GET.get('after'))
+    context = winnings_context(
+        request, page, next_cursor, round_filter, rank_filter, await aget_user_stats(user),
+    )
+    return render(request, 'lotto/winnings.html', context)
@@ -0,0 +1,170 @@
+# lotto/benchmarking.py
+"""
+벤치마크용 관리 명령어(bench_*)와 가상 데이터 생성 명령어(seed_lotto_data)가 함께 사용하는 도구 모음.
+
+벤치마크는 운영 DB를 건드리지 않도록 scratch_database()로 만든 임시 DB에서 실행합니다.
+"""
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from .combination import combination_ranks
+from .draw import finalize_round
+from .models import LottoRound, Purchase
+from .rank_engine import masks_from_rows
+from .sales import ensure_counter_shards, generate_auto_number_rows, record_sale
+from .user_stats import rebuild_user_stats
+
+# 가상 구매 기록을 한 번에 INSERT하는 행 수
+SEED_BATCH_SIZE = 50_000
+
+
+@contextmanager
+def scratch_database(name=None, verbosity=0):
+    """
+    마이그레이션이 적용된 임시 테스트 DB를 만들고, 블록이 끝나면 삭제합니다.
+    SQLite에서 name을 지정하면 메모리 대신 해당 파일에 DB를 만듭니다.
+    """
+    if name:
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = str(name)
+    old_config = setup_databases(verbosity=verbosity, interactive=False, aliases={'default'})
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=verbosity)
+
+
+def seed_purchases(lotto_round, user, count, rng, lotto_type='A'):
+    """사용자 한 명의 구매 count건을 seed_round_purchases로 채웁니다. (lotto_type 'M'이면 모두 수동)"""
+    seed_round_purchases(lotto_round, [user.pk], count, rng, manual_ratio=1.0 if lotto_type == 'M' else 0.0)
+
+
+def seed_round_purchases(lotto_round, user_ids, count, rng, manual_ratio=0.0, user_weights=None):
+    """
+    회차에 가상 구매 기록 count건을 여러 사용자에게 나누어 원시 INSERT로 채우고 판매 카운터도 함께 올립니다.
+
+    :param user_ids: 구매자 기본 키 목록
+    :param manual_ratio: 수동 구매 비율 (0~1)
+    :param user_weights: 사용자별 구매 확률 (생략하면 균등)
+    """
+    opts = Purchase._meta
+    quote = connection.ops.quote_name
+    columns = [
+        opts.get_field(name).column
+        for name in ('user', 'round', 'lotto_type', 'purchase_date',
+                     'p_num1', 'p_num2', 'p_num3', 'p_num4', 'p_num5', 'p_num6', 'number_mask', 'combination')
+    ]
+    sql = (
+        f"INSERT INTO {quote(opts.db_table)} ({', '.join(quote(column) for column in columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    purchase_date = connection.ops.adapt_datetimefield_value(timezone.now())
+    user_ids = np.asarray(user_ids)
+
+    for start in range(0, count, SEED_BATCH_SIZE):
+        size = min(SEED_BATCH_SIZE, count - start)
+        rows = generate_auto_number_rows(size, rng)
+        masks = masks_from_rows(rows)
+        combinations = combination_ranks(rows)
+        buyers = rng.choice(user_ids, size=size, p=user_weights)
+        manual = rng.random(size) < manual_ratio
+        params = [
+            (buyer, lotto_round.pk, 'M' if is_manual else 'A', purchase_date, *row, mask, combination)
+            for buyer, is_manual, row, mask, combination in zip(
+                buyers.tolist(), manual.tolist(), rows.tolist(), masks.tolist(), combinations.tolist(),
+            )
+        ]
+        manual_count = int(manual.sum())
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+            record_sale(lotto_round, auto=size - manual_count, manual=manual_count)
+
+
+def seed_users(count, prefix='seed_user'):
+    """
+    로그인할 수 없는 가상 사용자 count명을 bulk_create로 만들고 기본 키 목록을 반환합니다.
+    이미 같은 이름의 사용자가 있으면 이어지는 번호로 만듭니다.
+    """
+    start = User.objects.filter(username__startswith=f'{prefix}_').count()
+    password = make_password(None)
+    users = User.objects.bulk_create(
+        [User(username=f'{prefix}_{index:07d}', password=password) for index in range(start, start + count)],
+        batch_size=SEED_BATCH_SIZE,
+    )
+    if users and users[0].pk is None:
+        # 기본 키를 돌려주지 않는 DB 백엔드
+        return list(
+            User.objects.filter(username__startswith=f'{prefix}_').order_by('pk').values_list('pk', flat=True)
+        )[start:]
+    return [user.pk for user in users]
+
+
+def zipf_weights(count, skew):
+    """
+    앞 순서의 사용자일수록 많이 구매하는 지프(Zipf) 분포의 사용자별 구매 확률.
+    skew가 0이면 균등 분포입니다.
+    """
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    return weights / weights.sum()
+
+
+def seed_dataset(users, rounds, purchases, rng, manual_ratio=0.2, skew=1.0, finalize=True, on_round=None):
+    """
+    가상 사용자 users명과 회차 rounds개를 만들고, 구매 purchases건을 회차마다 나누어 채웁니다.
+    마지막 회차는 판매 중으로 남기고, finalize가 True이면 나머지 회차는 추첨 작업까지 실행합니다.
+    사용자 누적 통계는 마지막에 구매 기록으로부터 다시 만듭니다.
+
+    :param on_round: 회차 하나를 채울 때마다 호출할 함수 (lotto_round, 채운 장수)
+    :return: {'user_ids', 'rounds', 'open_round', 'heavy_user_id', 'light_user_id'}
+    """
+    user_ids = seed_users(users)
+    weights = zipf_weights(len(user_ids), skew)
+    last_round = LottoRound.objects.aggregate(last=Max('round'))['last'] or 0
+
+    created_rounds = []
+    per_round, remainder = divmod(purchases, rounds)
+    for index in range(rounds):
+        lotto_round = LottoRound.objects.create(round=last_round + index + 1)
+        ensure_counter_shards(lotto_round)
+        count = per_round + (1 if index < remainder else 0)
+        seed_round_purchases(lotto_round, user_ids, count, rng, manual_ratio=manual_ratio, user_weights=weights)
+        if finalize and index < rounds - 1:
+            finalize_round(lotto_round)
+        created_rounds.append(lotto_round)
+        if on_round is not None:
+            on_round(lotto_round, count)
+
+    rebuild_user_stats()
+    return {
+        'user_ids': user_ids,
+        'rounds': created_rounds,
+        'open_round': created_rounds[-1] if created_rounds else None,
+        'heavy_user_id': user_ids[0],
+        'light_user_id': user_ids[-1],
+    }
+
+
+def measure(func, *args, trace_memory=True, **kwargs):
+    """
+    func를 실행하고 (반환값, 경과 초, Python 힙 최대 사용량 바이트)를 반환합니다.
+    trace_memory가 False이면 tracemalloc 오버헤드 없이 시간만 측정합니다(최대 사용량은 None).
+    """
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return result, elapsed, peak
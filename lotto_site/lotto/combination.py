@@ -0,0 +1,87 @@
+# lotto/combination.py
+"""
+6/45 로또 번호 조합을 0 이상 8,145,060 미만의 정수 하나(조합 번호)로 변환하는 모듈.
+
+오름차순 번호 c1 < c2 < ... < c6에 대해 조합 번호는 C(c1-1, 1) + C(c2-1, 2) + ... + C(c6-1, 6)입니다.
+(조합 수 체계의 colex 순위) 같은 번호 조합은 항상 같은 정수가 되므로,
+"이 조합을 가진 티켓이 몇 장인가"를 인덱스가 걸린 정수 컬럼 하나의 일치 검색으로 답할 수 있습니다.
+"""
+from math import comb
+
+import numpy as np
+
+NUMBER_COUNT = 45
+PICK_COUNT = 6
+
+# 가능한 조합의 수: C(45, 6) = 8,145,060
+COMBINATION_COUNT = comb(NUMBER_COUNT, PICK_COUNT)
+
+# _BINOMIAL[n, k] = C(n, k) (0 <= n <= 45, 0 <= k <= 6)
+_BINOMIAL = np.array(
+    [[comb(n, k) for k in range(PICK_COUNT + 1)] for n in range(NUMBER_COUNT + 1)],
+    dtype=np.int64,
+)
+
+
+def combination_rank(numbers):
+    """
+    번호 6개를 조합 번호로 변환합니다.
+
+    :param numbers: 1~45 사이의 서로 다른 번호 6개 (순서 무관)
+    :return: 0 이상 COMBINATION_COUNT 미만의 정수
+    """
+    return sum(comb(number - 1, index) for index, number in enumerate(sorted(numbers), start=1))
+
+
+def combination_ranks(rows):
+    """
+    (N, 6) 번호 배열 전체를 한 번의 벡터 연산으로 조합 번호 배열로 변환합니다.
+
+    :param rows: 6개 번호로 이루어진 행의 시퀀스 또는 (N, 6) 배열 (행 안의 순서 무관)
+    :return: 길이 N의 numpy.int64 배열
+    """
+    numbers = np.sort(np.asarray(rows, dtype=np.intp).reshape(-1, PICK_COUNT), axis=1)
+    return _BINOMIAL[numbers - 1, np.arange(1, PICK_COUNT + 1)].sum(axis=1)
+
+
+def subset_ranks(numbers):
+    """
+    오름차순으로 정렬된 (..., k) 번호 배열(k <= 6)의 마지막 축을 k개 조합의 순위로 변환합니다.
+    순위는 0 이상 C(45, k) 미만이며, k = 6이면 combination_ranks와 같습니다.
+
+    :param numbers: 각 행이 오름차순인 정수 배열 (정렬은 호출하는 쪽에서 보장)
+    :return: 마지막 축이 빠진 numpy.int64 배열
+    """
+    numbers = np.asarray(numbers, dtype=np.intp)
+    return _BINOMIAL[numbers - 1, np.arange(1, numbers.shape[-1] + 1)].sum(axis=-1)
+
+
+def rank_terms(rows):
+    """
+    (N, 6) 오름차순 번호 배열에서 부분집합 순위를 이루는 항 C(번호 - 1, i)를 미리 계산합니다.
+    위치 p1 < p2 < ... < pk를 고른 부분집합의 순위는 terms[1][p1] + terms[2][p2] + ... + terms[k][pk]입니다.
+
+    :return: (7, 6, N) 배열, terms[i][j] = C(rows[:, j] - 1, i) (마지막 축이 연속 메모리)
+    """
+    numbers = np.asarray(rows, dtype=np.intp).reshape(-1, PICK_COUNT)
+    return np.ascontiguousarray(_BINOMIAL[numbers - 1].transpose(2, 1, 0))
+
+
+def combination_numbers(rank):
+    """
+    조합 번호를 오름차순 번호 6개로 되돌립니다.
+
+    :param rank: 0 이상 COMBINATION_COUNT 미만의 정수
+    :return: 오름차순 정렬된 번호 리스트
+    """
+    if not 0 <= rank < COMBINATION_COUNT:
+        raise ValueError(f"조합 번호는 0 이상 {COMBINATION_COUNT} 미만이어야 합니다: {rank}")
+    numbers = []
+    for index in range(PICK_COUNT, 0, -1):
+        # C(n, index) <= rank를 만족하는 가장 큰 n을 찾으면 해당 자리의 번호는 n + 1입니다.
+        n = index - 1
+        while n + 1 < NUMBER_COUNT and comb(n + 1, index) <= rank:
+            n += 1
+        numbers.append(n + 1)
+        rank -= comb(n, index)
+    return numbers[::-1]
@@ -0,0 +1,72 @@
+# lotto/db.py
+"""
+SQLite 연결마다 운영용 PRAGMA를 적용하는 connection_created 신호 처리기.
+
+기본 SQLite 설정(롤백 저널, busy timeout 없음)에서는 구매 쓰기와 추첨 집계, 조회가 서로를 막습니다.
+  - journal_mode=WAL      : 읽기와 쓰기가 서로를 막지 않음 (쓰기는 여전히 한 번에 하나)
+  - synchronous=NORMAL    : WAL에서 커밋마다 fsync하지 않아 쓰기 비용 감소 (체크포인트 시에만 동기화)
+  - busy_timeout          : 잠금을 만나면 즉시 실패하지 않고 지정한 시간(ms)까지 기다림
+  - mmap_size, cache_size : 읽기 시 메모리 매핑과 페이지 캐시 크기
+각 값은 settings.LOTTO_SQLITE_*로 바꿀 수 있으며, LOTTO_SQLITE_TUNING = False이면 적용하지 않습니다.
+
+journal_mode는 DB 파일 헤더에 기록되어 계속 유지되므로, 서버(WSGI/ASGI 또는 runserver)로 실행할 때만 바꿉니다.
+migrate, shell 같은 다른 관리 명령어가 저장소에 들어 있는 개발용 db.sqlite3를 WAL 모드로 바꿔 놓지 않도록 하기 위함입니다.
+"""
+import os
+import sys
+
+from django.conf import settings
+
+# settings.LOTTO_SQLITE_*로 변경할 수 있습니다.
+DEFAULT_JOURNAL_MODE = 'WAL'
+DEFAULT_SYNCHRONOUS = 'NORMAL'
+DEFAULT_BUSY_TIMEOUT = 5000
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_CACHE_SIZE = -64000
+# journal_mode를 적용하는 관리 명령어 (manage.py 없이 서버로 실행할 때는 항상 적용)
+DEFAULT_JOURNAL_MODE_COMMANDS = ('runserver',)
+
+MANAGE_SCRIPTS = ('manage.py', 'django-admin', '__main__.py')
+
+
+def sqlite_tuning_enabled():
+    """SQLite 연결 튜닝을 적용할지 여부를 반환합니다."""
+    return getattr(settings, 'LOTTO_SQLITE_TUNING', True)
+
+
+def get_management_command(argv=None):
+    """manage.py로 실행 중이면 관리 명령어 이름을, 서버 프로세스(WSGI/ASGI 등)이면 None을 반환합니다."""
+    argv = sys.argv if argv is None else argv
+    if not argv or os.path.basename(argv[0]) not in MANAGE_SCRIPTS:
+        return None
+    return argv[1] if len(argv) > 1 else ''
+
+
+def journal_mode_enabled(argv=None):
+    """이 프로세스에서 journal_mode를 바꿀지 여부를 반환합니다."""
+    command = get_management_command(argv)
+    return command is None or command in getattr(
+        settings, 'LOTTO_SQLITE_JOURNAL_MODE_COMMANDS', DEFAULT_JOURNAL_MODE_COMMANDS,
+    )
+
+
+def get_sqlite_pragmas(argv=None):
+    """연결마다 실행할 (PRAGMA 이름, 값) 목록을 설정에서 읽어 반환합니다."""
+    journal_mode = getattr(settings, 'LOTTO_SQLITE_JOURNAL_MODE', DEFAULT_JOURNAL_MODE)
+    return [
+        ('journal_mode', journal_mode if journal_mode_enabled(argv) else None),
+        ('synchronous', getattr(settings, 'LOTTO_SQLITE_SYNCHRONOUS', DEFAULT_SYNCHRONOUS)),
+        ('busy_timeout', int(getattr(settings, 'LOTTO_SQLITE_BUSY_TIMEOUT', DEFAULT_BUSY_TIMEOUT))),
+        ('mmap_size', int(getattr(settings, 'LOTTO_SQLITE_MMAP_SIZE', DEFAULT_MMAP_SIZE))),
+        ('cache_size', int(getattr(settings, 'LOTTO_SQLITE_CACHE_SIZE', DEFAULT_CACHE_SIZE))),
+    ]
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """새 SQLite 연결에 운영용 PRAGMA를 적용합니다. (다른 DB 백엔드는 건너뜀)"""
+    if connection.vendor != 'sqlite' or not sqlite_tuning_enabled():
+        return
+    with connection.cursor() as cursor:
+        for name, value in get_sqlite_pragmas():
+            if value is not None:
+                cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,359 @@
+# lotto/draw.py
+"""
+회차 추첨과 당첨 결과 집계를 처리하는 모듈.
+
+추첨은 DrawRun 기록을 가진 작업으로 실행됩니다.
+  1. draw   : 당첨 번호를 뽑아 LottoRound에 저장
+  2. rank   : 구매 기록을 기본 키 범위 단위(청크)로 나누어 번호 마스크 컬럼만 읽고,
+              청크마다 rank_engine으로 등수를 판정한 뒤 구매별 결과, 작업 카운터,
+              마지막 처리 구매 id를 같은 트랜잭션에 저장
+  3. finish : 작업 카운터(1~5등 당첨 장수)로 SalesPerformance와 당첨금 정산을 만들고 작업을 완료 처리
+세부 단계별 시간/처리 행 수/최대 메모리는 DrawRun.profile에 기록됩니다. (draw_profile.py)
+각 단계의 전환과 청크 저장이 원자적이므로, 중단된 작업을 다시 실행해도 중복 집계되지 않습니다.
+오래 멈춘 작업을 다른 실행자가 가져가면 작업의 실행자 토큰(DrawRun.owner)이 바뀌며, 진행 기록은
+토큰과 마지막 처리 구매 id가 일치할 때만 조건부 UPDATE로 저장하므로 멈춰 있던 이전 실행자는
+다음 저장에서 멈춥니다. (DrawRunLost)
+한 번에 메모리에 올라가는 구매 기록은 청크 하나뿐이므로 회차 규모와 관계없이 메모리 사용량이 일정합니다.
+"""
+import logging
+import random
+import threading
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .draw_profile import DrawProfiler, draw_profiling_enabled
+from .models import (
+    TICKET_PRICE, DrawRun, LottoRound, Purchase, SalesPerformance, get_stale_after, match_count_expression,
+)
+from .prizes import compute_payouts
+from .rank_engine import count_ranks, rank_masks
+from .sales import get_round_sales
+from .simulation import build_ticket_tables, simulate_draws, summarize
+from .user_stats import apply_round_results
+
+# settings.LOTTO_FINALIZE_CHUNK_SIZE로 변경할 수 있습니다.
+# SQLite의 바인딩 변수 제한(기본 32766개) 안에서 pk__in 갱신이 가능하도록 작게 유지합니다.
+DEFAULT_CHUNK_SIZE = 5000
+
+# 시뮬레이션용 티켓 스냅숏을 읽을 때 한 번에 가져오는 구매 수 (읽기만 하므로 추첨 청크보다 크게 잡음)
+SNAPSHOT_CHUNK_SIZE = 50_000
+
+# 판정 단계의 청크마다 저장하는 작업 진행 필드
+RANK_PROGRESS_FIELDS = [
+    'rank1_count', 'rank2_count', 'rank3_count', 'rank4_count', 'rank5_count',
+    'processed_tickets', 'total_tickets', 'last_processed_id', 'heartbeat_at', 'phase_timings', 'profile',
+]
+
+logger = logging.getLogger(__name__)
+
+
+class DrawRunLost(Exception):
+    """다른 실행자가 작업을 가져가서 현재 실행자가 더 이상 진행 기록을 저장할 수 없는 경우"""
+
+
+def get_chunk_size():
+    """설정된 청크 크기를 반환합니다."""
+    return getattr(settings, 'LOTTO_FINALIZE_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def draw_winning_numbers():
+    """1~45 중 중복 없이 7개를 뽑아 (정렬된 당첨 번호 6개, 보너스 번호)를 반환합니다."""
+    drawn = random.sample(range(1, 46), 7)
+    return sorted(drawn[:6]), drawn[6]
+
+
+def iter_purchase_chunks(lotto_round, chunk_size, after_pk=0):
+    """
+    회차의 구매 기록을 기본 키 순서로 chunk_size개씩 읽어 (pk 배열, 번호 마스크 배열)을 돌려줍니다.
+    모델 인스턴스를 만들지 않고 두 컬럼만 가져오며, 다음 청크는 마지막 pk 이후부터 조회합니다.
+    """
+    purchases = Purchase.objects.filter(round=lotto_round).order_by('pk')
+    while True:
+        rows = list(purchases.filter(pk__gt=after_pk).values_list('pk', 'number_mask')[:chunk_size])
+        if not rows:
+            return
+        chunk = np.array(rows, dtype=np.int64)
+        yield chunk[:, 0], chunk[:, 1].astype(np.uint64)
+        after_pk = int(chunk[-1, 0])
+
+
+def write_chunk_results(lotto_round, pks, ranks):
+    """
+    청크의 판정 결과를 저장합니다.
+    먼저 청크의 기본 키 범위 전체를 낙첨(rank=0)으로 저장하면서 일치 개수는 SQL 비트 연산으로 함께 기록하고,
+    그다음 소수인 당첨 구매만 등수별 UPDATE로 덮어씁니다. 청크당 UPDATE 문은 최대 6개입니다.
+    """
+    Purchase.objects.filter(round=lotto_round, pk__range=(int(pks[0]), int(pks[-1]))).update(
+        match_count=match_count_expression(lotto_round.get_winning_numbers()),
+        rank=0,
+    )
+    for rank in np.unique(ranks[ranks > 0]):
+        Purchase.objects.filter(pk__in=pks[ranks == rank].tolist()).update(rank=int(rank))
+
+
+def start_draw_run(lotto_round):
+    """
+    회차의 추첨 작업 기록을 만들거나, 이미 있으면 그 기록을 반환합니다.
+    실패한 작업은 대기 상태로 되돌려 다시 실행될 수 있게 합니다.
+
+    :return: (DrawRun, 새로 만들었는지 여부)
+    """
+    run, created = DrawRun.objects.get_or_create(round=lotto_round)
+    if run.state == DrawRun.STATE_FAILED:
+        DrawRun.objects.filter(pk=run.pk, state=DrawRun.STATE_FAILED).update(state=DrawRun.STATE_PENDING)
+        run.refresh_from_db()
+    return run, created
+
+
+def claim_draw_run(run_pk):
+    """
+    작업을 진행 중 상태로 바꾸어 실행 권한을 얻습니다.
+    대기/실패 상태이거나, 진행 중이지만 오래 멈춰 있는 작업만 가져올 수 있습니다.
+    가져갈 때마다 새 실행자 토큰을 기록하므로, 멈춰 있던 이전 실행자의 저장은 이후 모두 무시됩니다.
+
+    :return: 실행자 토큰, 가져가지 못했으면 None
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    claimable = (
+        Q(state__in=[DrawRun.STATE_PENDING, DrawRun.STATE_FAILED])
+        | Q(state=DrawRun.STATE_RUNNING, heartbeat_at__lt=now - get_stale_after())
+    )
+    claimed = DrawRun.objects.filter(claimable, pk=run_pk).update(
+        state=DrawRun.STATE_RUNNING, heartbeat_at=now, error='', owner=token,
+    )
+    return token if claimed == 1 else None
+
+
+def _save_run(run, fields, **expected):
+    """
+    실행자 토큰(과 expected로 넘긴 값)이 DB의 작업 기록과 일치할 때만 fields를 저장합니다.
+
+    :raises DrawRunLost: 다른 실행자가 작업을 가져갔거나 진행 기록이 이미 바뀐 경우
+    """
+    updated = DrawRun.objects.filter(pk=run.pk, owner=run.owner, **expected).update(
+        **{field: getattr(run, field) for field in fields}
+    )
+    if not updated:
+        raise DrawRunLost(f"추첨 작업 #{run.pk}을 다른 실행자가 가져갔습니다.")
+
+
+def _run_draw_phase(run, profiler):
+    """1단계: 당첨 번호를 뽑아 회차에 저장합니다. (이미 추첨된 회차라면 번호는 그대로 둡니다)"""
+    started = time.perf_counter()
+    with transaction.atomic():
+        lotto_round = LottoRound.objects.select_for_update().get(pk=run.round_id)
+        if lotto_round.num1 is None:
+            with profiler.step('draw_numbers', rows=1):
+                winning_numbers, bonus_number = draw_winning_numbers()
+            with profiler.step('draw_save', rows=1):
+                (lotto_round.num1, lotto_round.num2, lotto_round.num3,
+                 lotto_round.num4, lotto_round.num5, lotto_round.num6) = winning_numbers
+                lotto_round.bonus_number = bonus_number
+                lotto_round.actual_draw_date = timezone.now()
+                lotto_round.save()
+        run.round = lotto_round
+        # 진행률 계산용 전체 장수는 COUNT(*) 대신 실시간 판매 카운터에서 읽습니다.
+        with profiler.step('sales_count'):
+            run.total_tickets = get_round_sales(lotto_round)['tickets']
+        run.phase = DrawRun.PHASE_RANK
+        run.heartbeat_at = timezone.now()
+        run.add_phase_time(DrawRun.PHASE_DRAW, time.perf_counter() - started)
+        profiler.record_memory()
+        _save_run(
+            run, ['total_tickets', 'phase', 'heartbeat_at', 'phase_timings', 'profile'], phase=DrawRun.PHASE_DRAW,
+        )
+
+
+def _run_rank_phase(run, chunk_size, profiler):
+    """2단계: 마지막 처리 구매 id 이후의 구매를 청크 단위로 판정하고 저장합니다."""
+    lotto_round = run.round
+    chunks = iter_purchase_chunks(lotto_round, chunk_size, after_pk=run.last_processed_id)
+    while True:
+        started = time.perf_counter()
+        with profiler.step('fetch'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        pks, masks = chunk
+        profiler.add_rows('fetch', len(pks))
+        with profiler.step('rank', rows=len(pks)):
+            ranks = rank_masks(masks, lotto_round.winning_mask, lotto_round.bonus_number)
+            rank_counts = count_ranks(ranks)
+        with profiler.step('write', rows=len(pks)), transaction.atomic():
+            write_chunk_results(lotto_round, pks, ranks)
+            previous_id = run.last_processed_id
+            for rank, count in rank_counts.items():
+                setattr(run, f'rank{rank}_count', getattr(run, f'rank{rank}_count') + count)
+            run.processed_tickets += len(pks)
+            run.total_tickets = max(run.total_tickets, run.processed_tickets)
+            run.last_processed_id = int(pks[-1])
+            run.heartbeat_at = timezone.now()
+            run.add_phase_time(DrawRun.PHASE_RANK, time.perf_counter() - started)
+            profiler.record_memory()
+            # 다른 실행자가 가져갔다면 저장되지 않고 청크 결과도 함께 롤백됩니다.
+            _save_run(run, RANK_PROGRESS_FIELDS, phase=DrawRun.PHASE_RANK, last_processed_id=previous_id)
+
+    run.phase = DrawRun.PHASE_FINISH
+    _save_run(run, ['phase', 'profile'], phase=DrawRun.PHASE_RANK, last_processed_id=run.last_processed_id)
+
+
+def _run_finish_phase(run, profiler):
+    """3단계: 작업 카운터로 판매 실적을 저장하고, 사용자별 누적 통계에 당첨 결과를 더한 뒤 작업을 완료 처리합니다."""
+    started = time.perf_counter()
+    with transaction.atomic():
+        # 완료 단계로의 전환(finish -> done)을 먼저 차지한 실행자만 정산과 통계 반영을 수행합니다.
+        run.state = DrawRun.STATE_DONE
+        run.phase = DrawRun.PHASE_DONE
+        run.finished_at = run.heartbeat_at = timezone.now()
+        _save_run(
+            run, ['state', 'phase', 'finished_at', 'heartbeat_at'],
+            state=DrawRun.STATE_RUNNING, phase=DrawRun.PHASE_FINISH,
+        )
+        with profiler.step('settle'):
+            performance = save_sales_performance(run.round, run.processed_tickets, run.get_rank_counts())
+            # 완료 처리와 같은 트랜잭션이므로 재실행되어도 한 번만 반영됩니다.
+            updated_users = apply_round_results(run.round, performance)
+        # 정산 단계의 처리 행 수: 판매 실적 1행 + 갱신한 사용자 통계 행
+        profiler.add_rows('settle', 1 + updated_users)
+        profiler.record_memory()
+        run.add_phase_time(DrawRun.PHASE_FINISH, time.perf_counter() - started)
+        _save_run(run, ['phase_timings', 'profile'])
+    return performance
+
+
+def save_sales_performance(lotto_round, total_sales, rank_counts):
+    """
+    등수별 당첨 장수(판정 단계에서 청크마다 누적한 값)로 판매 실적과 당첨금 정산을 저장합니다.
+    구매 테이블을 다시 읽지 않으며, 직전 회차의 이월금만 한 번 조회합니다.
+
+    :param rank_counts: {1: n1, ..., 5: n5}
+    :return: 저장된 SalesPerformance
+    """
+    carryover_in = (
+        SalesPerformance.objects.filter(round__round__lt=lotto_round.round)
+        .order_by('-round__round')
+        .values_list('carryover_out', flat=True)
+        .first()
+    ) or 0
+    revenue = total_sales * TICKET_PRICE
+    payouts = compute_payouts(revenue, rank_counts, carryover_in)
+
+    defaults = {
+        'total_sales': total_sales,
+        'total_winners': sum(rank_counts.values()),
+        'total_revenue': revenue,
+        'prize_pool': payouts['prize_pool'],
+        'carryover_in': carryover_in,
+        'carryover_out': payouts['carryover_out'],
+        'total_payout': payouts['total_payout'],
+    }
+    for rank in range(1, 6):
+        defaults[f'rank{rank}_winners'] = rank_counts[rank]
+        defaults[f'rank{rank}_prize'] = payouts['rank_prizes'][rank]
+    performance, _ = SalesPerformance.objects.update_or_create(round=lotto_round, defaults=defaults)
+    return performance
+
+
+def execute_draw_run(run_pk, chunk_size=None, profile=None):
+    """
+    추첨 작업을 실행합니다. 중단되었던 작업은 저장된 단계와 마지막 처리 구매 id부터 이어서 진행합니다.
+
+    :param profile: True이면 cProfile/tracemalloc 덤프를 남깁니다. (생략하면 settings.LOTTO_DRAW_PROFILE)
+
+    :return: 완료된 DrawRun, 다른 곳에서 실행 중이거나 이미 완료되어 실행하지 않았다면
+             (또는 실행 도중 다른 실행자가 작업을 가져갔다면) None
+    """
+    token = claim_draw_run(run_pk)
+    if token is None:
+        return None
+
+    chunk_size = chunk_size or get_chunk_size()
+    run = DrawRun.objects.select_related('round').get(pk=run_pk, owner=token)
+    profiler = DrawProfiler(run, dump=draw_profiling_enabled() if profile is None else profile)
+    profiler.start()
+    try:
+        if run.phase == DrawRun.PHASE_DRAW:
+            _run_draw_phase(run, profiler)
+        if run.phase == DrawRun.PHASE_RANK:
+            _run_rank_phase(run, chunk_size, profiler)
+        if run.phase == DrawRun.PHASE_FINISH:
+            _run_finish_phase(run, profiler)
+    except DrawRunLost:
+        # 작업은 새 실행자가 이어서 진행하므로 실패로 표시하지 않고 멈춥니다.
+        logger.warning("추첨 작업 #%s을 다른 실행자가 가져가서 실행을 중단합니다.", run_pk)
+        return None
+    except Exception as e:
+        DrawRun.objects.filter(pk=run_pk, owner=token).update(state=DrawRun.STATE_FAILED, error=str(e))
+        raise
+    finally:
+        profiler.stop()
+    # 덤프 파일 경로 등 완료 처리 이후에 기록된 값을 저장합니다.
+    DrawRun.objects.filter(pk=run_pk, owner=token).update(profile=run.profile)
+    return run
+
+
+def execute_draw_run_in_background(run_pk):
+    """요청 처리와 분리된 데몬 스레드에서 추첨 작업을 실행합니다."""
+    def target():
+        try:
+            execute_draw_run(run_pk)
+        except Exception:
+            logger.exception("추첨 작업 #%s 실행 중 오류가 발생했습니다.", run_pk)
+        finally:
+            # 스레드 전용 DB 연결을 정리합니다.
+            connections.close_all()
+
+    thread = threading.Thread(target=target, name=f'draw-run-{run_pk}', daemon=True)
+    thread.start()
+    return thread
+
+
+def finalize_round(lotto_round, chunk_size=None):
+    """
+    회차의 추첨 작업을 현재 스레드에서 끝까지 실행합니다. (명령어/벤치마크용)
+
+    :param lotto_round: 추첨할 LottoRound (당첨 번호가 아직 없는 회차)
+    :param chunk_size: 한 번에 처리할 구매 장수 (생략하면 설정값 사용)
+    :return: 집계가 끝난 SalesPerformance
+    """
+    run, _ = start_draw_run(lotto_round)
+    execute_draw_run(run.pk, chunk_size)
+    return SalesPerformance.objects.get(round=lotto_round)
+
+
+def snapshot_round_masks(lotto_round, chunk_size=SNAPSHOT_CHUNK_SIZE):
+    """회차의 티켓 번호 마스크 전체를 uint64 배열 하나로 읽습니다. (티켓 1장당 8바이트)"""
+    parts = [masks for _, masks in iter_purchase_chunks(lotto_round, chunk_size)]
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint64)
+
+
+def simulate_round(lotto_round, draws, seed=None, workers=1, batch_size=None):
+    """
+    회차의 현재 티켓으로 무작위 추첨을 draws번 시뮬레이션하여 등수별 당첨자 수 분포를 반환합니다.
+    DB에는 아무것도 저장하지 않으며, 추첨 전 당첨금 위험 검토용입니다. (simulation.py 참고)
+
+    :return: simulation.summarize의 결과에 'round', 'tickets', 'timings'(단계별 초)를 더한 dict
+    """
+    timings = {}
+    started = time.perf_counter()
+    masks = snapshot_round_masks(lotto_round)
+    timings['snapshot'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    tables = build_ticket_tables(masks)
+    timings['tables'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    winners = simulate_draws(tables, draws, seed=seed, batch_size=batch_size, workers=workers)
+    timings['simulate'] = time.perf_counter() - started
+
+    result = summarize(winners, len(masks) * TICKET_PRICE)
+    result.update(round=lotto_round.round, tickets=len(masks), timings=timings)
+    return result
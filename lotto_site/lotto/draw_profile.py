@@ -0,0 +1,153 @@
+# lotto/draw_profile.py
+"""
+추첨 작업(draw.execute_draw_run)의 단계별 프로파일링 도구.
+
+작업을 세부 단계로 나누어 단계마다 소요 시간, 처리 행 수, 최대 메모리를 DrawRun.profile에 누적합니다.
+  - draw_numbers : 당첨 번호 추첨
+  - draw_save    : 당첨 번호 저장
+  - sales_count  : 진행률 계산용 전체 판매 장수 조회 (판매 카운터 합계)
+  - fetch        : 구매 청크 조회 (pk, 번호 마스크)
+  - rank         : 청크 등수 판정
+  - write        : 청크 판정 결과와 작업 카운터 저장
+  - settle       : 판매 실적/당첨금 정산과 사용자 누적 통계 저장
+값은 작업 기록과 같은 트랜잭션으로 저장되므로 회차마다 남고, 중단 후 재개된 작업은 이전 값에 더해집니다.
+
+최대 메모리는 기본적으로 프로세스의 최대 RSS(resource.getrusage, 지원하는 OS에서만)를 기록합니다.
+settings.LOTTO_DRAW_PROFILE = True이거나 execute_draw_run(profile=True)로 실행하면 추가로
+  - tracemalloc으로 단계별 Python 힙 최대 사용량을 측정하고
+  - 작업 전체의 cProfile 결과(.prof)와 tracemalloc 스냅숏(.tracemalloc)을
+    settings.LOTTO_DRAW_PROFILE_DIR에 저장합니다. (파일 경로는 profile['artifacts']에 기록)
+이 모드는 tracemalloc/cProfile 오버헤드로 작업이 느려지므로 회차 비교나 원인 조사 때만 사용하세요.
+"""
+import cProfile
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STEP_NAMES = ('draw_numbers', 'draw_save', 'sales_count', 'fetch', 'rank', 'write', 'settle')
+
+
+def draw_profiling_enabled():
+    """추첨 작업의 cProfile/tracemalloc 덤프를 기본으로 남길지 여부를 반환합니다."""
+    return getattr(settings, 'LOTTO_DRAW_PROFILE', False)
+
+
+def get_profile_dir():
+    """cProfile/tracemalloc 덤프 파일을 저장할 디렉터리"""
+    return getattr(settings, 'LOTTO_DRAW_PROFILE_DIR', os.path.join(settings.BASE_DIR, 'draw_profiles'))
+
+
+def max_rss_bytes():
+    """프로세스의 최대 RSS(바이트). 측정할 수 없는 OS에서는 None"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KiB, macOS는 바이트 단위입니다.
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+class DrawProfiler:
+    """
+    DrawRun 하나의 단계별 측정값을 run.profile에 누적합니다.
+    측정값은 호출하는 쪽이 run.save()할 때 함께 저장됩니다.
+    """
+
+    def __init__(self, run, dump=False):
+        self.run = run
+        self.dump = dump
+        self._cprofile = None
+        self._started_tracemalloc = False
+        run.profile.setdefault('steps', {})
+
+    @contextmanager
+    def step(self, name, rows=0):
+        """
+        감싼 구간을 name 단계의 시간으로 더합니다.
+        처리 행 수는 rows로 넘기거나, 블록 안에서 정해지면 add_rows()로 더합니다.
+        """
+        tracing = tracemalloc.is_tracing() and self.dump
+        if tracing:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self._add(name, seconds=time.perf_counter() - started, rows=rows)
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1]
+                entry = self.run.profile['steps'][name]
+                entry['peak_memory'] = max(entry.get('peak_memory') or 0, peak)
+
+    def add_rows(self, name, rows):
+        self._add(name, seconds=0, rows=rows)
+
+    def _add(self, name, seconds, rows):
+        entry = self.run.profile['steps'].setdefault(name, {'seconds': 0, 'rows': 0})
+        entry['seconds'] = round(entry['seconds'] + seconds, 6)
+        entry['rows'] += rows
+
+    def record_memory(self):
+        """지금까지의 프로세스 최대 RSS를 기록합니다."""
+        max_rss = max_rss_bytes()
+        if max_rss is not None:
+            self.run.profile['max_rss'] = max(self.run.profile.get('max_rss', 0), max_rss)
+
+    def start(self):
+        """덤프 모드라면 cProfile과 tracemalloc을 시작합니다."""
+        if not self.dump:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+
+    def stop(self):
+        """덤프 모드라면 cProfile 결과와 tracemalloc 스냅숏을 파일로 저장하고 경로를 기록합니다."""
+        self.record_memory()
+        if not self.dump:
+            return
+        self._cprofile.disable()
+        directory = get_profile_dir()
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f'round-{self.run.round.round}-run-{self.run.pk}-{int(time.time())}')
+        self._cprofile.dump_stats(f'{stem}.prof')
+        artifacts = {'cprofile': f'{stem}.prof'}
+        if tracemalloc.is_tracing():
+            tracemalloc.take_snapshot().dump(f'{stem}.tracemalloc')
+            artifacts['tracemalloc'] = f'{stem}.tracemalloc'
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        self.run.profile.setdefault('artifacts', []).append(artifacts)
+
+
+def profile_rows(profile):
+    """
+    DrawRun.profile을 화면/명령어 출력용 단계별 목록으로 바꿉니다.
+
+    :return: [{'step', 'seconds', 'rows', 'rows_per_sec', 'peak_memory'}, ...] (STEP_NAMES 순서)
+    """
+    steps = profile.get('steps', {})
+    rows = []
+    for name in STEP_NAMES:
+        entry = steps.get(name)
+        if entry is None:
+            continue
+        seconds = entry['seconds']
+        rows.append({
+            'step': name,
+            'seconds': seconds,
+            'rows': entry['rows'],
+            'rows_per_sec': entry['rows'] / seconds if seconds else None,
+            'peak_memory': entry.get('peak_memory'),
+        })
+    return rows
@@ -0,0 +1,120 @@
+# lotto/export.py
+"""
+회차별 구매/당첨 결과를 CSV 또는 NDJSON으로 내보내는 스트리밍 모듈.
+
+구매 기록을 기본 키 순서로 청크 단위(키셋: pk > 마지막 pk)로 읽고, 청크마다 인코딩한 바이트를 바로 돌려주므로
+회차 규모(천만 장 이상)와 관계없이 메모리 사용량이 일정하고, 첫 청크를 읽자마자 다운로드가 시작됩니다.
+gzip=True이면 같은 청크를 zlib 스트림으로 압축하여 .gz 파일 형식으로 돌려줍니다.
+관리자 내보내기 뷰(views.export_round_purchases)와 export_purchases 명령어가 함께 사용합니다.
+"""
+import csv
+import io
+import json
+import zlib
+
+from django.conf import settings
+
+from .models import Purchase
+
+# settings.LOTTO_EXPORT_CHUNK_SIZE로 변경할 수 있습니다.
+DEFAULT_CHUNK_SIZE = 10_000
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# 내보내는 열 (CSV 헤더, NDJSON 키)
+COLUMNS = [
+    'id', 'round', 'username', 'lotto_type',
+    'num1', 'num2', 'num3', 'num4', 'num5', 'num6',
+    'match_count', 'rank', 'purchase_date',
+]
+
+_VALUES = (
+    'pk', 'round__round', 'user__username', 'lotto_type',
+    'p_num1', 'p_num2', 'p_num3', 'p_num4', 'p_num5', 'p_num6',
+    'match_count', 'rank', 'purchase_date',
+)
+
+
+def get_chunk_size():
+    return getattr(settings, 'LOTTO_EXPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def iter_round_rows(lotto_round, chunk_size=None):
+    """
+    회차의 구매를 기본 키 순서로 chunk_size개씩 읽어 튜플 목록(청크)으로 돌려줍니다.
+    각 튜플은 COLUMNS 순서이며, 모델 인스턴스는 만들지 않습니다.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    purchases = Purchase.objects.filter(round=lotto_round).order_by('pk').values_list(*_VALUES)
+    after_pk = 0
+    while True:
+        rows = list(purchases.filter(pk__gt=after_pk)[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        after_pk = rows[-1][0]
+
+
+def encode_csv(chunks):
+    """청크를 UTF-8 CSV 바이트로 바꿉니다. 첫 조각은 헤더입니다. (엑셀 호환을 위해 BOM 포함)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield ('\ufeff' + buffer.getvalue()).encode('utf-8')
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            row[:-1] + (row[-1].isoformat(),) for row in rows
+        )
+        yield buffer.getvalue().encode('utf-8')
+
+
+def encode_ndjson(chunks):
+    """청크를 줄마다 JSON 객체 하나인 NDJSON 바이트로 바꿉니다."""
+    for rows in chunks:
+        yield ''.join(
+            json.dumps(dict(zip(COLUMNS, row[:-1] + (row[-1].isoformat(),))), ensure_ascii=False) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+
+def gzip_stream(pieces, level=6):
+    """바이트 조각들을 gzip 형식으로 압축하며 돌려줍니다. (조각마다 압축된 만큼 바로 내보냄)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for piece in pieces:
+        compressed = compressor.compress(piece)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_round_export(lotto_round, export_format='csv', gzip=False, chunk_size=None, on_chunk=None):
+    """
+    회차의 구매/당첨 결과 내보내기 바이트 스트림을 만듭니다.
+
+    :param export_format: 'csv' 또는 'ndjson'
+    :param on_chunk: 청크를 읽을 때마다 행 수를 인자로 호출할 함수 (진행 상황 표시용)
+    :return: 바이트 조각의 이터레이터
+    """
+    if export_format not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {export_format} (가능: {', '.join(FORMATS)})")
+    chunks = iter_round_rows(lotto_round, chunk_size)
+    if on_chunk is not None:
+        chunks = _notify_chunks(chunks, on_chunk)
+    encode = encode_csv if export_format == 'csv' else encode_ndjson
+    pieces = encode(chunks)
+    return gzip_stream(pieces) if gzip else pieces
+
+
+def _notify_chunks(chunks, on_chunk):
+    for rows in chunks:
+        on_chunk(len(rows))
+        yield rows
+
+
+def export_filename(lotto_round, export_format='csv', gzip=False):
+    return f"lotto-round-{lotto_round.round}-purchases.{export_format}" + ('.gz' if gzip else '')
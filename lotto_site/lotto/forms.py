@@ -1,7 +1,13 @@
+import re
+
 from django import forms
 from .models import Purchase
+from .what_if import get_max_tickets
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+# 한 번에 구매할 수 있는 최대 장수 (자동 + 수동)
+MAX_TICKETS_PER_PURCHASE = 100
+
 # 로또 번호 유효성 검사기
 number_validators = [
     MinValueValidator(1, message="1보다 작은 숫자는 입력할 수 없습니다."),
@@ -56,4 +62,87 @@ class ManualPurchaseForm(forms.Form):
         if len(numbers) != len(set(numbers)):
             raise forms.ValidationError("로또 번호는 중복될 수 없습니다. 6개의 고유한 숫자를 입력해 주세요.")
             
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+
+
+class TicketRowsField(forms.Field):
+    """
+    여러 장의 수동 번호를 입력받는 필드.
+    문자열(한 줄에 번호 6개, 공백 또는 쉼표로 구분) 또는 JSON 요청의 번호 리스트 목록을 받아
+    정렬된 번호 리스트의 리스트로 변환합니다.
+    """
+    widget = forms.Textarea(attrs={'rows': 4, 'placeholder': '예) 3 17 22 31 38 44'})
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return []
+        if isinstance(value, str):
+            rows = [re.split(r'[\s,]+', line.strip()) for line in value.splitlines() if line.strip()]
+        elif isinstance(value, (list, tuple)):
+            # JSON 요청은 줄마다 정수 리스트여야 합니다. ("123456" 같은 문자열, 실수, true/false는 거부)
+            for line_number, row in enumerate(value, start=1):
+                if not isinstance(row, (list, tuple)):
+                    raise forms.ValidationError(f"{line_number}번째 줄: 번호 목록(리스트)이어야 합니다.")
+                if any(isinstance(number, bool) or not isinstance(number, int) for number in row):
+                    raise forms.ValidationError(f"{line_number}번째 줄: 숫자만 입력할 수 있습니다.")
+            rows = value
+        else:
+            raise forms.ValidationError("번호 형식이 올바르지 않습니다.")
+
+        tickets = []
+        for line_number, row in enumerate(rows, start=1):
+            try:
+                numbers = [int(number) for number in row]
+            except (TypeError, ValueError):
+                raise forms.ValidationError(f"{line_number}번째 줄: 숫자만 입력할 수 있습니다.")
+            if len(numbers) != 6:
+                raise forms.ValidationError(f"{line_number}번째 줄: 번호는 6개를 입력해야 합니다.")
+            if any(number < 1 or number > 45 for number in numbers):
+                raise forms.ValidationError(f"{line_number}번째 줄: 번호는 1부터 45 사이여야 합니다.")
+            if len(set(numbers)) != 6:
+                raise forms.ValidationError(f"{line_number}번째 줄: 로또 번호는 중복될 수 없습니다.")
+            tickets.append(sorted(numbers))
+        return tickets
+
+
+class BulkPurchaseForm(forms.Form):
+    """자동 구매 장수와 여러 줄의 수동 번호를 한 번에 입력받는 다중 구매 폼"""
+    auto_count = forms.IntegerField(
+        label='자동 구매 장수',
+        min_value=0,
+        max_value=MAX_TICKETS_PER_PURCHASE,
+        required=False,
+        initial=0,
+        widget=forms.NumberInput(attrs={'min': 0, 'max': MAX_TICKETS_PER_PURCHASE}),
+    )
+    manual_numbers = TicketRowsField(
+        label='수동 번호 (한 줄에 6개씩)',
+        required=False,
+    )
+
+    def clean(self):
+        """폼 전체 유효성 검사: 구매 장수가 1장 이상, 최대 장수 이하인지 확인"""
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        auto_count = cleaned_data.get('auto_count') or 0
+        manual_rows = cleaned_data.get('manual_numbers') or []
+        cleaned_data['auto_count'] = auto_count
+
+        total = auto_count + len(manual_rows)
+        if total == 0:
+            raise forms.ValidationError("1장 이상 구매해 주세요.")
+        if total > MAX_TICKETS_PER_PURCHASE:
+            raise forms.ValidationError(f"한 번에 최대 {MAX_TICKETS_PER_PURCHASE}장까지 구매할 수 있습니다.")
+        return cleaned_data
+
+
+class WhatIfForm(forms.Form):
+    """지난 회차 전체에 대입해 볼 번호를 입력받는 폼 (한 줄에 6개씩, 여러 줄 가능)"""
+    tickets = TicketRowsField(label='확인할 번호 (한 줄에 6개씩)')
+
+    def clean_tickets(self):
+        tickets = self.cleaned_data['tickets']
+        if len(tickets) > get_max_tickets():
+            raise forms.ValidationError(f"한 번에 최대 {get_max_tickets()}줄까지 확인할 수 있습니다.")
+        return tickets
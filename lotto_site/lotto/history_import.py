@@ -0,0 +1,310 @@
+# lotto/history_import.py
+"""
+실제 로또 추첨 이력(회차별 당첨 번호와 판매 실적)을 CSV/JSON 파일에서 한꺼번에 불러오는 모듈.
+
+  1. 파일의 모든 행을 읽어 회차 번호, 당첨 번호 6개와 보너스 번호를 정수로 바꿉니다.
+  2. 번호 검증(LOTTO_NUMBER_VALIDATORS의 범위, 번호 중복, 보너스 번호 중복)을 numpy 배열 연산으로 한 번에 수행합니다.
+  3. 파일 안에서 중복된 회차는 거부합니다.
+  4. 통과한 행을 batch_size개씩 bulk_create(update_conflicts=True)로 저장합니다.
+     저장하는 트랜잭션 안에서 이 서비스가 다루는 회차(판매 중인 회차와 그 이후 회차, 구매 기록/추첨 작업/
+     판매 카운터가 있는 회차)를 다시 확인하여 거부하므로, 확인과 저장 사이에 판매가 시작된 회차도 덮어쓰지 않습니다.
+     같은 회차가 이미 있으면 갱신하므로, 같은 파일을 여러 번 불러와도 결과가 같습니다.
+거부된 행은 (줄 번호, 회차, 사유)로 모아 돌려주며, 나머지 행의 저장은 계속 진행합니다.
+
+파일 형식 (열 이름 / 키 이름):
+  - 필수: round, num1 ~ num6, bonus_number
+  - 선택: draw_date (YYYY-MM-DD 또는 ISO 8601 일시). 없으면 이미 저장된 회차의 추첨 일시를 그대로 둡니다.
+  - 선택: SalesPerformance의 필드(total_sales, rank1_winners, rank1_prize, ...). 하나라도 있으면 판매 실적도 저장
+"""
+import csv
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .combination import combination_ranks
+from .models import LOTTO_NUMBER_VALIDATORS, DrawRun, LottoRound, Purchase, RoundSalesCounter, SalesPerformance
+from .rank_engine import masks_from_rows
+from .round_cache import invalidate_round_state
+
+DEFAULT_BATCH_SIZE = 500
+
+# LOTTO_NUMBER_VALIDATORS에서 번호 범위를 가져와 모델 검증과 같은 규칙으로 배열 전체를 검사합니다.
+NUMBER_MIN = max(v.limit_value for v in LOTTO_NUMBER_VALIDATORS if isinstance(v, MinValueValidator))
+NUMBER_MAX = min(v.limit_value for v in LOTTO_NUMBER_VALIDATORS if isinstance(v, MaxValueValidator))
+
+NUMBER_FIELDS = ['num1', 'num2', 'num3', 'num4', 'num5', 'num6', 'bonus_number']
+SALES_FIELDS = [
+    field.name for field in SalesPerformance._meta.concrete_fields if field.name != 'round'
+]
+ROUND_UPDATE_FIELDS = ['actual_draw_date'] + NUMBER_FIELDS + ['winning_mask', 'combination']
+# draw_date가 없는 행은 이미 저장된 추첨 일시를 지우지 않도록 actual_draw_date를 갱신하지 않습니다.
+ROUND_UPDATE_FIELDS_WITHOUT_DATE = NUMBER_FIELDS + ['winning_mask', 'combination']
+
+FILE_FORMATS = ('csv', 'json', 'jsonl')
+
+
+class InvalidRecord:
+    """read_records가 읽지 못한 행을 대신하는 값. import_draw_history가 거부 목록에 추가합니다."""
+    __slots__ = ('reason',)
+
+    def __init__(self, reason):
+        self.reason = reason
+
+
+def detect_format(path):
+    """파일 확장자로 형식을 추정합니다. (.ndjson은 jsonl로 취급)"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension == 'ndjson':
+        return 'jsonl'
+    if extension not in FILE_FORMATS:
+        raise ValueError(f"확장자로 형식을 알 수 없습니다: {path} (가능: {', '.join(FILE_FORMATS)})")
+    return extension
+
+
+def read_records(path, file_format=None):
+    """
+    파일의 각 행을 (줄 번호, dict)로 돌려줍니다.
+    CSV는 헤더 다음 줄이 2번, JSON 배열은 원소 순서(1부터), JSON Lines는 실제 줄 번호입니다.
+    JSON Lines에서 JSON으로 읽을 수 없는 줄은 dict 대신 InvalidRecord를 돌려주고 다음 줄을 계속 읽습니다.
+    """
+    file_format = file_format or detect_format(path)
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if file_format == 'csv':
+            for line, record in enumerate(csv.DictReader(f), start=2):
+                yield line, record
+        elif file_format == 'json':
+            data = json.load(f)
+            if isinstance(data, dict):
+                # {"rounds": [...]} 형태도 허용
+                data = data.get('rounds', [])
+            for line, record in enumerate(data, start=1):
+                yield line, record
+        else:
+            for line, text in enumerate(f, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    record = json.loads(text)
+                except json.JSONDecodeError as error:
+                    record = InvalidRecord(f"JSON 형식이 올바르지 않습니다: {error.msg}")
+                yield line, record
+
+
+def _parse_int(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"정수가 아닌 값입니다: {value!r}")
+
+
+def _parse_draw_date(value):
+    """draw_date 값을 현재 시간대의 aware datetime으로 바꿉니다. (날짜만 있으면 그날 0시)"""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"날짜 형식이 아닙니다: {value}")
+        parsed = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_record(record):
+    """
+    한 행을 (회차, 번호 7개, 추첨 일시, 판매 실적 dict 또는 None)으로 바꿉니다.
+    값이 없거나 정수가 아니면 ValueError를 발생시킵니다. (범위 검사는 validate_numbers에서 한꺼번에 수행)
+    """
+    round_number = _parse_int(record.get('round'))
+    if round_number is None or round_number < 1:
+        raise ValueError("회차 번호가 없거나 1보다 작습니다.")
+    numbers = [_parse_int(record.get(field)) for field in NUMBER_FIELDS]
+    if None in numbers:
+        missing = [field for field, number in zip(NUMBER_FIELDS, numbers) if number is None]
+        raise ValueError(f"번호가 없습니다: {', '.join(missing)}")
+
+    sales = {field: _parse_int(record.get(field)) for field in SALES_FIELDS}
+    sales = {field: value for field, value in sales.items() if value is not None}
+    if any(value < 0 for value in sales.values()):
+        raise ValueError("판매 실적 값은 음수일 수 없습니다.")
+    return round_number, numbers, _parse_draw_date(record.get('draw_date')), sales or None
+
+
+def validate_numbers(numbers):
+    """
+    (N, 7) 번호 배열(당첨 번호 6개 + 보너스 번호)을 한 번에 검사하여 행별 거부 사유 배열을 돌려줍니다.
+    통과한 행의 사유는 빈 문자열입니다.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64).reshape(-1, 7)
+    reasons = np.full(len(numbers), '', dtype=object)
+
+    out_of_range = ((numbers < NUMBER_MIN) | (numbers > NUMBER_MAX)).any(axis=1)
+    winning = np.sort(numbers[:, :6], axis=1)
+    repeated = (np.diff(winning, axis=1) == 0).any(axis=1)
+    bonus_repeated = (numbers[:, :6] == numbers[:, 6:]).any(axis=1)
+
+    # 앞의 사유가 우선하도록 역순으로 채웁니다.
+    reasons[bonus_repeated] = "보너스 번호가 당첨 번호와 겹칩니다."
+    reasons[repeated] = "당첨 번호에 중복이 있습니다."
+    reasons[out_of_range] = f"번호는 {NUMBER_MIN}~{NUMBER_MAX} 사이여야 합니다."
+    return reasons
+
+
+def _protected_rounds(round_numbers):
+    """
+    불러오면 안 되는 회차를 {회차: 사유}로 반환합니다.
+    이 서비스에서 판매/추첨하는 회차는 당첨 번호를 바꾸면 구매 기록의 등수와 판매 실적이 어긋나므로 덮어쓰지 않습니다.
+    """
+    protected = {}
+    open_round = LottoRound.objects.filter(num1__isnull=True).aggregate(latest=Max('round'))['latest']
+    if open_round is not None:
+        protected.update(
+            (number, "판매 중인 회차와 그 이후 회차는 불러올 수 없습니다.")
+            for number in round_numbers if number >= open_round
+        )
+
+    rounds = LottoRound.objects.filter(round__in=round_numbers).annotate(
+        sold=Exists(Purchase.objects.filter(round=OuterRef('pk'))),
+        drawing=Exists(DrawRun.objects.filter(round=OuterRef('pk'))),
+        counted=Exists(RoundSalesCounter.objects.filter(round=OuterRef('pk'))),
+    ).values_list('round', 'sold', 'drawing', 'counted')
+    for number, sold, drawing, counted in rounds:
+        if number in protected:
+            continue
+        if sold:
+            protected[number] = "구매 기록이 있는 회차는 덮어쓸 수 없습니다."
+        elif drawing:
+            protected[number] = "추첨 작업이 있는 회차는 덮어쓸 수 없습니다."
+        elif counted:
+            protected[number] = "판매 카운터가 있는 회차는 덮어쓸 수 없습니다."
+    return protected
+
+
+def _save_batch(rows):
+    """검증을 통과한 행 목록을 저장하고 (새로 만든 회차 수, 갱신한 회차 수, 저장한 판매 실적 수)를 반환합니다."""
+    round_numbers = [row['round'] for row in rows]
+    existing = set(LottoRound.objects.filter(round__in=round_numbers).values_list('round', flat=True))
+
+    numbers = np.array([row['numbers'][:6] for row in rows], dtype=np.int64)
+    masks = masks_from_rows(numbers)
+    combinations = combination_ranks(numbers)
+    rounds = [
+        LottoRound(
+            round=row['round'],
+            actual_draw_date=row['draw_date'],
+            **dict(zip(NUMBER_FIELDS, row['numbers'])),
+            winning_mask=int(mask),
+            combination=int(combination),
+        )
+        for row, mask, combination in zip(rows, masks, combinations)
+    ]
+    for update_fields, with_date in ((ROUND_UPDATE_FIELDS, True), (ROUND_UPDATE_FIELDS_WITHOUT_DATE, False)):
+        group = [lotto_round for lotto_round in rounds if (lotto_round.actual_draw_date is not None) == with_date]
+        if group:
+            LottoRound.objects.bulk_create(
+                group, update_conflicts=True, unique_fields=['round'], update_fields=update_fields,
+            )
+
+    sales_rows = [row for row in rows if row['sales']]
+    if sales_rows:
+        # SQLite 등에서는 update_conflicts로 저장한 객체에 기본 키가 채워지지 않으므로 다시 조회합니다.
+        round_ids = dict(LottoRound.objects.filter(
+            round__in=[row['round'] for row in sales_rows],
+        ).values_list('round', 'pk'))
+        SalesPerformance.objects.bulk_create(
+            [SalesPerformance(round_id=round_ids[row['round']], **row['sales']) for row in sales_rows],
+            update_conflicts=True,
+            unique_fields=['round'],
+            update_fields=sorted({field for row in sales_rows for field in row['sales']}),
+        )
+    return len(rows) - len(existing), len(existing), len(sales_rows)
+
+
+def import_draw_history(records, batch_size=None, dry_run=False):
+    """
+    (줄 번호, dict) 행들을 검증하고 회차/판매 실적으로 저장합니다.
+
+    :param records: read_records()의 결과 같은 (줄 번호, dict) 이터러블
+    :param dry_run: True이면 검증만 하고 저장하지 않음
+    :return: {'rows', 'imported', 'created', 'updated', 'sales', 'rejects', 'elapsed', 'rows_per_sec'}
+             rejects는 [(줄 번호, 회차 또는 None, 사유), ...]
+    """
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    started = time.perf_counter()
+    rejects = []
+    parsed = []
+    for line, record in records:
+        if isinstance(record, InvalidRecord):
+            rejects.append((line, None, record.reason))
+            continue
+        try:
+            round_number, numbers, draw_date, sales = parse_record(record)
+        except (TypeError, ValueError, AttributeError) as error:
+            round_value = record.get('round') if isinstance(record, dict) else None
+            rejects.append((line, round_value, str(error) or "잘못된 값입니다."))
+            continue
+        parsed.append({
+            'line': line, 'round': round_number, 'numbers': numbers, 'draw_date': draw_date, 'sales': sales,
+        })
+    total = len(parsed) + len(rejects)
+
+    reasons = validate_numbers([row['numbers'] for row in parsed]) if parsed else []
+    seen = set()
+    valid = []
+    for row, reason in zip(parsed, reasons):
+        if not reason and row['round'] in seen:
+            reason = "파일 안에서 중복된 회차입니다."
+        if reason:
+            rejects.append((row['line'], row['round'], reason))
+            continue
+        seen.add(row['round'])
+        valid.append(row)
+
+    imported = created = updated = sales = 0
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        # 보호할 회차 확인과 저장을 같은 쓰기 트랜잭션에서 하여, 확인 뒤에 판매/추첨이 시작된 회차를 덮어쓰지 않습니다.
+        with transaction.atomic():
+            protected = _protected_rounds([row['round'] for row in batch])
+            if protected:
+                rejects.extend(
+                    (row['line'], row['round'], protected[row['round']])
+                    for row in batch if row['round'] in protected
+                )
+                batch = [row for row in batch if row['round'] not in protected]
+            if batch and not dry_run:
+                batch_created, batch_updated, batch_sales = _save_batch(batch)
+                created += batch_created
+                updated += batch_updated
+                sales += batch_sales
+        imported += len(batch)
+    if imported and not dry_run:
+        # bulk_create는 post_save 신호를 보내지 않으므로 회차 상태 캐시를 직접 무효화합니다.
+        invalidate_round_state()
+
+    elapsed = time.perf_counter() - started
+    rejects.sort(key=lambda reject: reject[0])
+    return {
+        'rows': total,
+        'imported': imported,
+        'created': created,
+        'updated': updated,
+        'sales': sales,
+        'rejects': rejects,
+        'elapsed': elapsed,
+        'rows_per_sec': total / elapsed if elapsed else 0.0,
+    }
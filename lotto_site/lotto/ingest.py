@@ -0,0 +1,160 @@
+# lotto/ingest.py
+"""
+구매 요청을 프로세스 내부 큐에 모아 한 번의 트랜잭션으로 저장하는 그룹 커밋(group commit) 큐.
+
+SQLite는 쓰기 트랜잭션이 한 번에 하나만 실행되므로, 추첨 직전처럼 구매가 몰리면
+요청마다 따로 커밋하는 방식에서는 쓰기가 줄을 서다가 "database is locked" 오류가 납니다.
+그룹 커밋 모드에서는 요청 스레드가 저장할 구매 목록을 큐에 넣고 기다리며,
+전용 쓰기 스레드 하나가 max_delay초가 지나거나 max_batch장이 모일 때마다 모아 둔 구매를
+flush 함수(sales.save_purchases)로 한꺼번에 저장한 뒤 각 요청에 결과를 알려 줍니다.
+"""
+import logging
+import queue
+import threading
+import time
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# 쓰기 스레드를 멈추게 하는 표시 값
+_STOP = object()
+
+
+class _PendingWrite:
+    """
+    큐에 들어간 요청 하나. 쓰기 스레드가 저장을 마치면 done 이벤트를 켭니다.
+    claimed는 쓰기 스레드가 저장을 시작한 요청, cancelled는 대기 시간이 초과되어 저장하지 않을 요청입니다.
+    """
+    __slots__ = ('items', 'result', 'error', 'done', 'claimed', 'cancelled')
+
+    def __init__(self, items):
+        self.items = items
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        self.claimed = False
+        self.cancelled = False
+
+
+class GroupCommitQueue:
+    """
+    여러 요청의 쓰기를 모아 한 번에 커밋하는 큐.
+
+    :param flush: 객체 목록을 받아 한 트랜잭션으로 저장하고 저장된 목록을 반환하는 함수
+    :param max_batch: 한 번에 커밋할 최대 객체 수
+    :param max_delay: 첫 요청이 들어온 뒤 다른 요청을 더 기다리는 최대 시간(초)
+    """
+
+    def __init__(self, flush, max_batch=500, max_delay=0.005, name='group-commit'):
+        self.flush = flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        # 요청의 claimed/cancelled 표시를 함께 바꾸기 위한 잠금
+        self._claim_lock = threading.Lock()
+        self._thread = None
+        # 지금까지의 커밋 횟수와 저장한 객체 수 (벤치마크/모니터링용)
+        self.commits = 0
+        self.committed_items = 0
+
+    def start(self):
+        """쓰기 스레드가 없으면 시작합니다."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """큐에 남은 요청을 모두 저장한 뒤 쓰기 스레드를 멈춥니다."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def submit(self, items, timeout=None):
+        """
+        객체 목록을 큐에 넣고, 해당 묶음이 커밋될 때까지 기다립니다.
+
+        :return: flush 함수가 반환한 저장된 객체 목록 (이 요청의 몫만)
+        :raises TimeoutError: timeout초 안에 저장이 시작되지 않은 경우 (이 요청은 취소되어 저장되지 않음)
+        """
+        self.start()
+        pending = _PendingWrite(list(items))
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            with self._claim_lock:
+                if not pending.claimed:
+                    pending.cancelled = True
+                    raise TimeoutError("구매 저장 대기 시간이 초과되었습니다.")
+            # 이미 저장이 시작된 요청은 취소할 수 없으므로 결과를 끝까지 기다립니다.
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _run(self):
+        try:
+            stopping = False
+            while not stopping:
+                pending = self._queue.get()
+                if pending is _STOP:
+                    break
+                batch = [pending]
+                size = len(pending.items)
+                deadline = time.monotonic() + self.max_delay
+                while size < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        pending = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if pending is _STOP:
+                        stopping = True
+                        break
+                    batch.append(pending)
+                    size += len(pending.items)
+                batch = self._claim(batch)
+                if batch:
+                    self._commit(batch)
+        finally:
+            # 스레드 전용 DB 연결을 정리합니다.
+            connections.close_all()
+
+    def _claim(self, batch):
+        """취소된 요청을 빼고, 나머지 요청에 저장 시작 표시를 합니다."""
+        with self._claim_lock:
+            batch = [pending for pending in batch if not pending.cancelled]
+            for pending in batch:
+                pending.claimed = True
+        return batch
+
+    def _commit(self, batch):
+        """묶음 전체를 한 번에 저장하고, 실패하면 요청별로 나누어 다시 저장합니다."""
+        try:
+            saved = self.flush([item for pending in batch for item in pending.items])
+        except Exception as error:
+            if len(batch) == 1:
+                logger.exception("그룹 커밋 요청 저장에 실패했습니다.")
+                batch[0].error = error
+                batch[0].done.set()
+                return
+            # 잘못된 요청 하나 때문에 같은 묶음의 다른 요청까지 실패하지 않도록 합니다.
+            logger.warning("그룹 커밋 묶음(%d건) 저장에 실패하여 요청별로 다시 저장합니다.", len(batch), exc_info=True)
+            for pending in batch:
+                self._commit([pending])
+            return
+
+        self.commits += 1
+        self.committed_items += len(saved)
+        offset = 0
+        for pending in batch:
+            pending.result = saved[offset:offset + len(pending.items)]
+            offset += len(pending.items)
+            pending.done.set()
+
@@ -0,0 +1,222 @@
+# lotto/instrumentation.py
+"""
+요청별 SQL/응답 시간 계측 미들웨어.
+
+settings.LOTTO_INSTRUMENTATION = True일 때만 동작하며, 요청마다 아래 값을 기록합니다.
+  - total  : 미들웨어에 들어와서 응답이 나갈 때까지의 전체 시간
+  - view   : URL 해석 이후 응답이 이 미들웨어로 돌아올 때까지의 시간 (db, render 포함)
+  - db     : 이 요청이 실행한 SQL의 개수와 시간 (connection.execute_wrapper)
+  - render : 템플릿 렌더링 시간
+  - segment(이름)으로 감싼 구간 (예: 구매 저장)
+각 값은 Server-Timing 응답 헤더로 보내므로 브라우저 개발자 도구의 Timing 탭에서 볼 수 있고,
+URL 이름별로 최근 LOTTO_INSTRUMENTATION_WINDOW개 요청을 메모리에 보관하여 p50/p95/p99를 계산합니다.
+
+꺼져 있으면 MiddlewareNotUsed로 미들웨어 체인에서 빠지므로 요청 처리 비용이 없습니다.
+(segment()는 계측 중인 요청이 없으면 ContextVar 조회 한 번만 합니다)
+통계는 프로세스별 메모리에 있으므로 워커가 여러 개라면 워커마다 따로 집계됩니다.
+"""
+import math
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# settings.LOTTO_INSTRUMENTATION_WINDOW로 변경할 수 있습니다.
+DEFAULT_WINDOW = 1000
+
+PERCENTILES = (50, 95, 99)
+
+# 계측 중인 요청의 RequestMetrics (계측하지 않는 요청/스레드에서는 None)
+_current = ContextVar('lotto_request_metrics', default=None)
+
+_render_patch_lock = threading.Lock()
+_render_patched = False
+
+
+def instrumentation_enabled():
+    """요청 계측 미들웨어를 사용할지 여부를 반환합니다."""
+    return getattr(settings, 'LOTTO_INSTRUMENTATION', False)
+
+
+class RequestMetrics:
+    """요청 하나의 측정값"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.total = 0.0
+        self.view = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.render = 0.0
+        self.segments = {}
+
+    def add_segment(self, name, seconds):
+        self.segments[name] = self.segments.get(name, 0.0) + seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper 훅: SQL 실행 횟수와 시간을 더합니다."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    def server_timing(self):
+        """Server-Timing 헤더 값 (밀리초)"""
+        entries = [
+            f'total;dur={self.total * 1000:.2f}',
+            f'view;dur={self.view * 1000:.2f}',
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f'render;dur={self.render * 1000:.2f}',
+        ]
+        entries += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.segments.items()]
+        return ', '.join(entries)
+
+
+@contextmanager
+def segment(name):
+    """
+    감싼 구간의 시간을 현재 요청의 Server-Timing과 URL별 통계에 이름 붙여 기록합니다.
+    계측 중인 요청 밖(관리 명령, 백그라운드 스레드 등)에서는 아무것도 하지 않습니다.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_segment(name, time.perf_counter() - started)
+
+
+def _percentile(sorted_values, percent):
+    """정렬된 값 목록의 백분위수 (nearest-rank)"""
+    index = max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+class MetricsRegistry:
+    """URL 이름별로 최근 요청의 측정값을 보관하고 백분위수를 계산합니다."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+
+    def record(self, name, metrics):
+        sample = {'total': metrics.total, 'view': metrics.view, 'db': metrics.db,
+                  'render': metrics.render, 'queries': metrics.queries, **metrics.segments}
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(sample)
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def summary(self):
+        """
+        URL 이름별 통계 목록 (전체 시간 p95가 큰 순서)
+        시간은 밀리초, queries는 요청당 SQL 개수입니다.
+        """
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+
+        rows = []
+        for name, samples in snapshot.items():
+            metrics = {}
+            keys = dict.fromkeys(key for sample in samples for key in sample)
+            for key in keys:
+                values = sorted(sample.get(key, 0) for sample in samples)
+                scale = 1 if key == 'queries' else 1000
+                metrics[key] = {f'p{percent}': _percentile(values, percent) * scale for percent in PERCENTILES}
+                metrics[key]['mean'] = sum(values) / len(values) * scale
+            rows.append({'name': name, 'requests': counts[name], 'window': len(samples), 'metrics': metrics})
+        rows.sort(key=lambda row: row['metrics']['total']['p95'], reverse=True)
+        return rows
+
+
+registry = MetricsRegistry()
+
+
+def _install_render_timer():
+    """
+    Django 템플릿 백엔드의 render()를 감싸 계측 중인 요청의 렌더링 시간을 더합니다.
+    계측이 켜진 프로세스에서 한 번만 설치하며, 계측하지 않는 요청에서는 ContextVar 조회만 추가됩니다.
+    """
+    global _render_patched
+    from django.template.backends.django import Template
+
+    with _render_patch_lock:
+        if _render_patched:
+            return
+        original_render = Template.render
+
+        def timed_render(self, context=None, request=None):
+            metrics = _current.get()
+            if metrics is None:
+                return original_render(self, context, request)
+            started = time.perf_counter()
+            try:
+                return original_render(self, context, request)
+            finally:
+                metrics.render += time.perf_counter() - started
+
+        Template.render = timed_render
+        _render_patched = True
+
+
+class InstrumentationMiddleware:
+    """
+    요청별 SQL 개수/시간, 뷰 시간, 템플릿 렌더링 시간을 측정하여
+    Server-Timing 헤더로 보내고 URL 이름별 통계(registry)에 기록합니다.
+    가능한 바깥쪽(MIDDLEWARE 목록의 앞쪽)에 두어야 전체 시간에 다른 미들웨어가 포함됩니다.
+    """
+
+    def __init__(self, get_response):
+        if not instrumentation_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        registry.window = int(getattr(settings, 'LOTTO_INSTRUMENTATION_WINDOW', DEFAULT_WINDOW))
+        _install_render_timer()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        finished = time.perf_counter()
+        metrics.total = finished - metrics.started
+        if metrics.view_started is not None:
+            metrics.view = finished - metrics.view_started
+        response['Server-Timing'] = metrics.server_timing()
+
+        match = request.resolver_match
+        registry.record(match.view_name if match else '<unresolved>', metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+        return None
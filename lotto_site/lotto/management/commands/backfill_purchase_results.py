@@ -0,0 +1,41 @@
+"""
+이 기능이 도입되기 전에 추첨된 회차의 구매 당첨 결과(match_count, rank)를 채웁니다.
+
+사용 예:
+    python manage.py backfill_purchase_results            # 결과가 비어 있는 구매만 채움
+    python manage.py backfill_purchase_results --round 12 # 특정 회차만
+    python manage.py backfill_purchase_results --force    # 이미 저장된 결과도 다시 계산
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from lotto.models import LottoRound, Purchase
+
+
+class Command(BaseCommand):
+    help = "이미 추첨된 회차의 구매별 당첨 결과(일치 개수, 등수)를 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--round', type=int, dest='round_number', help="처리할 회차 번호 (생략하면 전체 회차)")
+        parser.add_argument('--force', action='store_true', help="이미 결과가 저장된 구매도 다시 계산합니다.")
+
+    def handle(self, *args, **options):
+        drawn_rounds = LottoRound.objects.filter(winning_mask__isnull=False).order_by('round')
+        if options['round_number'] is not None:
+            drawn_rounds = drawn_rounds.filter(round=options['round_number'])
+            if not drawn_rounds.exists():
+                raise CommandError(f"제 {options['round_number']} 회차는 존재하지 않거나 아직 추첨되지 않았습니다.")
+
+        total_updated = 0
+        for lotto_round in drawn_rounds:
+            purchases = Purchase.objects.filter(round=lotto_round)
+            if not options['force']:
+                purchases = purchases.filter(rank__isnull=True)
+
+            with transaction.atomic():
+                updated = purchases.record_results(lotto_round)
+            total_updated += updated
+            if updated:
+                self.stdout.write(f"제 {lotto_round.round} 회차: {updated}건 저장")
+
+        self.stdout.write(self.style.SUCCESS(f"당첨 결과 백필 완료: 총 {total_updated}건"))
@@ -0,0 +1,163 @@
+"""
+동기 뷰를 WSGI 방식으로 처리할 때와 비동기 뷰(lotto/async_views.py)를 ASGI 방식으로 처리할 때의
+처리량과 꼬리 지연 시간(p95/p99)을 같은 동시 요청 수에서 비교합니다.
+
+  - wsgi-sync  : 동시 요청 수만큼의 스레드가 각자 WSGI 핸들러(django.test.Client)로 동기 뷰를 호출
+  - asgi-async : 이벤트 루프 하나에서 동시 요청 수만큼의 태스크가 ASGI 핸들러(django.test.AsyncClient)로
+                 비동기 뷰를 호출 (요청마다 ThreadSensitiveContext를 만드는 ASGIHandler와 같은 방식)
+두 모드 모두 새 임시 SQLite 파일 DB에서 메인/당첨 확인/자동 구매 요청을 같은 비율로 섞어 보냅니다.
+운영 DB는 사용하지 않습니다. 실제 서버(uvicorn 등)를 대상으로 한 측정은 load_test 명령어를 사용하세요.
+사용 예: python manage.py bench_asgi --concurrency 64 --duration 10
+"""
+import asyncio
+import importlib
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+from asgiref.sync import ThreadSensitiveContext
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import clear_url_caches
+
+from lotto.benchmarking import scratch_database, seed_dataset
+from lotto.round_cache import invalidate_round_state
+
+# (요청 종류, HTTP 메서드, URL, POST 데이터, 비율)
+REQUESTS = [
+    ('home', 'get', '/', None, 3),
+    ('winnings', 'get', '/winnings/', None, 4),
+    ('purchase', 'post', '/purchase/', {'auto_purchase': '1'}, 3),
+]
+
+
+def use_async_views(enabled):
+    """LOTTO_ASYNC_VIEWS 설정에 맞게 URL 설정을 다시 불러옵니다."""
+    import lotto.urls
+    import lotto_site.urls
+
+    with override_settings(LOTTO_ASYNC_VIEWS=enabled):
+        importlib.reload(lotto.urls)
+    importlib.reload(lotto_site.urls)
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    help = "WSGI 동기 뷰와 ASGI 비동기 뷰의 처리량과 꼬리 지연 시간을 같은 동시 요청 수에서 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=32, help="동시 요청 수 (WSGI 스레드 수 = ASGI 태스크 수)")
+        parser.add_argument('--duration', type=float, default=10.0, help="모드별 측정 시간(초)")
+        parser.add_argument('--users', type=int, default=64, help="로그인 사용자 수")
+        parser.add_argument('--purchases', type=int, default=100_000, help="미리 채워 둘 구매 장수")
+        parser.add_argument('--seed', type=int, default=2024, help="난수 시드")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        request_logger = logging.getLogger('django.request')
+        old_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        self.stdout.write(f"동시 요청 {options['concurrency']}개, 모드별 {options['duration']:g}초")
+        try:
+            for mode in ('wsgi-sync', 'asgi-async'):
+                self.report(mode, self.run_mode(mode, options))
+        finally:
+            use_async_views(False)
+            request_logger.setLevel(old_level)
+            teardown_test_environment()
+
+    def run_mode(self, mode, options):
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                scratch_database(os.path.join(temp_dir, 'bench_asgi.sqlite3')):
+            dataset = seed_dataset(
+                options['users'], 2, options['purchases'], np.random.default_rng(options['seed']),
+            )
+            invalidate_round_state()
+            users = list(User.objects.filter(pk__in=dataset['user_ids']))
+            use_async_views(mode == 'asgi-async')
+            if mode == 'wsgi-sync':
+                return self.run_wsgi(users, options)
+            return asyncio.run(self.run_asgi(users, options))
+
+    def run_wsgi(self, users, options):
+        results = []
+        lock = threading.Lock()
+        start = threading.Barrier(options['concurrency'] + 1)
+        stop = threading.Event()
+
+        def worker(index):
+            rng = random.Random(options['seed'] + index)
+            client = Client()
+            client.force_login(users[index % len(users)])
+            local = []
+            try:
+                start.wait()
+                while not stop.is_set():
+                    name, method, url, data, _ = rng.choices(REQUESTS, [request[4] for request in REQUESTS])[0]
+                    started = time.perf_counter()
+                    try:
+                        status = getattr(client, method)(url, data).status_code
+                    except Exception:
+                        status = 500
+                    local.append((name, status, time.perf_counter() - started))
+            finally:
+                connections.close_all()
+                with lock:
+                    results.extend(local)
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started, results
+
+    async def run_asgi(self, users, options):
+        results = []
+        clients = []
+        for index in range(options['concurrency']):
+            client = AsyncClient()
+            await client.aforce_login(users[index % len(users)])
+            clients.append(client)
+        deadline = None
+
+        async def worker(index):
+            rng = random.Random(options['seed'] + index)
+            client = clients[index]
+            while time.perf_counter() < deadline:
+                name, method, url, data, _ = rng.choices(REQUESTS, [request[4] for request in REQUESTS])[0]
+                started = time.perf_counter()
+                try:
+                    async with ThreadSensitiveContext():
+                        status = (await getattr(client, method)(url, data)).status_code
+                except Exception:
+                    status = 500
+                results.append((name, status, time.perf_counter() - started))
+
+        started = time.perf_counter()
+        deadline = started + options['duration']
+        await asyncio.gather(*(worker(index) for index in range(options['concurrency'])))
+        return time.perf_counter() - started, results
+
+    def report(self, mode, result):
+        elapsed, results = result
+        for name in [request[0] for request in REQUESTS] + ['(전체)']:
+            selected = [entry for entry in results if name == '(전체)' or entry[0] == name]
+            ok = np.array([latency for _, status, latency in selected if status < 400]) * 1000
+            errors = len(selected) - len(ok)
+            p50, p95, p99 = np.percentile(ok, [50, 95, 99]) if len(ok) else (0, 0, 0)
+            self.stdout.write(
+                f"{mode:>10} {name:<8} {len(ok) / elapsed:8,.1f} 요청/초  "
+                f"p50 {p50:7.1f}ms  p95 {p95:7.1f}ms  p99 {p99:7.1f}ms  오류 {errors:,}건"
+            )
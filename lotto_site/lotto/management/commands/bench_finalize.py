@@ -0,0 +1,58 @@
+"""
+청크 단위 추첨 집계(draw.finalize_round)의 처리량과 최대 메모리 사용량을 회차 규모별로 측정합니다.
+
+임시 DB에 회차마다 가상 구매 기록을 채운 뒤 추첨을 실행하며, 운영 DB는 사용하지 않습니다.
+사용 예: python manage.py bench_finalize --sizes 100000 1000000 5000000 --db-path /tmp/bench.sqlite3
+"""
+import argparse
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from lotto.benchmarking import measure, scratch_database, seed_purchases
+from lotto.draw import finalize_round, get_chunk_size
+from lotto.models import LottoRound
+
+
+class Command(BaseCommand):
+    help = "청크 단위 추첨 집계의 처리량과 최대 메모리 사용량을 회차 규모별로 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000],
+            help="측정할 회차별 구매 장수 목록",
+        )
+        parser.add_argument('--chunk-size', type=int, default=None, help="한 번에 처리할 구매 장수")
+        parser.add_argument('--db-path', default=None, help="임시 DB 파일 경로 (SQLite, 생략하면 메모리 DB)")
+        parser.add_argument('--seed', type=int, default=2024, help="난수 시드")
+        parser.add_argument(
+            '--trace-memory', action=argparse.BooleanOptionalAction, default=True,
+            help="tracemalloc으로 최대 메모리를 측정합니다 (--no-trace-memory는 처리량만 측정)",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size'] or get_chunk_size()
+        rng = np.random.default_rng(options['seed'])
+
+        with scratch_database(options['db_path']):
+            user = User.objects.create_user('bench_user')
+            self.stdout.write(f"청크 크기: {chunk_size:,}")
+            for round_number, size in enumerate(options['sizes'], start=1):
+                lotto_round = LottoRound.objects.create(round=round_number)
+                _, seed_seconds, _ = measure(
+                    seed_purchases, lotto_round, user, size, rng, trace_memory=False,
+                )
+                performance, elapsed, peak = measure(
+                    finalize_round, lotto_round, chunk_size, trace_memory=options['trace_memory'],
+                )
+                memory = f"{peak / 1024 / 1024:7.2f} MiB" if peak is not None else "측정 안 함"
+                self.stdout.write(
+                    f"{size:>10,}장  준비 {seed_seconds:7.1f}s  추첨 집계 {elapsed:7.2f}s  "
+                    f"{size / elapsed:12,.0f} 장/초  최대 메모리 {memory}  "
+                    f"(당첨 {performance.total_winners:,}장)"
+                )
+                if performance.total_sales != size:
+                    self.stderr.write(self.style.ERROR(
+                        f"집계된 판매 장수({performance.total_sales:,})가 준비한 장수와 다릅니다."
+                    ))
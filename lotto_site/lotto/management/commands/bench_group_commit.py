@@ -0,0 +1,120 @@
+"""
+동시 구매 클라이언트 환경에서 그룹 커밋 사용 여부에 따른 구매 저장 처리량(장/초)을 비교합니다.
+
+임시 SQLite 파일 DB에서 클라이언트 스레드 여러 개가 동시에 구매를 저장하며, 운영 DB는 사용하지 않습니다.
+  - direct : 요청마다 자신의 트랜잭션으로 저장 (기존 방식)
+  - group  : 그룹 커밋 큐에 넣고 쓰기 스레드가 모아서 저장
+사용 예: python manage.py bench_group_commit --clients 32 --requests 200 --tickets 1
+"""
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+
+from lotto.benchmarking import scratch_database
+from lotto.ingest import GroupCommitQueue
+from lotto.models import LottoRound, Purchase
+from lotto.sales import (
+    DEFAULT_GROUP_COMMIT_MAX_BATCH, DEFAULT_GROUP_COMMIT_MAX_DELAY,
+    build_purchases, ensure_counter_shards, get_round_sales, save_purchases,
+)
+
+
+class Command(BaseCommand):
+    help = "동시 구매 클라이언트 환경에서 그룹 커밋 사용 여부에 따른 구매 저장 처리량을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=16, help="동시에 구매하는 클라이언트 스레드 수")
+        parser.add_argument('--requests', type=int, default=200, help="클라이언트 하나가 보내는 구매 요청 수")
+        parser.add_argument('--tickets', type=int, default=1, help="구매 요청 하나의 자동 구매 장수")
+        parser.add_argument('--max-batch', type=int, default=DEFAULT_GROUP_COMMIT_MAX_BATCH,
+                            help="그룹 커밋 한 번에 저장할 최대 장수")
+        parser.add_argument('--max-delay', type=float, default=DEFAULT_GROUP_COMMIT_MAX_DELAY,
+                            help="그룹 커밋 최대 대기 시간(초)")
+        parser.add_argument('--db-path', default=None,
+                            help="임시 DB 파일 경로 (생략하면 임시 디렉터리에 생성)")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = options['db_path'] or os.path.join(temp_dir, 'bench_group_commit.sqlite3')
+            self.run_benchmark(db_path, options)
+
+    def run_benchmark(self, db_path, options):
+        with scratch_database(db_path):
+            user = User.objects.create_user('bench_user')
+            self.stdout.write(
+                f"클라이언트 {options['clients']}개 × 요청 {options['requests']}건 × "
+                f"{options['tickets']}장 (그룹 커밋: 최대 {options['max_batch']}장 / {options['max_delay'] * 1000:g}ms)"
+            )
+
+            direct = self.run_clients(user, 1, save_purchases, options)
+            self.report('direct', direct)
+
+            ingest_queue = GroupCommitQueue(
+                save_purchases, max_batch=options['max_batch'], max_delay=options['max_delay'],
+            )
+            try:
+                group = self.run_clients(user, 2, ingest_queue.submit, options)
+            finally:
+                ingest_queue.stop()
+            self.report('group', group)
+            self.stdout.write(
+                f"  그룹 커밋 {ingest_queue.commits:,}회, 커밋당 평균 "
+                f"{ingest_queue.committed_items / max(ingest_queue.commits, 1):,.1f}장"
+            )
+
+    def run_clients(self, user, round_number, save, options):
+        """새 회차에서 클라이언트 스레드를 동시에 실행하고 (회차, 경과 초, 요청별 지연 목록, 잠금 오류 수)를 반환합니다."""
+        lotto_round = LottoRound.objects.create(round=round_number)
+        ensure_counter_shards(lotto_round)
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        start = threading.Barrier(options['clients'] + 1)
+
+        def client():
+            local_latencies = []
+            local_errors = 0
+            try:
+                start.wait()
+                for _ in range(options['requests']):
+                    purchases = build_purchases(user, lotto_round, auto_count=options['tickets'])
+                    started = time.perf_counter()
+                    try:
+                        save(purchases)
+                    except OperationalError:
+                        # "database is locked": 실제 서비스라면 구매 실패로 응답하는 경우
+                        local_errors += 1
+                        continue
+                    local_latencies.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+                with lock:
+                    latencies.extend(local_latencies)
+                    errors.append(local_errors)
+
+        threads = [threading.Thread(target=client) for _ in range(options['clients'])]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return lotto_round, elapsed, latencies, sum(errors)
+
+    def report(self, label, result):
+        lotto_round, elapsed, latencies, errors = result
+        saved = Purchase.objects.filter(round=lotto_round).count()
+        p50, p99 = (np.percentile(latencies, [50, 99]) * 1000) if latencies else (0, 0)
+        self.stdout.write(
+            f"{label:>6}: {saved:>9,}장 저장  {elapsed:7.2f}s  {saved / elapsed:10,.0f} 장/초  "
+            f"지연 p50 {p50:7.1f}ms  p99 {p99:7.1f}ms  잠금 오류 {errors:,}건"
+        )
+        if get_round_sales(lotto_round)['tickets'] != saved:
+            self.stderr.write(self.style.ERROR("판매 카운터와 저장된 구매 장수가 다릅니다."))
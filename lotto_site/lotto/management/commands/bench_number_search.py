@@ -0,0 +1,73 @@
+"""
+번호 부분집합 검색(lotto/search.py)의 응답 시간을 SQL 비트 연산 방식과 회차 메모리 인덱스 방식으로 비교합니다.
+
+임시 DB에 회차마다 가상 구매 기록을 채운 뒤 포함 검색(번호 3개 모두 포함)과
+최소 일치 검색(번호 6개 중 4개 이상)을 실행하며, 운영 DB는 사용하지 않습니다.
+사용 예: python manage.py bench_number_search --sizes 1000000 5000000 --db-path /tmp/bench.sqlite3
+"""
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from lotto.benchmarking import measure, scratch_database, seed_purchases
+from lotto.models import LottoRound, Purchase
+from lotto.search import clear_round_indexes, get_round_index, search_purchases
+
+# (이름, 검색 번호, 최소 일치 개수)
+QUERIES = [
+    ('3개 포함', [7, 13, 42], None),
+    ('6개 중 4개 이상', [3, 11, 19, 27, 35, 43], 4),
+]
+
+
+class Command(BaseCommand):
+    help = "번호 부분집합 검색의 응답 시간을 SQL 방식과 회차 메모리 인덱스 방식으로 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1_000_000],
+            help="측정할 회차별 구매 장수 목록",
+        )
+        parser.add_argument('--repeat', type=int, default=20, help="인덱스 검색 반복 횟수 (평균 시간 계산용)")
+        parser.add_argument('--db-path', default=None, help="임시 DB 파일 경로 (SQLite, 생략하면 메모리 DB)")
+        parser.add_argument('--seed', type=int, default=2024, help="난수 시드")
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+
+        with scratch_database(options['db_path']):
+            user = User.objects.create_user('bench_user')
+            for round_number, size in enumerate(options['sizes'], start=1):
+                lotto_round = LottoRound.objects.create(round=round_number)
+                seed_purchases(lotto_round, user, size, rng)
+                clear_round_indexes()
+                _, build_seconds, peak = measure(get_round_index, lotto_round)
+                self.stdout.write(
+                    f"{size:>10,}장  인덱스 생성 {build_seconds:6.2f}s  최대 메모리 {peak / 1024 / 1024:7.1f} MiB"
+                )
+                for name, numbers, min_matches in QUERIES:
+                    self.run_query(lotto_round, name, numbers, min_matches, options['repeat'])
+
+    def run_query(self, lotto_round, name, numbers, min_matches, repeat):
+        # SQL 방식: 회차의 모든 구매 행에서 비트 연산으로 거른 뒤 COUNT
+        purchases = Purchase.objects.filter(round=lotto_round)
+        if min_matches is None:
+            purchases = purchases.containing_numbers(numbers)
+        else:
+            purchases = purchases.overlapping_numbers(numbers, min_matches)
+        sql_count, sql_seconds, _ = measure(purchases.count, trace_memory=False)
+
+        # 메모리 인덱스 방식: 최신 구매 100건 조회까지 포함한 search_purchases 전체 시간
+        started = time.perf_counter()
+        for _ in range(repeat):
+            index_count, _, source = search_purchases(numbers, lotto_round=lotto_round, min_matches=min_matches)
+        index_seconds = (time.perf_counter() - started) / repeat
+
+        self.stdout.write(
+            f"  {name:<12} 일치 {index_count:>9,}장  SQL {sql_seconds * 1000:9.1f}ms  "
+            f"인덱스({source}) {index_seconds * 1000:7.2f}ms"
+        )
+        if sql_count != index_count:
+            self.stderr.write(self.style.ERROR(f"SQL({sql_count:,})과 인덱스({index_count:,}) 결과가 다릅니다."))
@@ -0,0 +1,79 @@
+"""
+rank_engine의 벡터화 등수 판정과 기존 티켓별 determine_lotto_rank 루프의 처리 속도를 비교합니다.
+
+사용 예: python manage.py bench_rank_engine --tickets 1000000 --repeat 3
+"""
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from lotto.rank_engine import count_ranks, masks_from_rows, numbers_to_mask, rank_masks
+from lotto.utils import determine_lotto_rank
+
+
+class Command(BaseCommand):
+    help = "벡터화 등수 판정 엔진과 기존 티켓별 루프의 처리 속도를 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', type=int, default=1_000_000, help="생성할 가상 티켓 수")
+        parser.add_argument('--repeat', type=int, default=3, help="측정 반복 횟수 (최솟값을 사용)")
+        parser.add_argument('--seed', type=int, default=2024, help="난수 시드")
+
+    def handle(self, *args, **options):
+        ticket_count = options['tickets']
+        repeat = options['repeat']
+        rng = np.random.default_rng(options['seed'])
+
+        # 1~45 중 중복 없는 6개 번호를 가진 가상 티켓을 생성합니다.
+        rows = np.argsort(rng.random((ticket_count, 45)), axis=1)[:, :6] + 1
+        rows.sort(axis=1)
+        row_lists = rows.tolist()
+
+        random.seed(options['seed'])
+        drawn = random.sample(range(1, 46), 7)
+        winning_numbers, bonus_number = sorted(drawn[:6]), drawn[6]
+        self.stdout.write(f"티켓 {ticket_count:,}장 / 당첨 번호 {winning_numbers} + 보너스 {bonus_number}")
+
+        def legacy():
+            rank_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+            for purchased_numbers in row_lists:
+                rank = determine_lotto_rank(purchased_numbers, winning_numbers, bonus_number)
+                if rank > 0:
+                    rank_counts[rank] += 1
+            return rank_counts
+
+        def vectorized():
+            masks = masks_from_rows(rows)
+            return count_ranks(rank_masks(masks, numbers_to_mask(winning_numbers), bonus_number))
+
+        precomputed_masks = masks_from_rows(rows)
+
+        def ranking_only():
+            return count_ranks(rank_masks(precomputed_masks, numbers_to_mask(winning_numbers), bonus_number))
+
+        results = {}
+        for label, func in (
+            ('기존 루프 (determine_lotto_rank)', legacy),
+            ('rank_engine (마스크 변환 포함)', vectorized),
+            ('rank_engine (등수 판정만)', ranking_only),
+        ):
+            best = float('inf')
+            for _ in range(repeat):
+                started = time.perf_counter()
+                counts = func()
+                best = min(best, time.perf_counter() - started)
+            results[label] = (best, counts)
+            self.stdout.write(
+                f"{label:<36} {best * 1000:10.1f} ms  {ticket_count / best:14,.0f} 장/초  {counts}"
+            )
+
+        all_counts = [counts for _, counts in results.values()]
+        if any(counts != all_counts[0] for counts in all_counts):
+            self.stderr.write(self.style.ERROR("등수 집계 결과가 서로 다릅니다!"))
+            return
+
+        baseline = results['기존 루프 (determine_lotto_rank)'][0]
+        for label, (elapsed, _) in results.items():
+            self.stdout.write(self.style.SUCCESS(f"{label}: {baseline / elapsed:.1f}x"))
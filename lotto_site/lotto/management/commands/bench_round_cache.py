@@ -0,0 +1,70 @@
+"""
+회차 상태 캐시(lotto/round_cache.py) 적용 전후의 요청당 DB 쿼리 수와 응답 시간을 비교합니다.
+
+임시 DB에 추첨이 끝난 회차와 구매 가능한 회차를 만든 뒤, 메인 페이지와 구매 페이지를 호출하며
+각 요청이 실행한 쿼리를 전부 기록합니다. 운영 DB는 사용하지 않습니다.
+사용 예: python manage.py bench_round_cache --requests 200
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from lotto.benchmarking import scratch_database
+from lotto.draw import finalize_round
+from lotto.models import LottoRound
+from lotto.round_cache import get_cache, invalidate_round_state
+from lotto.sales import ensure_counter_shards
+
+# (이름, HTTP 메서드, URL, POST 데이터)
+SCENARIOS = [
+    ('메인 페이지', 'get', '/', None),
+    ('구매 페이지', 'get', '/purchase/', None),
+    ('자동 구매', 'post', '/purchase/', {'auto_purchase': '1'}),
+]
+
+
+class Command(BaseCommand):
+    help = "회차 상태 캐시 적용 전후의 요청당 DB 쿼리 수와 응답 시간을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="시나리오별 요청 횟수")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with scratch_database():
+                user = User.objects.create_user('bench_user')
+                finalize_round(LottoRound.objects.create(round=1))
+                ensure_counter_shards(LottoRound.objects.create(round=2))
+                client = Client()
+                client.force_login(user)
+
+                for label, enabled in (('캐시 없음', False), ('캐시 사용', True)):
+                    self.stdout.write(f"[{label}]")
+                    with override_settings(LOTTO_ROUND_CACHE=enabled):
+                        invalidate_round_state()
+                        for scenario in SCENARIOS:
+                            self.run_scenario(client, scenario, options['requests'])
+                get_cache().clear()
+        finally:
+            teardown_test_environment()
+
+    def run_scenario(self, client, scenario, requests):
+        name, method, url, data = scenario
+        send = getattr(client, method)
+        with CaptureQueriesContext(connection) as first:
+            send(url, data)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(requests):
+                send(url, data)
+            elapsed = time.perf_counter() - started
+        round_queries = sum(1 for query in queries.captured_queries if 'lotto_lottoround' in query['sql'])
+        self.stdout.write(
+            f"  {name:<8} 첫 요청 {len(first):3}개  요청당 {len(queries) / requests:5.1f}개 쿼리 "
+            f"(회차 조회 {round_queries / requests:4.1f}개)  {elapsed / requests * 1000:6.2f}ms"
+        )
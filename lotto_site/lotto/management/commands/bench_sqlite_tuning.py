@@ -0,0 +1,134 @@
+"""
+SQLite 기본 설정과 운영용 튜닝(WAL, busy_timeout 등, lotto/db.py) 사이의 동시 읽기/쓰기 처리량을 비교합니다.
+
+모드마다 새 임시 SQLite 파일 DB를 만들고, 쓰기 클라이언트는 구매 뷰(/purchase/ 자동 구매)를,
+읽기 클라이언트는 당첨 확인 뷰(/winnings/)를 정해진 시간 동안 동시에 호출합니다.
+운영 DB는 사용하지 않습니다.
+사용 예: python manage.py bench_sqlite_tuning --writers 4 --readers 8 --duration 5
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from lotto.benchmarking import scratch_database, seed_purchases
+from lotto.models import LottoRound
+from lotto.sales import ensure_counter_shards
+
+
+class Command(BaseCommand):
+    help = "SQLite 기본 설정과 운영용 튜닝 사이의 구매/당첨 확인 뷰 동시 처리량을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4, help="구매 뷰를 호출하는 클라이언트 스레드 수")
+        parser.add_argument('--readers', type=int, default=8, help="당첨 확인 뷰를 호출하는 클라이언트 스레드 수")
+        parser.add_argument('--duration', type=float, default=5.0, help="모드별 측정 시간(초)")
+        parser.add_argument('--history', type=int, default=100, help="사용자별로 미리 채워 둘 구매 기록 수")
+        parser.add_argument('--seed', type=int, default=2024, help="난수 시드")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        # 잠금 오류로 실패한 요청마다 출력되는 오류 로그를 숨깁니다. (오류 수는 따로 집계)
+        request_logger = logging.getLogger('django.request')
+        old_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            self.stdout.write(
+                f"쓰기 {options['writers']}개 + 읽기 {options['readers']}개 클라이언트, "
+                f"모드별 {options['duration']:g}초"
+            )
+            for label, tuned in (('default', False), ('tuned', True)):
+                self.report(label, self.run_mode(tuned, options))
+        finally:
+            request_logger.setLevel(old_level)
+            teardown_test_environment()
+
+    def run_mode(self, tuned, options):
+        """튜닝 적용 여부를 정하고 새 임시 DB에서 동시 부하를 실행합니다."""
+        db_options = connection.settings_dict.setdefault('OPTIONS', {})
+        saved_options = dict(db_options)
+        if not tuned:
+            db_options.pop('transaction_mode', None)
+        # 임시 DB는 저장소의 개발용 DB가 아니므로 이 명령어에서도 저널 모드를 바꿉니다.
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir, \
+                    override_settings(LOTTO_SQLITE_TUNING=tuned, LOTTO_SQLITE_JOURNAL_MODE_COMMANDS=['bench_sqlite_tuning']), \
+                    scratch_database(os.path.join(temp_dir, 'bench_sqlite_tuning.sqlite3')):
+                return self.run_clients(options)
+        finally:
+            db_options.clear()
+            db_options.update(saved_options)
+
+    def run_clients(self, options):
+        """쓰기/읽기 클라이언트를 동시에 실행하고 종류별 (성공 지연 목록, 오류 수)를 반환합니다."""
+        rng = np.random.default_rng(options['seed'])
+        lotto_round = LottoRound.objects.create(round=1)
+        ensure_counter_shards(lotto_round)
+        users = []
+        for index in range(options['writers'] + options['readers']):
+            user = User.objects.create_user(f'bench_user_{index}')
+            seed_purchases(lotto_round, user, options['history'], rng)
+            users.append(user)
+
+        results = {'write': ([], []), 'read': ([], [])}
+        lock = threading.Lock()
+        start = threading.Barrier(len(users) + 1)
+        stop = threading.Event()
+
+        def client(user, kind):
+            latencies, errors = [], 0
+            try:
+                browser = Client()
+                browser.force_login(user)
+                start.wait()
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        if kind == 'write':
+                            response = browser.post('/purchase/', {'auto_purchase': '1'})
+                        else:
+                            response = browser.get('/winnings/')
+                    except OperationalError:
+                        # "database is locked"
+                        errors += 1
+                        continue
+                    if response.status_code >= 500:
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+                with lock:
+                    results[kind][0].extend(latencies)
+                    results[kind][1].append(errors)
+
+        kinds = ['write'] * options['writers'] + ['read'] * options['readers']
+        threads = [threading.Thread(target=client, args=(user, kind)) for user, kind in zip(users, kinds)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return elapsed, {kind: (latencies, sum(errors)) for kind, (latencies, errors) in results.items()}
+
+    def report(self, label, result):
+        elapsed, results = result
+        for kind, name in (('write', '구매'), ('read', '당첨 확인')):
+            latencies, errors = results[kind]
+            p50, p95 = (np.percentile(latencies, [50, 95]) * 1000) if latencies else (0, 0)
+            self.stdout.write(
+                f"{label:>8} {name:<6} {len(latencies) / elapsed:8,.1f} 요청/초  "
+                f"p50 {p50:7.1f}ms  p95 {p95:7.1f}ms  오류 {errors:,}건"
+            )
@@ -0,0 +1,230 @@
+"""
+주요 경로의 응답 시간과 쿼리 수를 한 번에 측정하는 벤치마크 모음입니다.
+
+임시 DB에 seed_lotto_data와 같은 방식으로 가상 데이터를 채운 뒤 아래 시나리오를 반복 실행합니다.
+  - 구매: 자동 1장, 수동 1장, 여러 장 구매 API
+  - 당첨 확인: 구매가 적은 사용자 / 많은 사용자, 당첨 필터
+  - 관리자 대시보드, 관리자 변경 목록(구매, 판매 실적, 사용자 통계)
+  - 추첨 작업 (판매 중인 회차 전체)
+결과는 --output JSON 파일로 저장되며, --baseline으로 이전 결과를 지정하면 중앙값이 --tolerance 비율 이상
+느려졌거나 쿼리 수가 늘어난 시나리오를 표시하고 0이 아닌 종료 코드로 끝납니다. 운영 DB는 사용하지 않습니다.
+
+사용 예:
+    python manage.py bench_suite --output bench/before.json
+    python manage.py bench_suite --output bench/after.json --baseline bench/before.json --tolerance 0.2
+"""
+import json
+import os
+import platform
+import random
+import sqlite3
+import time
+
+import django
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from lotto.benchmarking import scratch_database, seed_dataset
+from lotto.draw import finalize_round
+from lotto.round_cache import invalidate_round_state
+
+# (이름, 로그인 사용자, HTTP 메서드, URL, 요청 데이터)
+# 로그인 사용자: 'light' 구매가 가장 적은 사용자, 'heavy' 가장 많은 사용자, 'admin' 관리자
+SCENARIOS = [
+    ('purchase_auto', 'light', 'post', '/purchase/', {'auto_purchase': '1'}),
+    ('purchase_manual', 'light', 'post', '/purchase/',
+     {'manual_purchase': '1', 'p_num1': 3, 'p_num2': 11, 'p_num3': 19, 'p_num4': 27, 'p_num5': 35, 'p_num6': 43}),
+    ('purchase_bulk_api', 'light', 'json', '/api/purchase/bulk/', {'auto': 10, 'manual': [[1, 2, 3, 4, 5, 6]]}),
+    ('winnings_light', 'light', 'get', '/winnings/', None),
+    ('winnings_heavy', 'heavy', 'get', '/winnings/', None),
+    ('winnings_heavy_wins', 'heavy', 'get', '/winnings/?rank=win', None),
+    ('home', 'heavy', 'get', '/', None),
+    ('admin_dashboard', 'admin', 'get', '/admin_panel/', None),
+    ('admin_purchase_changelist', 'admin', 'get', '/admin/lotto/purchase/', None),
+    ('admin_salesperformance_changelist', 'admin', 'get', '/admin/lotto/salesperformance/', None),
+    ('admin_userstats_changelist', 'admin', 'get', '/admin/lotto/userstats/', None),
+]
+
+
+class Command(BaseCommand):
+    help = "주요 경로의 응답 시간과 쿼리 수를 측정하여 JSON으로 저장하고, 이전 결과와 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500, help="가상 사용자 수")
+        parser.add_argument('--rounds', type=int, default=5, help="회차 수 (마지막 회차는 판매 중)")
+        parser.add_argument('--purchases', type=int, default=500_000, help="전체 구매 장수")
+        parser.add_argument('--manual-ratio', type=float, default=0.2, help="수동 구매 비율")
+        parser.add_argument('--repeat', type=int, default=30, help="시나리오별 측정 반복 횟수")
+        parser.add_argument('--warmup', type=int, default=3, help="측정 전에 버리는 요청 수")
+        parser.add_argument('--only', nargs='+', default=None, help="실행할 시나리오 이름 (생략하면 전체)")
+        parser.add_argument('--db-path', default=None, help="임시 DB 파일 경로 (SQLite, 생략하면 메모리 DB)")
+        parser.add_argument('--output', default=None, help="결과 JSON 파일 경로")
+        parser.add_argument('--baseline', default=None, help="비교할 이전 결과 JSON 파일 경로")
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help="중앙값이 기준보다 이 비율 이상 느리면 성능 저하로 판단 (기본 0.25 = 25%%)",
+        )
+        parser.add_argument('--seed', type=int, default=2024, help="난수 시드")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                baseline = json.load(f)
+
+        random.seed(options['seed'])
+        setup_test_environment()
+        try:
+            with scratch_database(options['db_path']):
+                results = self.run_suite(options)
+        finally:
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'machine': platform.machine(),
+                'params': {key: options[key] for key in
+                           ('users', 'rounds', 'purchases', 'manual_ratio', 'repeat', 'warmup', 'seed')},
+            },
+            'results': results,
+        }
+        if options['output']:
+            directory = os.path.dirname(options['output'])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"결과 저장: {options['output']}")
+
+        if baseline is not None:
+            regressions = self.compare(baseline, report, options['tolerance'])
+            if regressions:
+                raise CommandError(f"성능 저하 {len(regressions)}건: {', '.join(regressions)}")
+            self.stdout.write(self.style.SUCCESS("기준 결과 대비 성능 저하가 없습니다."))
+
+    def run_suite(self, options):
+        started = time.perf_counter()
+        dataset = seed_dataset(
+            options['users'], options['rounds'], options['purchases'], np.random.default_rng(options['seed']),
+            manual_ratio=options['manual_ratio'],
+        )
+        self.stdout.write(
+            f"데이터 준비: 사용자 {options['users']:,}명, 회차 {options['rounds']}개, "
+            f"구매 {options['purchases']:,}장 ({time.perf_counter() - started:.1f}s)"
+        )
+        invalidate_round_state()
+
+        clients = {}
+        for role, user in (
+            ('light', User.objects.get(pk=dataset['light_user_id'])),
+            ('heavy', User.objects.get(pk=dataset['heavy_user_id'])),
+            ('admin', User.objects.create_superuser('bench_admin', 'bench@example.com', None)),
+        ):
+            clients[role] = Client()
+            clients[role].force_login(user)
+
+        results = {}
+        for scenario in SCENARIOS:
+            if options['only'] and scenario[0] not in options['only']:
+                continue
+            results[scenario[0]] = self.run_scenario(clients, scenario, options['repeat'], options['warmup'])
+
+        if not options['only'] or 'finalize' in options['only']:
+            results['finalize'] = self.run_finalize(dataset['open_round'])
+        return results
+
+    def run_scenario(self, clients, scenario, repeat, warmup):
+        name, role, method, url, data = scenario
+        client = clients[role]
+        if method == 'json':
+            def request():
+                return client.post(url, json.dumps(data), content_type='application/json')
+        else:
+            def request():
+                return getattr(client, method)(url, data)
+
+        # 중간 요청 하나만 실패해도 측정값이 오류 응답 시간으로 섞이므로 모든 응답을 확인합니다.
+        def send():
+            response = request()
+            if response.status_code >= 400:
+                raise CommandError(f"{name}: 응답 코드 {response.status_code}")
+            return response
+
+        for _ in range(warmup):
+            send()
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(repeat):
+                request_started = time.perf_counter()
+                send()
+                timings.append(time.perf_counter() - request_started)
+
+        result = summarize(timings)
+        result['queries'] = round(len(queries) / repeat, 1)
+        self.stdout.write(
+            f"{name:<34} 중앙값 {result['median_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  "
+            f"쿼리 {result['queries']:5.1f}개"
+        )
+        return result
+
+    def run_finalize(self, lotto_round):
+        """판매 중인 회차의 추첨 작업 전체를 한 번 실행합니다. (회차당 한 번만 실행할 수 있음)"""
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            performance = finalize_round(lotto_round)
+            elapsed = time.perf_counter() - started
+        result = summarize([elapsed])
+        result['queries'] = len(queries)
+        result['rows'] = performance.total_sales
+        result['rows_per_sec'] = round(performance.total_sales / elapsed, 1)
+        self.stdout.write(
+            f"{'finalize':<34} {elapsed * 1000:10.1f}ms  {performance.total_sales:,}장 "
+            f"({result['rows_per_sec']:,.0f} 장/초)  쿼리 {len(queries)}개"
+        )
+        return result
+
+    def compare(self, baseline, report, tolerance):
+        """기준 결과와 비교하여 성능 저하 시나리오 이름 목록을 반환합니다."""
+        if baseline.get('meta', {}).get('params') != report['meta']['params']:
+            self.stdout.write(self.style.WARNING("기준 결과와 측정 조건(params)이 다릅니다. 비교 결과에 주의하세요."))
+
+        regressions = []
+        self.stdout.write(f"{'시나리오':<34} {'기준':>10} {'현재':>10} {'변화':>8}")
+        for name, current in report['results'].items():
+            before = baseline.get('results', {}).get(name)
+            if before is None:
+                continue
+            change = current['median_ms'] / before['median_ms'] - 1 if before['median_ms'] else 0
+            slower = change > tolerance
+            more_queries = current['queries'] > before['queries']
+            line = (
+                f"{name:<34} {before['median_ms']:8.2f}ms {current['median_ms']:8.2f}ms {change:+8.1%}"
+                + (f"  쿼리 {before['queries']} -> {current['queries']}" if more_queries else "")
+            )
+            if slower or more_queries:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        return regressions
+
+
+def summarize(timings):
+    """측정 시간 목록(초)을 밀리초 단위 통계로 요약합니다."""
+    values = np.array(timings) * 1000
+    return {
+        'samples': len(values),
+        'median_ms': round(float(np.median(values)), 3),
+        'mean_ms': round(float(values.mean()), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'min_ms': round(float(values.min()), 3),
+    }
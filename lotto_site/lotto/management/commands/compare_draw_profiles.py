@@ -0,0 +1,66 @@
+"""
+최근 회차들의 추첨 작업 프로파일(DrawRun.profile)을 단계별 초당 처리 행 수로 나란히 비교합니다.
+각 단계의 처리량이 이전 회차들의 중앙값보다 --threshold 비율 이상 낮으면 성능 저하로 표시합니다.
+
+사용 예:
+    python manage.py compare_draw_profiles               # 최근 10개 회차
+    python manage.py compare_draw_profiles --rounds 30 --threshold 0.2
+"""
+from statistics import median
+
+from django.core.management.base import BaseCommand
+
+from lotto.draw_profile import STEP_NAMES
+from lotto.models import DrawRun
+
+
+class Command(BaseCommand):
+    help = "최근 회차들의 추첨 작업 단계별 처리량을 비교하고 성능 저하를 표시합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=10, help="비교할 최근 회차 수")
+        parser.add_argument(
+            '--threshold', type=float, default=0.3,
+            help="이전 회차 중앙값 대비 처리량이 이 비율 이상 낮으면 성능 저하로 표시 (기본 0.3 = 30%%)",
+        )
+
+    def handle(self, *args, **options):
+        runs = list(
+            DrawRun.objects.filter(state=DrawRun.STATE_DONE)
+            .select_related('round')
+            .order_by('-round__round')[:options['rounds']]
+        )[::-1]
+        if not runs:
+            self.stdout.write("완료된 추첨 작업이 없습니다.")
+            return
+
+        header = f"{'회차':>6} " + ''.join(f"{name:>14}" for name in STEP_NAMES) + f"{'최대 RSS':>12}"
+        self.stdout.write(header + "   (단계별 초당 처리 행 수)")
+
+        history = {name: [] for name in STEP_NAMES}
+        regressions = 0
+        for run in runs:
+            rates = {row['step']: row['rows_per_sec'] for row in run.get_profile_rows()}
+            cells = []
+            for name in STEP_NAMES:
+                rate = rates.get(name)
+                if rate is None:
+                    cells.append(f"{'-':>14}")
+                    continue
+                baseline = median(history[name]) if history[name] else None
+                slow = baseline is not None and rate < baseline * (1 - options['threshold'])
+                cell = f"{rate:>13,.0f}" + ('!' if slow else ' ')
+                cells.append(self.style.WARNING(cell) if slow else cell)
+                regressions += slow
+                history[name].append(rate)
+            max_rss = run.profile.get('max_rss')
+            memory = f"{max_rss / 1024 / 1024:9.1f} MiB" if max_rss else f"{'-':>13}"
+            self.stdout.write(f"{run.round.round:>6} " + ''.join(cells) + memory)
+
+        if regressions:
+            self.stdout.write(self.style.WARNING(
+                f"성능 저하로 보이는 단계 {regressions}개 ('!' 표시: 이전 회차 중앙값보다 "
+                f"{options['threshold']:.0%} 이상 느림)"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("성능 저하로 보이는 단계가 없습니다."))
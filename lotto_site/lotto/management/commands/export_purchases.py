@@ -0,0 +1,70 @@
+"""
+회차의 구매/당첨 결과(사용자, 번호, 자동/수동, 등수)를 CSV 또는 NDJSON 파일로 내보냅니다.
+관리자 내보내기 화면(admin_panel/export/<회차>/)과 같은 스트리밍 방식이므로 천만 장 규모의 회차도
+메모리 사용량이 일정합니다. --output을 생략하면 표준 출력으로 씁니다. (진행 상황은 표준 오류로 출력)
+
+사용 예:
+    python manage.py export_purchases --round 12 --output round12.csv
+    python manage.py export_purchases --round 12 --format ndjson --gzip --output round12.ndjson.gz
+"""
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lotto import export
+from lotto.models import LottoRound
+
+# 진행 상황을 출력하는 간격 (행 수)
+PROGRESS_EVERY = 1_000_000
+
+
+class Command(BaseCommand):
+    help = "회차의 구매/당첨 결과를 CSV 또는 NDJSON으로 스트리밍하여 내보냅니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--round', type=int, required=True, help="내보낼 회차 번호")
+        parser.add_argument('--format', choices=sorted(export.FORMATS), default='csv', help="출력 형식")
+        parser.add_argument('--gzip', action='store_true', help="gzip으로 압축하여 출력")
+        parser.add_argument('--output', default=None, help="출력 파일 경로 (생략하면 표준 출력)")
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help=f"한 번에 읽을 구매 수 (기본 {export.get_chunk_size():,})",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            lotto_round = LottoRound.objects.get(round=options['round'])
+        except LottoRound.DoesNotExist:
+            raise CommandError(f"{options['round']}회차가 없습니다.")
+
+        progress = {'rows': 0, 'next': PROGRESS_EVERY}
+        started = time.perf_counter()
+
+        def on_chunk(rows):
+            progress['rows'] += rows
+            if progress['rows'] >= progress['next']:
+                progress['next'] += PROGRESS_EVERY
+                self.stderr.write(f"  {progress['rows']:,}행 ({time.perf_counter() - started:.1f}s)")
+
+        pieces = export.stream_round_export(
+            lotto_round, options['format'], gzip=options['gzip'],
+            chunk_size=options['chunk_size'], on_chunk=on_chunk,
+        )
+        written = 0
+        out = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for piece in pieces:
+                out.write(piece)
+                written += len(piece)
+        finally:
+            if options['output']:
+                out.close()
+            else:
+                out.flush()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"{lotto_round.round}회차 {progress['rows']:,}행, {written / 1024 / 1024:,.1f}MB 내보냄 "
+            f"({elapsed:.2f}s, {progress['rows'] / elapsed if elapsed else 0:,.0f}행/초)"
+        ))
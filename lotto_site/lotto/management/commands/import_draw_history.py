@@ -0,0 +1,63 @@
+"""
+실제 로또 추첨 이력(회차별 당첨 번호, 선택적으로 판매 실적)을 CSV/JSON/JSON Lines 파일에서 한꺼번에 불러옵니다.
+같은 회차가 이미 있으면 갱신하므로 여러 번 실행해도 결과가 같습니다.
+번호 범위를 벗어나거나 중복된 행은 거부 목록에 기록하고 나머지 행은 계속 저장합니다. (파일 형식은 lotto/history_import.py 참고)
+
+사용 예:
+    python manage.py import_draw_history data/draws.csv
+    python manage.py import_draw_history data/draws.json --dry-run --rejects rejects.csv
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lotto.history_import import DEFAULT_BATCH_SIZE, FILE_FORMATS, import_draw_history, read_records
+
+# 화면에 출력하는 거부 행 수 (전체 목록은 --rejects 파일로 저장)
+SHOW_REJECTS = 20
+
+
+class Command(BaseCommand):
+    help = "회차별 당첨 번호와 판매 실적 이력을 파일에서 한꺼번에 불러옵니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="불러올 파일 경로 (.csv, .json, .jsonl/.ndjson)")
+        parser.add_argument('--format', choices=FILE_FORMATS, default=None, help="파일 형식 (생략하면 확장자로 판단)")
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help=f"한 번에 저장할 행 수 (기본 {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="검증만 하고 저장하지 않음")
+        parser.add_argument('--rejects', default=None, help="거부된 행 목록을 저장할 CSV 파일 경로")
+
+    def handle(self, *args, **options):
+        try:
+            result = import_draw_history(
+                read_records(options['path'], options['format']),
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+            )
+        except (OSError, ValueError) as error:
+            # 파일을 열 수 없거나 파일 전체의 형식이 잘못된 경우 (행 단위 오류는 거부 목록으로 처리됨)
+            raise CommandError(f"파일을 읽을 수 없습니다: {error}")
+
+        rejects = result['rejects']
+        for line, round_number, reason in rejects[:SHOW_REJECTS]:
+            self.stdout.write(self.style.WARNING(f"  {line}번째 행 (회차 {round_number}): {reason}"))
+        if len(rejects) > SHOW_REJECTS:
+            self.stdout.write(self.style.WARNING(f"  ... 외 {len(rejects) - SHOW_REJECTS:,}건"))
+        if options['rejects']:
+            with open(options['rejects'], 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['line', 'round', 'reason'])
+                writer.writerows(rejects)
+
+        if options['dry_run']:
+            summary = f"검증 완료 (저장하지 않음): {result['rows']:,}행 중 {result['imported']:,}행 통과"
+        else:
+            summary = (
+                f"{result['rows']:,}행 중 {result['imported']:,}행 저장 "
+                f"(새 회차 {result['created']:,}개, 갱신 {result['updated']:,}개, 판매 실적 {result['sales']:,}개)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary}, 거부 {len(rejects):,}행 ({result['elapsed']:.2f}s, {result['rows_per_sec']:,.0f}행/초)"
+        ))
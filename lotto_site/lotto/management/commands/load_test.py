@@ -0,0 +1,307 @@
+"""
+실행 중인 서버(runserver, gunicorn 등 WSGI 서버, uvicorn 등 ASGI 서버)에 실제 HTTP 요청을 동시에 보내는 부하 테스트입니다.
+
+클라이언트 스레드마다 keep-alive 연결 하나로 구매/당첨 확인/메인 페이지 요청을 설정한 비율로 섞어 보내며,
+실행 중간에 관리자 세션으로 추첨(finalize_lotto_round)과 다음 회차 생성을 요청할 수 있습니다.
+종류별 처리량, 지연 시간 p50/p95/p99, 오류 비율("database is locked", 5xx, 연결 오류 등)을 보고합니다.
+
+로그인은 비밀번호 없이 이 명령어가 DB에 세션을 직접 만들어 처리하므로,
+서버와 같은 settings/DB로 실행해야 합니다. 사용자는 seed_lotto_data로 만든 seed_user_* 계정을 사용하고,
+모자라면 새로 만듭니다. 만든 세션은 종료 시 삭제합니다.
+
+사용 예:
+    python manage.py runserver --noreload                     # 다른 터미널에서 서버 실행
+    python manage.py load_test --clients 16 --duration 30 --mix purchase=5,winnings=3,home=2
+    python manage.py load_test --finalize-at 10 --output load.json
+"""
+import http.client
+import json
+import random
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+
+from lotto.benchmarking import seed_users
+
+# 요청 종류: (HTTP 메서드, 경로, 본문 생성 함수)
+OPERATIONS = {
+    'purchase': ('POST', '/purchase/', lambda: ('form', {'auto_purchase': '1'})),
+    'bulk': ('POST', '/api/purchase/bulk/', lambda: ('json', {'auto': 5})),
+    'winnings': ('GET', '/winnings/', None),
+    'home': ('GET', '/', None),
+}
+
+DEFAULT_MIX = 'purchase=5,winnings=3,home=2'
+
+
+def parse_mix(value):
+    """'purchase=5,winnings=3' 형식의 요청 비율을 (종류 목록, 확률 목록)으로 바꿉니다."""
+    weights = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise CommandError(f"알 수 없는 요청 종류입니다: {name} (가능: {', '.join(OPERATIONS)})")
+        try:
+            weights[name] = float(weight or 1)
+        except ValueError:
+            raise CommandError(f"요청 비율은 숫자여야 합니다: {part}")
+    total = sum(weights.values())
+    if total <= 0:
+        raise CommandError("요청 비율의 합은 0보다 커야 합니다.")
+    return list(weights), [weight / total for weight in weights.values()]
+
+
+def create_session(user):
+    """비밀번호 없이 사용자의 로그인 세션을 DB에 만들고 세션 키를 반환합니다. (test Client.force_login과 같은 방식)"""
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return session.session_key
+
+
+class HttpSession:
+    """keep-alive 연결 하나와 쿠키(세션, CSRF)를 가진 HTTP 클라이언트"""
+
+    def __init__(self, base_url, session_key, timeout):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.cookies = {settings.SESSION_COOKIE_NAME: session_key}
+
+    def request(self, method, path, body=None):
+        """
+        요청을 보내고 (상태 코드, Location 헤더, 본문)을 반환합니다.
+        서버가 keep-alive 연결을 닫았으면 한 번 다시 연결합니다.
+        """
+        headers = {'Cookie': '; '.join(f'{name}={value}' for name, value in self.cookies.items())}
+        payload = None
+        if body is not None:
+            kind, data = body
+            if kind == 'json':
+                payload = json.dumps(data)
+                headers['Content-Type'] = 'application/json'
+            else:
+                payload = urlencode(data)
+                headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            csrf_token = self.cookies.get(settings.CSRF_COOKIE_NAME)
+            if csrf_token:
+                headers['X-CSRFToken'] = csrf_token
+
+        for attempt in range(2):
+            try:
+                self.connection.request(method, path, body=payload, headers=headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.connection.close()
+                if attempt:
+                    raise
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response.status, response.getheader('Location', ''), content
+
+    def close(self):
+        self.connection.close()
+
+
+def classify(operation, status, location, content):
+    """응답을 'ok' 또는 오류 종류로 분류합니다."""
+    if status >= 500:
+        return 'database_locked' if b'database is locked' in content else f'http_{status}'
+    if status >= 400:
+        return f'http_{status}'
+    if operation == 'purchase' and not location.rstrip('/').endswith('/purchase'):
+        # 구매할 회차가 없으면 메인 페이지로 리다이렉트됩니다.
+        return 'purchase_rejected'
+    return 'ok'
+
+
+class Command(BaseCommand):
+    help = "실행 중인 서버에 구매/당첨 확인/메인 페이지 요청을 동시에 보내 처리량과 지연 시간, 오류율을 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="대상 서버 주소")
+        parser.add_argument('--clients', type=int, default=8, help="동시에 요청하는 클라이언트 스레드 수")
+        parser.add_argument('--duration', type=float, default=30.0, help="측정 시간(초)")
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f"요청 종류별 비율 (기본 {DEFAULT_MIX}, 가능: {', '.join(OPERATIONS)})")
+        parser.add_argument('--users', type=int, default=None, help="사용할 로그인 사용자 수 (기본: 클라이언트 수)")
+        parser.add_argument(
+            '--finalize-at', type=float, default=None,
+            help="측정 시작 후 이 시간(초)에 관리자 세션으로 현재 회차 추첨을 요청합니다.",
+        )
+        parser.add_argument(
+            '--no-next-round', action='store_true',
+            help="--finalize-at 추첨 요청 직후 다음 회차를 만들지 않습니다. (구매가 거절되는 상황 측정)",
+        )
+        parser.add_argument('--timeout', type=float, default=30.0, help="요청별 타임아웃(초)")
+        parser.add_argument('--output', default=None, help="결과 JSON 파일 경로")
+        parser.add_argument('--seed', type=int, default=2024, help="요청 순서 난수 시드")
+
+    def handle(self, *args, **options):
+        operations, weights = parse_mix(options['mix'])
+        users = self.prepare_users(options['users'] or options['clients'])
+        session_keys = [create_session(user) for user in users]
+        admin_session_key = None
+        if options['finalize_at'] is not None:
+            admin = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+            if admin is None:
+                raise CommandError("--finalize-at을 사용하려면 관리자(superuser) 계정이 필요합니다.")
+            admin_session_key = create_session(admin)
+
+        try:
+            self.check_server(options['url'], session_keys[0], options['timeout'])
+            results, events, elapsed = self.run(options, operations, weights, session_keys, admin_session_key)
+        finally:
+            for session_key in session_keys + [admin_session_key]:
+                if session_key:
+                    SessionStore(session_key).delete()
+
+        summary = self.report(results, events, elapsed, options)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"결과 저장: {options['output']}")
+
+    def prepare_users(self, count):
+        """seed_user_* 사용자 count명을 가져오고, 모자라면 새로 만듭니다."""
+        users = list(User.objects.filter(username__startswith='seed_user_', is_active=True).order_by('pk')[:count])
+        if len(users) < count:
+            seed_users(count - len(users))
+            users = list(User.objects.filter(username__startswith='seed_user_', is_active=True).order_by('pk')[:count])
+        return users
+
+    def check_server(self, url, session_key, timeout):
+        client = HttpSession(url, session_key, timeout)
+        try:
+            status, _, _ = client.request('GET', '/')
+        except OSError as error:
+            raise CommandError(f"{url}에 연결할 수 없습니다. 서버가 실행 중인지 확인하세요. ({error})")
+        finally:
+            client.close()
+        if status >= 500:
+            raise CommandError(f"{url} 메인 페이지가 {status}을(를) 반환했습니다.")
+
+    def run(self, options, operations, weights, session_keys, admin_session_key):
+        """클라이언트 스레드를 실행하고 (요청 기록 목록, 이벤트 목록, 경과 초)를 반환합니다."""
+        records = []
+        events = []
+        lock = threading.Lock()
+        start = threading.Barrier(options['clients'] + 1)
+        stop = threading.Event()
+
+        def client(index):
+            rng = random.Random(options['seed'] + index)
+            session = HttpSession(options['url'], session_keys[index % len(session_keys)], options['timeout'])
+            local = []
+            try:
+                # CSRF 쿠키를 받아 둡니다.
+                session.request('GET', '/purchase/')
+                start.wait()
+                while not stop.is_set():
+                    operation = rng.choices(operations, weights)[0]
+                    method, path, make_body = OPERATIONS[operation]
+                    started = time.perf_counter()
+                    try:
+                        status, location, content = session.request(
+                            method, path, make_body() if make_body else None,
+                        )
+                        outcome = classify(operation, status, location, content)
+                    except (OSError, http.client.HTTPException) as error:
+                        outcome = f'connection_{type(error).__name__}'
+                    local.append((operation, outcome, started, time.perf_counter() - started))
+            finally:
+                session.close()
+                with lock:
+                    records.extend(local)
+
+        threads = [threading.Thread(target=client, args=(index,), daemon=True) for index in range(options['clients'])]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+
+        if admin_session_key is not None:
+            time.sleep(min(options['finalize_at'], options['duration']))
+            events.extend(self.trigger_finalize(options, admin_session_key, started))
+        time.sleep(max(options['duration'] - (time.perf_counter() - started), 0))
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        records = [(operation, outcome, request_started - started, latency)
+                   for operation, outcome, request_started, latency in records]
+        return records, events, elapsed
+
+    def trigger_finalize(self, options, admin_session_key, started):
+        """관리자 세션으로 추첨을 요청하고, 필요하면 곧바로 다음 회차를 만듭니다."""
+        admin = HttpSession(options['url'], admin_session_key, options['timeout'])
+        events = []
+        try:
+            admin.request('GET', '/admin_panel/')
+            steps = [('finalize', '/admin_panel/finalize_round/')]
+            if not options['no_next_round']:
+                steps.append(('create_next_round', '/admin_panel/create_next_round/'))
+            for name, path in steps:
+                request_started = time.perf_counter()
+                status, _, _ = admin.request('POST', path, ('form', {}))
+                events.append({
+                    'event': name,
+                    'at': round(request_started - started, 3),
+                    'status': status,
+                    'latency_ms': round((time.perf_counter() - request_started) * 1000, 2),
+                })
+                self.stdout.write(f"[{events[-1]['at']:6.2f}s] {name} 요청: 응답 {status}")
+        finally:
+            admin.close()
+        return events
+
+    def report(self, records, events, elapsed, options):
+        self.stdout.write(
+            f"{options['url']}  클라이언트 {options['clients']}개  {elapsed:.1f}초  요청 {len(records):,}건"
+        )
+        summary = {
+            'params': {key: options[key] for key in ('url', 'clients', 'duration', 'mix', 'finalize_at', 'seed')},
+            'elapsed': round(elapsed, 3),
+            'events': events,
+            'operations': {},
+        }
+        for operation in sorted({record[0] for record in records}) + ['(전체)']:
+            selected = [record for record in records if operation == '(전체)' or record[0] == operation]
+            ok = np.array([latency for _, outcome, _, latency in selected if outcome == 'ok']) * 1000
+            errors = {}
+            for _, outcome, _, _ in selected:
+                if outcome != 'ok':
+                    errors[outcome] = errors.get(outcome, 0) + 1
+            p50, p95, p99 = np.percentile(ok, [50, 95, 99]) if len(ok) else (0, 0, 0)
+            error_rate = sum(errors.values()) / len(selected) if selected else 0
+            summary['operations'][operation] = {
+                'requests': len(selected),
+                'ok': int(len(ok)),
+                'throughput': round(len(ok) / elapsed, 2),
+                'p50_ms': round(float(p50), 2),
+                'p95_ms': round(float(p95), 2),
+                'p99_ms': round(float(p99), 2),
+                'error_rate': round(error_rate, 4),
+                'errors': errors,
+            }
+            line = (
+                f"  {operation:<10} {len(ok) / elapsed:8,.1f} 요청/초  "
+                f"p50 {p50:7.1f}ms  p95 {p95:7.1f}ms  p99 {p99:7.1f}ms  오류 {error_rate:6.2%}"
+            )
+            if errors:
+                line += '  ' + ', '.join(f'{name} {count:,}' for name, count in sorted(errors.items()))
+            self.stdout.write(self.style.WARNING(line) if errors else line)
+        return summary
@@ -0,0 +1,22 @@
+"""
+사용자별 누적 통계(UserStats)를 구매 기록과 회차별 판매 실적으로부터 처음부터 다시 만듭니다.
+통계가 구매 기록과 어긋났거나(수동 데이터 수정 등) 당첨금 정산 규칙이 바뀐 뒤에 실행합니다.
+
+사용 예: python manage.py rebuild_user_stats
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from lotto.user_stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = "사용자별 누적 통계를 구매 기록으로부터 다시 만듭니다."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_user_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"사용자 {count:,}명의 누적 통계를 다시 만들었습니다. ({time.perf_counter() - started:.2f}s)"
+        ))
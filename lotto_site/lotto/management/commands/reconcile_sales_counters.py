@@ -0,0 +1,42 @@
+"""
+회차별 실시간 판매 카운터(RoundSalesCounter)를 실제 구매 기록 집계와 비교합니다.
+
+사용 예:
+    python manage.py reconcile_sales_counters             # 전체 회차 검사
+    python manage.py reconcile_sales_counters --round 12  # 특정 회차만 검사
+    python manage.py reconcile_sales_counters --fix       # 불일치하는 카운터를 실제 값으로 교정
+"""
+from django.core.management.base import BaseCommand
+
+from lotto.models import LottoRound
+from lotto.sales import reconcile_round_sales
+
+
+class Command(BaseCommand):
+    help = "회차별 판매 카운터를 실제 구매 기록 집계와 비교하고, 필요하면 교정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--round', type=int, dest='round_number', help="검사할 회차 번호 (생략하면 전체 회차)")
+        parser.add_argument('--fix', action='store_true', help="불일치하는 카운터를 실제 값으로 교정합니다.")
+
+    def handle(self, *args, **options):
+        rounds = LottoRound.objects.order_by('round')
+        if options['round_number'] is not None:
+            rounds = rounds.filter(round=options['round_number'])
+
+        mismatches = 0
+        for lotto_round in rounds:
+            counted, actual, matches = reconcile_round_sales(lotto_round, fix=options['fix'])
+            if matches:
+                self.stdout.write(f"제 {lotto_round.round} 회차: 일치 ({actual['tickets']}장)")
+                continue
+            mismatches += 1
+            self.stdout.write(self.style.WARNING(
+                f"제 {lotto_round.round} 회차: 불일치 카운터={counted} 실제={actual}"
+                + (" -> 교정 완료" if options['fix'] else "")
+            ))
+
+        if mismatches and not options['fix']:
+            self.stdout.write(self.style.ERROR(f"불일치 회차 {mismatches}개 (--fix로 교정할 수 있습니다)"))
+        else:
+            self.stdout.write(self.style.SUCCESS("판매 카운터 검사 완료"))
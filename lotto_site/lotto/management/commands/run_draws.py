@@ -0,0 +1,72 @@
+"""
+등록된 추첨 작업(DrawRun)을 웹 요청 밖에서 실행하거나, 중단된 작업을 이어서 실행합니다.
+
+사용 예:
+    python manage.py run_draws                 # 완료되지 않은 작업을 모두 실행 (실패/중단 작업 재개 포함)
+    python manage.py run_draws --start         # 현재 판매 중인 회차의 추첨 작업을 등록하고 실행
+    python manage.py run_draws --watch         # 워커로 상주하며 새 작업을 주기적으로 처리
+    python manage.py run_draws --profile       # cProfile/tracemalloc 덤프를 남기며 실행
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lotto.draw import execute_draw_run, start_draw_run
+from lotto.models import DrawRun, LottoRound
+
+
+class Command(BaseCommand):
+    help = "등록된 추첨 작업을 실행하거나 중단된 작업을 이어서 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', action='store_true', help="현재 판매 중인 회차의 추첨 작업을 새로 등록합니다.")
+        parser.add_argument('--round', type=int, dest='round_number', help="지정한 회차의 작업만 실행합니다.")
+        parser.add_argument('--chunk-size', type=int, default=None, help="한 번에 처리할 구매 장수")
+        parser.add_argument('--watch', action='store_true', help="종료하지 않고 새 작업을 주기적으로 확인합니다.")
+        parser.add_argument('--interval', type=float, default=5.0, help="--watch 사용 시 확인 간격(초)")
+        parser.add_argument(
+            '--profile', action='store_true', default=None,
+            help="cProfile 결과와 tracemalloc 스냅숏을 LOTTO_DRAW_PROFILE_DIR에 저장합니다.",
+        )
+
+    def handle(self, *args, **options):
+        if options['start']:
+            current_round = LottoRound.objects.filter(num1__isnull=True).order_by('-round').first()
+            if current_round is None:
+                raise CommandError("현재 추첨을 진행할 로또 회차가 없습니다.")
+            run, created = start_draw_run(current_round)
+            self.stdout.write(f"제 {current_round.round} 회차 추첨 작업 #{run.pk} {'등록' if created else '재사용'}")
+
+        while True:
+            self.process_pending_runs(options)
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+
+    def process_pending_runs(self, options):
+        runs = DrawRun.objects.exclude(state=DrawRun.STATE_DONE).select_related('round').order_by('created_at')
+        if options['round_number'] is not None:
+            runs = runs.filter(round__round=options['round_number'])
+
+        for run in runs:
+            self.stdout.write(
+                f"제 {run.round.round} 회차 작업 #{run.pk} 실행 "
+                f"(단계: {run.get_phase_display()}, 처리 {run.processed_tickets}/{run.total_tickets})"
+            )
+            try:
+                finished = execute_draw_run(run.pk, options['chunk_size'], profile=options['profile'])
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f"작업 #{run.pk} 실패: {e}"))
+                continue
+            if finished is None:
+                self.stdout.write(f"작업 #{run.pk}은(는) 다른 곳에서 실행 중이므로 건너뜁니다.")
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"작업 #{run.pk} 완료: 판매 {finished.processed_tickets}장, "
+                f"당첨 {finished.get_rank_counts()}, 단계별 시간 {finished.phase_timings}"
+            ))
+            for row in finished.get_profile_rows():
+                rate = f"{row['rows_per_sec']:12,.0f} 행/초" if row['rows_per_sec'] else " " * 17
+                self.stdout.write(f"  {row['step']:<12} {row['seconds']:9.3f}s  {row['rows']:>10,}행  {rate}")
+            for artifacts in finished.profile.get('artifacts', [])[-1:]:
+                self.stdout.write(f"  프로파일 덤프: {', '.join(artifacts.values())}")
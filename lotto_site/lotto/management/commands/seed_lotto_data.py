@@ -0,0 +1,50 @@
+"""
+개발/성능 측정용 가상 데이터를 현재 설정된 DB에 빠르게 채웁니다.
+
+가상 사용자를 bulk_create로 만들고, 회차마다 구매 기록을 원시 INSERT로 채운 뒤
+마지막 회차를 제외한 회차는 추첨 작업까지 실행합니다. 사용자별 구매 장수는 지프 분포를 따르므로
+구매가 많은 사용자와 적은 사용자가 함께 만들어집니다.
+사용 예: python manage.py seed_lotto_data --users 1000 --rounds 10 --purchases 2000000 --manual-ratio 0.2
+"""
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from lotto.benchmarking import seed_dataset
+
+
+class Command(BaseCommand):
+    help = "가상 사용자, 회차, 구매 기록을 현재 DB에 빠르게 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help="만들 가상 사용자 수")
+        parser.add_argument('--rounds', type=int, default=10, help="만들 회차 수 (마지막 회차는 판매 중으로 남음)")
+        parser.add_argument('--purchases', type=int, default=1_000_000, help="전체 구매 장수 (회차마다 나누어 채움)")
+        parser.add_argument('--manual-ratio', type=float, default=0.2, help="수동 구매 비율 (0~1)")
+        parser.add_argument('--skew', type=float, default=1.0, help="사용자별 구매 장수 편중도 (0이면 균등)")
+        parser.add_argument('--no-finalize', action='store_true', help="회차 추첨 작업을 실행하지 않습니다.")
+        parser.add_argument('--seed', type=int, default=2024, help="난수 시드")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['rounds'] < 1:
+            raise CommandError("--users와 --rounds는 1 이상이어야 합니다.")
+        if not 0 <= options['manual_ratio'] <= 1:
+            raise CommandError("--manual-ratio는 0 이상 1 이하여야 합니다.")
+
+        started = time.perf_counter()
+
+        def report(lotto_round, count):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"제 {lotto_round.round} 회차 {count:,}장 채움 (누적 {elapsed:.1f}s)")
+
+        dataset = seed_dataset(
+            options['users'], options['rounds'], options['purchases'], np.random.default_rng(options['seed']),
+            manual_ratio=options['manual_ratio'], skew=options['skew'],
+            finalize=not options['no_finalize'], on_round=report,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"사용자 {len(dataset['user_ids']):,}명, 회차 {len(dataset['rounds'])}개, 구매 {options['purchases']:,}장 "
+            f"({elapsed:.1f}s, {options['purchases'] / elapsed:,.0f} 장/초)"
+        ))
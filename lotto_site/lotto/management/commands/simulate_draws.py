@@ -0,0 +1,79 @@
+"""
+추첨 전에 회차의 현재 티켓으로 무작위 추첨을 여러 번 시뮬레이션하여 등수별 당첨자 수 분포를 출력합니다.
+당첨 번호를 확정하기 전 당첨금 위험(1등 다수 당첨, 고정 당첨금 초과 등)을 검토하는 용도이며 DB에는 저장하지 않습니다.
+
+사용 예:
+    python manage.py simulate_draws --draws 500000
+    python manage.py simulate_draws --round 12 --draws 1000000 --workers 4 --seed 7
+"""
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from lotto import simulation
+from lotto.draw import simulate_round
+from lotto.models import LottoRound
+from lotto.round_cache import query_current_round
+
+
+class Command(BaseCommand):
+    help = "회차의 현재 티켓으로 무작위 추첨을 시뮬레이션하여 등수별 당첨자 수 분포를 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--round', type=int, default=None, help="회차 번호 (생략하면 판매 중인 회차)")
+        parser.add_argument(
+            '--draws', type=int, default=getattr(settings, 'LOTTO_SIMULATION_DRAWS', simulation.DEFAULT_DRAWS),
+            help="시뮬레이션할 추첨 횟수",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'LOTTO_SIMULATION_WORKERS', simulation.DEFAULT_WORKERS),
+            help="프로세스 수 (2 이상이면 프로세스 풀 사용)",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=simulation.DEFAULT_BATCH_SIZE, help="한 번의 벡터 연산으로 처리할 추첨 수",
+        )
+        parser.add_argument('--seed', type=int, default=None, help="난수 시드 (같은 시드면 같은 결과)")
+        parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+
+    def handle(self, *args, **options):
+        if options['draws'] < 1:
+            raise CommandError("--draws는 1 이상이어야 합니다.")
+        if options['round'] is not None:
+            try:
+                lotto_round = LottoRound.objects.get(round=options['round'])
+            except LottoRound.DoesNotExist:
+                raise CommandError(f"{options['round']}회차가 없습니다.")
+        else:
+            lotto_round = query_current_round()
+            if lotto_round is None:
+                raise CommandError("판매 중인 회차가 없습니다. --round로 회차를 지정하세요.")
+
+        result = simulate_round(
+            lotto_round, options['draws'], seed=options['seed'],
+            workers=options['workers'], batch_size=options['batch_size'],
+        )
+        if options['json']:
+            self.stdout.write(json.dumps(result, ensure_ascii=False, indent=2))
+            return
+
+        timings = result['timings']
+        self.stdout.write(
+            f"제 {result['round']} 회차: 티켓 {result['tickets']:,}장, 추첨 {result['draws']:,}회 "
+            f"(스냅숏 {timings['snapshot']:.2f}s, 표 생성 {timings['tables']:.2f}s, "
+            f"시뮬레이션 {timings['simulate']:.2f}s, 프로세스 {options['workers']}개)"
+        )
+        self.stdout.write(
+            f"{'등수':>4} {'평균':>12} {'표준편차':>10} {'p95':>10} {'p99':>10} {'p99.9':>10} {'최대':>10} {'없음 확률':>9}"
+        )
+        for row in result['ranks']:
+            self.stdout.write(
+                f"{row['rank']:>3}등 {row['mean']:12,.2f} {row['std']:10,.2f} {row['p95']:10,.0f} "
+                f"{row['p99']:10,.0f} {row['p999']:10,.0f} {row['max']:10,} {row['zero_probability']:9.2%}"
+            )
+        fixed = result['fixed_payout']
+        self.stdout.write(
+            f"총 당첨금 {result['prize_pool']:,}원, 고정 당첨금(4, 5등) 평균 {fixed['mean']:,.0f}원 / "
+            f"p99 {fixed['p99']:,.0f}원 / 최대 {fixed['max']:,}원, "
+            f"총 당첨금 초과 확률 {result['fixed_overflow_probability']:.4%}"
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-16 22:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0002_remove_lottoround_draw_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lottoround',
+            name='winning_mask',
+            field=models.BigIntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='당첨 번호 마스크'),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='number_mask',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, verbose_name='구매 번호 마스크'),
+        ),
+    ]
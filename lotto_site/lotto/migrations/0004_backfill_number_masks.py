@@ -0,0 +1,47 @@
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def _numbers_to_mask(numbers):
+    # 마이그레이션은 앱 코드 변경에 영향을 받지 않도록 변환 로직을 직접 포함합니다.
+    mask = 0
+    for number in numbers:
+        mask |= 1 << (number - 1)
+    return mask
+
+
+def backfill_number_masks(apps, schema_editor):
+    Purchase = apps.get_model('lotto', 'Purchase')
+    LottoRound = apps.get_model('lotto', 'LottoRound')
+
+    batch = []
+    rows = Purchase.objects.order_by('pk').values_list(
+        'pk', 'p_num1', 'p_num2', 'p_num3', 'p_num4', 'p_num5', 'p_num6'
+    )
+    for pk, *numbers in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(Purchase(pk=pk, number_mask=_numbers_to_mask(numbers)))
+        if len(batch) >= BATCH_SIZE:
+            Purchase.objects.bulk_update(batch, ['number_mask'])
+            batch = []
+    if batch:
+        Purchase.objects.bulk_update(batch, ['number_mask'])
+
+    drawn_rounds = list(LottoRound.objects.filter(num1__isnull=False))
+    for lotto_round in drawn_rounds:
+        lotto_round.winning_mask = _numbers_to_mask([
+            lotto_round.num1, lotto_round.num2, lotto_round.num3,
+            lotto_round.num4, lotto_round.num5, lotto_round.num6,
+        ])
+    LottoRound.objects.bulk_update(drawn_rounds, ['winning_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0003_purchase_number_mask'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_number_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-16 22:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0004_backfill_number_masks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='match_count',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True, verbose_name='일치 개수'),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='rank',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True, verbose_name='당첨 등수'),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['round', 'rank'], name='purchase_round_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.2 on 2026-10-16 22:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0005_purchase_results'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DrawRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('pending', '대기'), ('running', '진행 중'), ('done', '완료'), ('failed', '실패')], default='pending', max_length=10, verbose_name='상태')),
+                ('phase', models.CharField(choices=[('draw', '당첨 번호 추첨'), ('rank', '당첨 판정'), ('finish', '판매 실적 저장'), ('done', '완료')], default='draw', max_length=10, verbose_name='단계')),
+                ('total_tickets', models.IntegerField(default=0, verbose_name='판정 대상 장수')),
+                ('processed_tickets', models.IntegerField(default=0, verbose_name='판정 완료 장수')),
+                ('last_processed_id', models.BigIntegerField(default=0, verbose_name='마지막 처리 구매 id')),
+                ('rank1_count', models.IntegerField(default=0, verbose_name='1등')),
+                ('rank2_count', models.IntegerField(default=0, verbose_name='2등')),
+                ('rank3_count', models.IntegerField(default=0, verbose_name='3등')),
+                ('rank4_count', models.IntegerField(default=0, verbose_name='4등')),
+                ('rank5_count', models.IntegerField(default=0, verbose_name='5등')),
+                ('phase_timings', models.JSONField(blank=True, default=dict, verbose_name='단계별 소요 시간')),
+                ('error', models.TextField(blank=True, verbose_name='오류 메시지')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성 일시')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='마지막 진행 일시')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='완료 일시')),
+                ('round', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='draw_run', to='lotto.lottoround', verbose_name='회차')),
+            ],
+        ),
+    ]
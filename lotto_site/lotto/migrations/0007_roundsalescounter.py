@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-16 22:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0006_drawrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoundSalesCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField(verbose_name='샤드 번호')),
+                ('tickets', models.IntegerField(default=0, verbose_name='판매 장수')),
+                ('auto_tickets', models.IntegerField(default=0, verbose_name='자동 판매 장수')),
+                ('manual_tickets', models.IntegerField(default=0, verbose_name='수동 판매 장수')),
+                ('revenue', models.BigIntegerField(default=0, verbose_name='판매 금액 (원)')),
+                ('round', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_counters', to='lotto.lottoround', verbose_name='회차')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('round', 'shard'), name='unique_round_sales_counter_shard')],
+            },
+        ),
+    ]
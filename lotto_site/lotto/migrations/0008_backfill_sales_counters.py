@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import Count
+
+# 마이그레이션은 앱 코드 변경에 영향을 받지 않도록 가격을 직접 포함합니다.
+TICKET_PRICE = 1000
+
+
+def backfill_sales_counters(apps, schema_editor):
+    Purchase = apps.get_model('lotto', 'Purchase')
+    RoundSalesCounter = apps.get_model('lotto', 'RoundSalesCounter')
+
+    # 기존 구매 기록을 회차/구매 유형별로 한 번에 집계하여 0번 샤드에 저장합니다.
+    totals = {}
+    rows = (
+        Purchase.objects.filter(round__isnull=False)
+        .values('round_id', 'lotto_type')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        counter = totals.setdefault(row['round_id'], {'auto_tickets': 0, 'manual_tickets': 0})
+        counter['auto_tickets' if row['lotto_type'] == 'A' else 'manual_tickets'] += row['count']
+
+    RoundSalesCounter.objects.bulk_create([
+        RoundSalesCounter(
+            round_id=round_id,
+            shard=0,
+            tickets=counter['auto_tickets'] + counter['manual_tickets'],
+            auto_tickets=counter['auto_tickets'],
+            manual_tickets=counter['manual_tickets'],
+            revenue=(counter['auto_tickets'] + counter['manual_tickets']) * TICKET_PRICE,
+        )
+        for round_id, counter in totals.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0007_roundsalescounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sales_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-16 22:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0008_backfill_sales_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['user', 'purchase_date', 'id'], name='purchase_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-16 22:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0009_purchase_user_date_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lottoround',
+            name='combination',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='당첨 조합 번호'),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='combination',
+            field=models.IntegerField(blank=True, editable=False, null=True, verbose_name='구매 조합 번호'),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['round', 'combination'], name='purchase_round_combo_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from math import comb
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def _combination_rank(numbers):
+    # 마이그레이션은 앱 코드 변경에 영향을 받지 않도록 변환 로직을 직접 포함합니다.
+    return sum(comb(number - 1, index) for index, number in enumerate(sorted(numbers), start=1))
+
+
+def backfill_combinations(apps, schema_editor):
+    Purchase = apps.get_model('lotto', 'Purchase')
+    LottoRound = apps.get_model('lotto', 'LottoRound')
+
+    batch = []
+    rows = Purchase.objects.order_by('pk').values_list(
+        'pk', 'p_num1', 'p_num2', 'p_num3', 'p_num4', 'p_num5', 'p_num6'
+    )
+    for pk, *numbers in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(Purchase(pk=pk, combination=_combination_rank(numbers)))
+        if len(batch) >= BATCH_SIZE:
+            Purchase.objects.bulk_update(batch, ['combination'])
+            batch = []
+    if batch:
+        Purchase.objects.bulk_update(batch, ['combination'])
+
+    drawn_rounds = list(LottoRound.objects.filter(num1__isnull=False))
+    for lotto_round in drawn_rounds:
+        lotto_round.combination = _combination_rank([
+            lotto_round.num1, lotto_round.num2, lotto_round.num3,
+            lotto_round.num4, lotto_round.num5, lotto_round.num6,
+        ])
+    LottoRound.objects.bulk_update(drawn_rounds, ['combination'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0010_purchase_combination'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_combinations, migrations.RunPython.noop),
+    ]
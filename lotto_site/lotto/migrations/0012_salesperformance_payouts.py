@@ -0,0 +1,73 @@
+# Generated by Django 5.1.2 on 2026-10-16 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0011_backfill_combinations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salesperformance',
+            name='carryover_in',
+            field=models.BigIntegerField(default=0, verbose_name='이전 회차 이월금 (원)'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='carryover_out',
+            field=models.BigIntegerField(default=0, verbose_name='다음 회차 이월금 (원)'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='prize_pool',
+            field=models.BigIntegerField(default=0, verbose_name='총 당첨금 (원)'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='rank1_prize',
+            field=models.BigIntegerField(default=0, verbose_name='1등 1인당 당첨금'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='rank2_prize',
+            field=models.BigIntegerField(default=0, verbose_name='2등 1인당 당첨금'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='rank3_prize',
+            field=models.BigIntegerField(default=0, verbose_name='3등 1인당 당첨금'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='rank4_prize',
+            field=models.BigIntegerField(default=0, verbose_name='4등 1인당 당첨금'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='rank4_winners',
+            field=models.IntegerField(default=0, verbose_name='4등 당첨자'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='rank5_prize',
+            field=models.BigIntegerField(default=0, verbose_name='5등 1인당 당첨금'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='rank5_winners',
+            field=models.IntegerField(default=0, verbose_name='5등 당첨자'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='total_payout',
+            field=models.BigIntegerField(default=0, verbose_name='총 지급액 (원)'),
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='total_revenue',
+            field=models.BigIntegerField(default=0, verbose_name='총 판매 금액 (원)'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+from django.db import migrations
+
+TICKET_PRICE = 1000
+PRIZE_POOL_PERCENT = 50
+FIXED_PRIZES = {4: 50_000, 5: 5_000}
+POOL_SHARES = {1: 7_500, 2: 1_250, 3: 1_250}
+
+
+# 마이그레이션은 앱 코드 변경에 영향을 받지 않도록 판정/정산 로직을 직접 포함합니다.
+def _rank(ticket_mask, winning_mask, bonus_number):
+    matched = bin(ticket_mask & winning_mask).count('1')
+    if matched == 6:
+        return 1
+    if matched == 5:
+        return 2 if ticket_mask >> (bonus_number - 1) & 1 else 3
+    if matched == 4:
+        return 4
+    if matched == 3:
+        return 5
+    return 0
+
+
+def _payouts(revenue, rank_counts, carryover_in):
+    remaining = max(
+        revenue * PRIZE_POOL_PERCENT // 100
+        - sum(prize * rank_counts[rank] for rank, prize in FIXED_PRIZES.items()),
+        0,
+    )
+    rank_prizes = dict(FIXED_PRIZES)
+    # 나누어떨어지지 않고 남은 금액(원 단위 나머지)도 이월합니다.
+    carryover_out = remaining - sum(remaining * share // 10_000 for share in POOL_SHARES.values())
+    for rank, share in POOL_SHARES.items():
+        rank_pool = remaining * share // 10_000 + (carryover_in if rank == 1 else 0)
+        rank_prizes[rank] = rank_pool // rank_counts[rank] if rank_counts[rank] else 0
+        carryover_out += rank_pool - rank_prizes[rank] * rank_counts[rank]
+    return rank_prizes, carryover_out
+
+
+def backfill_payouts(apps, schema_editor):
+    SalesPerformance = apps.get_model('lotto', 'SalesPerformance')
+    Purchase = apps.get_model('lotto', 'Purchase')
+
+    carryover_in = 0
+    for performance in SalesPerformance.objects.select_related('round').order_by('round__round'):
+        lotto_round = performance.round
+        rank_counts = {rank: 0 for rank in range(0, 6)}
+        if lotto_round.winning_mask is not None:
+            masks = Purchase.objects.filter(round=lotto_round).values_list('number_mask', flat=True)
+            for mask in masks.iterator(chunk_size=2000):
+                rank_counts[_rank(mask, lotto_round.winning_mask, lotto_round.bonus_number)] += 1
+        rank_prizes, carryover_out = _payouts(performance.total_sales * TICKET_PRICE, rank_counts, carryover_in)
+
+        performance.total_winners = sum(rank_counts[rank] for rank in range(1, 6))
+        performance.total_revenue = performance.total_sales * TICKET_PRICE
+        performance.prize_pool = performance.total_revenue * PRIZE_POOL_PERCENT // 100
+        performance.carryover_in = carryover_in
+        performance.carryover_out = carryover_out
+        performance.total_payout = sum(rank_prizes[rank] * rank_counts[rank] for rank in range(1, 6))
+        for rank in range(1, 6):
+            setattr(performance, f'rank{rank}_winners', rank_counts[rank])
+            setattr(performance, f'rank{rank}_prize', rank_prizes[rank])
+        performance.save()
+        carryover_in = carryover_out
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0012_salesperformance_payouts'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_payouts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-16 22:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('lotto', '0013_backfill_payouts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='lotto_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+                ('tickets', models.IntegerField(default=0, verbose_name='누적 구매 장수')),
+                ('spend', models.BigIntegerField(default=0, verbose_name='누적 구매 금액 (원)')),
+                ('rank1_wins', models.IntegerField(default=0, verbose_name='1등 당첨')),
+                ('rank2_wins', models.IntegerField(default=0, verbose_name='2등 당첨')),
+                ('rank3_wins', models.IntegerField(default=0, verbose_name='3등 당첨')),
+                ('rank4_wins', models.IntegerField(default=0, verbose_name='4등 당첨')),
+                ('rank5_wins', models.IntegerField(default=0, verbose_name='5등 당첨')),
+                ('prize_won', models.BigIntegerField(default=0, verbose_name='누적 당첨금 (원)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='마지막 갱신')),
+            ],
+        ),
+    ]
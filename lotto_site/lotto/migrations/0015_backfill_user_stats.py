@@ -0,0 +1,55 @@
+from django.db import migrations
+from django.db.models import Count
+
+TICKET_PRICE = 1000
+
+
+def _rank(ticket_mask, winning_mask, bonus_number):
+    matched = bin(ticket_mask & winning_mask).count('1')
+    if matched == 6:
+        return 1
+    if matched == 5:
+        return 2 if ticket_mask >> (bonus_number - 1) & 1 else 3
+    if matched == 4:
+        return 4
+    if matched == 3:
+        return 5
+    return 0
+
+
+# 마이그레이션은 앱 코드 변경에 영향을 받지 않도록 판정/집계 로직을 직접 포함합니다.
+# 예전 회차는 Purchase.rank가 비어 있으므로 0013과 같이 번호 비트마스크로 등수를 다시 판정합니다.
+def backfill_user_stats(apps, schema_editor):
+    Purchase = apps.get_model('lotto', 'Purchase')
+    SalesPerformance = apps.get_model('lotto', 'SalesPerformance')
+    UserStats = apps.get_model('lotto', 'UserStats')
+
+    stats = {}
+    rows = Purchase.objects.values('user_id').annotate(count=Count('id')).order_by()
+    for row in rows.iterator():
+        entry = stats.setdefault(row['user_id'], UserStats(user_id=row['user_id']))
+        entry.tickets += row['count']
+        entry.spend += row['count'] * TICKET_PRICE
+
+    performances = SalesPerformance.objects.select_related('round').filter(round__winning_mask__isnull=False)
+    for performance in performances:
+        lotto_round = performance.round
+        purchases = Purchase.objects.filter(round=lotto_round).values_list('user_id', 'number_mask')
+        for user_id, mask in purchases.iterator(chunk_size=2000):
+            rank = _rank(mask, lotto_round.winning_mask, lotto_round.bonus_number)
+            if rank:
+                entry = stats[user_id]
+                setattr(entry, f'rank{rank}_wins', getattr(entry, f'rank{rank}_wins') + 1)
+                entry.prize_won += getattr(performance, f'rank{rank}_prize')
+    UserStats.objects.bulk_create(stats.values(), batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0014_userstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
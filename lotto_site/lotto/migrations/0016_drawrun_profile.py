@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-16 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0015_backfill_user_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='drawrun',
+            name='profile',
+            field=models.JSONField(blank=True, default=dict, verbose_name='단계별 프로파일'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-16 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lotto', '0016_drawrun_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='drawrun',
+            name='owner',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='실행자 토큰'),
+        ),
+    ]
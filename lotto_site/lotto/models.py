@@ -1,8 +1,23 @@
+from functools import reduce
+import operator
+
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.lookups import Exact, GreaterThanOrEqual
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone 
 
+from .combination import combination_numbers, combination_rank
+from .draw_profile import profile_rows
+from .rank_engine import numbers_to_mask
+
+# 로또 1장 가격 (원)
+TICKET_PRICE = 1000
+
 # 로또 번호는 1부터 45 사이의 값만 유효하도록 검증합니다.
 LOTTO_NUMBER_VALIDATORS = [
     MinValueValidator(1, message="로또 번호는 1보다 작을 수 없습니다."),
@@ -42,6 +57,30 @@ class LottoRound(models.Model):
         blank=True
     )
 
+    # 당첨 번호 6개를 45비트 정수로 압축한 값 (번호 n -> (n - 1)번째 비트). 추첨 전에는 NULL
+    winning_mask = models.BigIntegerField(
+        verbose_name="당첨 번호 마스크",
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
+    # 당첨 번호 6개의 조합 번호 (combination.combination_rank). 추첨 전에는 NULL
+    combination = models.IntegerField(
+        verbose_name="당첨 조합 번호",
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
+
+    def save(self, *args, **kwargs):
+        # 당첨 번호가 확정된 경우에만 마스크와 조합 번호를 함께 저장합니다.
+        winning_numbers = self.get_winning_numbers()
+        self.winning_mask = numbers_to_mask(winning_numbers) if winning_numbers else None
+        self.combination = combination_rank(winning_numbers) if winning_numbers else None
+        super().save(*args, **kwargs)
+
     def get_winning_numbers(self):
         """당첨 번호 6개를 리스트로 반환 (None이 아닐 경우에만)"""
         if self.num1 is None:
@@ -51,6 +90,148 @@ class LottoRound(models.Model):
     def __str__(self):
         return f"제 {self.round} 회차 (추첨 완료: {self.actual_draw_date.strftime('%Y-%m-%d %H:%M') if self.actual_draw_date else '미완료'})"
 
+def match_count_expression(winning_numbers, mask_field='number_mask'):
+    """
+    티켓 마스크에서 당첨 번호 각각의 비트를 꺼내 더하는 SQL 식을 만듭니다.
+    winning_numbers에는 정수 또는 F('round__num1') 같은 식을 넣을 수 있습니다.
+    """
+    mask = F(mask_field)
+    return reduce(operator.add, [mask.bitrightshift(number - 1).bitand(1) for number in winning_numbers])
+
+
+def bonus_match_expression(bonus_number, mask_field='number_mask'):
+    """티켓 마스크에 보너스 번호 비트가 켜져 있으면 1, 아니면 0이 되는 SQL 식을 만듭니다."""
+    return F(mask_field).bitrightshift(bonus_number - 1).bitand(1)
+
+
+def rank_whens(matched, bonus_matched):
+    """
+    일치 개수와 보너스 일치 여부 식으로 1~5등을 판정하는 When 목록을 만듭니다.
+    (일치 개수 * 2 + 보너스 일치)를 키로 사용하며, rank_engine의 등수 조회 테이블과 같은 규칙입니다.
+    """
+    key = matched * 2 + bonus_matched
+    return [
+        When(GreaterThanOrEqual(key, 12), then=Value(1)),
+        When(Exact(key, 11), then=Value(2)),
+        When(Exact(key, 10), then=Value(3)),
+        When(GreaterThanOrEqual(key, 8), then=Value(4)),
+        When(GreaterThanOrEqual(key, 6), then=Value(5)),
+    ]
+
+
+class PurchaseQuerySet(models.QuerySet):
+    """구매 기록을 DB 안에서 당첨 판정하기 위한 쿼리셋"""
+
+    def with_rank(self, lotto_round=None):
+        """
+        SQL 비트 연산으로 각 구매에 일치 개수(matched)와 당첨 등수(winning_rank)를 주석으로 붙입니다.
+        winning_rank는 1~5등, 0(낙첨), -1(추첨 대기) 중 하나입니다.
+
+        :param lotto_round: 한 회차만 조회할 때 넘기면 당첨 번호를 상수로 사용해 JOIN 없이 계산합니다.
+        """
+        # 추첨 전 회차(또는 회차 정보가 없는 구매)는 -1로 표시합니다.
+        pending = []
+        if lotto_round is not None:
+            if lotto_round.num1 is None:
+                return self.annotate(matched=Value(0), winning_rank=Value(-1))
+            winning_numbers = lotto_round.get_winning_numbers()
+            bonus_number = lotto_round.bonus_number
+        else:
+            winning_numbers = [F(f'round__num{i}') for i in range(1, 7)]
+            bonus_number = F('round__bonus_number')
+            pending = [When(round__winning_mask__isnull=True, then=Value(-1))]
+
+        return self.annotate(
+            matched=match_count_expression(winning_numbers),
+            bonus_matched=bonus_match_expression(bonus_number),
+        ).annotate(
+            winning_rank=Case(
+                *pending,
+                *rank_whens(F('matched'), F('bonus_matched')),
+                default=Value(0),
+                output_field=models.IntegerField(),
+            )
+        )
+
+    def record_results(self, lotto_round):
+        """
+        추첨이 끝난 회차의 당첨 결과(match_count, rank)를 한 번의 UPDATE 문으로 저장합니다.
+        당첨 번호를 상수로 넣은 SQL 비트 연산을 사용하므로 구매 행을 Python으로 가져오지 않습니다.
+
+        :return: 갱신된 구매 장수
+        """
+        matched = match_count_expression(lotto_round.get_winning_numbers())
+        bonus_matched = bonus_match_expression(lotto_round.bonus_number)
+        return self.filter(round=lotto_round).update(
+            match_count=matched,
+            rank=Case(*rank_whens(matched, bonus_matched), default=Value(0)),
+        )
+
+    def history_of(self, user):
+        """
+        사용자의 구매 내역을 최신순(purchase_date, id 내림차순)으로 정렬하여 반환합니다.
+        (user, purchase_date, id) 복합 인덱스를 그대로 거꾸로 읽으므로 정렬 비용이 없습니다.
+        """
+        return self.filter(user=user).order_by('-purchase_date', '-id')
+
+    def older_than(self, purchase_date, pk):
+        """
+        (purchase_date, id)가 주어진 값보다 앞선 구매만 남깁니다. (키셋 페이지네이션의 커서 조건)
+        purchase_date <= 값 범위 조건을 함께 두어 인덱스 범위 탐색으로 처리되게 합니다.
+        """
+        return self.filter(purchase_date__lte=purchase_date).filter(
+            Q(purchase_date__lt=purchase_date) | Q(pk__lt=pk)
+        )
+
+    def containing_numbers(self, numbers):
+        """지정한 번호를 모두 포함하는 구매만 남깁니다. (number_mask & 질의 마스크 = 질의 마스크)"""
+        query_mask = numbers_to_mask(numbers)
+        return self.alias(contained_bits=F('number_mask').bitand(query_mask)).filter(contained_bits=query_mask)
+
+    def overlapping_numbers(self, numbers, min_matches):
+        """지정한 번호 중 min_matches개 이상을 포함하는 구매만 남깁니다. (마스크 비트 합계 비교)"""
+        return self.alias(overlap=match_count_expression(numbers)).filter(overlap__gte=min_matches)
+
+    def with_combination(self, numbers):
+        """번호 조합이 정확히 같은 구매만 남깁니다. (조합 번호 일치 검색)"""
+        return self.filter(combination=combination_rank(numbers))
+
+    def combination_popularity(self, limit=10):
+        """
+        같은 조합을 산 티켓이 많은 순으로 [(번호 리스트, 장수), ...]를 반환합니다.
+        회차로 거른 쿼리셋에서 호출하면 (round, combination) 인덱스만 읽어 GROUP BY합니다.
+        """
+        rows = (
+            self.filter(combination__isnull=False)
+            .order_by()
+            .values('combination')
+            .annotate(count=Count('id'))
+            .order_by('-count', 'combination')[:limit]
+        )
+        return [(combination_numbers(row['combination']), row['count']) for row in rows]
+
+    def jackpot_winners(self, lotto_round):
+        """
+        회차의 1등 당첨 구매(당첨 번호 6개와 조합이 같은 구매)를 반환합니다.
+        (round, combination) 인덱스 한 번의 탐색으로 찾으므로 결과 저장 전에도 바로 쓸 수 있습니다.
+        """
+        if lotto_round.combination is None:
+            return self.none()
+        return self.filter(round=lotto_round, combination=lotto_round.combination)
+
+    def rank_counts(self):
+        """
+        저장된 당첨 결과(rank)를 기준으로 등수별 구매 장수를 한 번의 GROUP BY 집계로 반환합니다.
+        반환값은 {0: 낙첨, 1: 1등, ..., 5: 5등} 형태이며 추첨 대기(rank가 NULL)는 제외합니다.
+        """
+        counts = {rank: 0 for rank in range(0, 6)}
+        rows = self.order_by().values('rank').annotate(count=Count('id'))
+        for row in rows:
+            if row['rank'] in counts:
+                counts[row['rank']] = row['count']
+        return counts
+
+
 class Purchase(models.Model):
     """
     사용자의 로또 구매 기록을 저장하는 모델 (사용자 기능)
@@ -80,6 +261,45 @@ class Purchase(models.Model):
     p_num5 = models.IntegerField(validators=LOTTO_NUMBER_VALIDATORS)
     p_num6 = models.IntegerField(validators=LOTTO_NUMBER_VALIDATORS)
 
+    # 구매 번호 6개를 45비트 정수로 압축한 값 (번호 n -> (n - 1)번째 비트)
+    number_mask = models.BigIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        verbose_name="구매 번호 마스크",
+    )
+    # 구매 번호 6개의 조합 번호 (0 이상 8,145,060 미만, combination.combination_rank)
+    combination = models.IntegerField(null=True, blank=True, editable=False, verbose_name="구매 조합 번호")
+
+    # 추첨 시점에 finalize_lotto_round가 저장하는 당첨 결과 (추첨 전에는 NULL)
+    match_count = models.SmallIntegerField(null=True, blank=True, editable=False, verbose_name="일치 개수")
+    rank = models.SmallIntegerField(null=True, blank=True, editable=False, verbose_name="당첨 등수")
+
+    objects = PurchaseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # 회차별 등수 조회(예: N회차 1등 당첨 구매)용 인덱스
+            models.Index(fields=['round', 'rank'], name='purchase_round_rank_idx'),
+            # 사용자별 구매 내역 키셋 페이지네이션(최신순)용 인덱스
+            models.Index(fields=['user', 'purchase_date', 'id'], name='purchase_user_date_idx'),
+            # 회차별 같은 조합 티켓 수, 인기 조합 집계, 1등 당첨 구매 조회용 인덱스
+            models.Index(fields=['round', 'combination'], name='purchase_round_combo_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.update_number_keys()
+        super().save(*args, **kwargs)
+
+    def update_number_keys(self):
+        """
+        구매 번호로 number_mask와 combination을 계산합니다.
+        (save()를 거치지 않는 bulk_create 전에 호출)
+        """
+        numbers = self.get_purchased_numbers()
+        self.number_mask = numbers_to_mask(numbers)
+        self.combination = combination_rank(numbers)
+
     def get_purchased_numbers(self):
         """구매한 번호 6개를 리스트로 반환"""
         return sorted([self.p_num1, self.p_num2, self.p_num3, self.p_num4, self.p_num5, self.p_num6])
@@ -100,7 +320,204 @@ class SalesPerformance(models.Model):
     rank1_winners = models.IntegerField(default=0, verbose_name="1등 당첨자")
     rank2_winners = models.IntegerField(default=0, verbose_name="2등 당첨자")
     rank3_winners = models.IntegerField(default=0, verbose_name="3등 당첨자")
-    
+    rank4_winners = models.IntegerField(default=0, verbose_name="4등 당첨자")
+    rank5_winners = models.IntegerField(default=0, verbose_name="5등 당첨자")
+
+    # 당첨금 정산 (prizes.compute_payouts)
+    total_revenue = models.BigIntegerField(default=0, verbose_name="총 판매 금액 (원)")
+    prize_pool = models.BigIntegerField(default=0, verbose_name="총 당첨금 (원)")
+    carryover_in = models.BigIntegerField(default=0, verbose_name="이전 회차 이월금 (원)")
+    carryover_out = models.BigIntegerField(default=0, verbose_name="다음 회차 이월금 (원)")
+    total_payout = models.BigIntegerField(default=0, verbose_name="총 지급액 (원)")
+
+    # 등수별 1인당 당첨금 (원)
+    rank1_prize = models.BigIntegerField(default=0, verbose_name="1등 1인당 당첨금")
+    rank2_prize = models.BigIntegerField(default=0, verbose_name="2등 1인당 당첨금")
+    rank3_prize = models.BigIntegerField(default=0, verbose_name="3등 1인당 당첨금")
+    rank4_prize = models.BigIntegerField(default=0, verbose_name="4등 1인당 당첨금")
+    rank5_prize = models.BigIntegerField(default=0, verbose_name="5등 1인당 당첨금")
+
+    def get_rank_rows(self):
+        """등수별 [(등수, 당첨자 수, 1인당 당첨금, 등수 지급액), ...]을 필드 값만으로 만듭니다. (추가 쿼리 없음)"""
+        rows = []
+        for rank in range(1, 6):
+            winners = getattr(self, f'rank{rank}_winners')
+            prize = getattr(self, f'rank{rank}_prize')
+            rows.append((rank, winners, prize, winners * prize))
+        return rows
+
     def __str__(self):
         # 사용자 요청 사항 반영
-        return f"제 {self.round.round} 회차 판매 실적"
\ No newline at end of file
+        return f"제 {self.round.round} 회차 판매 실적"
+
+class UserStats(models.Model):
+    """
+    사용자별 누적 통계 (구매 장수, 구매 금액, 등수별 당첨 장수, 당첨금)
+    구매 시 구매 장수/금액을, 추첨 완료 시 당첨 장수/당첨금을 증가시키므로 조회할 때 구매 기록을 다시 집계하지 않습니다.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='lotto_stats', verbose_name="사용자")
+    tickets = models.IntegerField(default=0, verbose_name="누적 구매 장수")
+    spend = models.BigIntegerField(default=0, verbose_name="누적 구매 금액 (원)")
+
+    rank1_wins = models.IntegerField(default=0, verbose_name="1등 당첨")
+    rank2_wins = models.IntegerField(default=0, verbose_name="2등 당첨")
+    rank3_wins = models.IntegerField(default=0, verbose_name="3등 당첨")
+    rank4_wins = models.IntegerField(default=0, verbose_name="4등 당첨")
+    rank5_wins = models.IntegerField(default=0, verbose_name="5등 당첨")
+    prize_won = models.BigIntegerField(default=0, verbose_name="누적 당첨금 (원)")
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="마지막 갱신")
+
+    @property
+    def total_wins(self):
+        return self.rank1_wins + self.rank2_wins + self.rank3_wins + self.rank4_wins + self.rank5_wins
+
+    @property
+    def net_result(self):
+        """누적 당첨금 - 누적 구매 금액 (원)"""
+        return self.prize_won - self.spend
+
+    def __str__(self):
+        return f"{self.user.username}님의 누적 통계"
+
+
+class RoundSalesCounter(models.Model):
+    """
+    회차별 실시간 판매 카운터 (관리자 기능)
+    구매 시 같은 트랜잭션 안에서 F() 식으로 증가시키며, 동시 구매자가 한 행에 몰리지 않도록
+    회차마다 여러 개의 샤드 행으로 나누어 저장합니다. 회차의 판매 실적은 샤드 합계입니다.
+    """
+    round = models.ForeignKey(LottoRound, on_delete=models.CASCADE, related_name='sales_counters', verbose_name="회차")
+    shard = models.PositiveSmallIntegerField(verbose_name="샤드 번호")
+
+    tickets = models.IntegerField(default=0, verbose_name="판매 장수")
+    auto_tickets = models.IntegerField(default=0, verbose_name="자동 판매 장수")
+    manual_tickets = models.IntegerField(default=0, verbose_name="수동 판매 장수")
+    revenue = models.BigIntegerField(default=0, verbose_name="판매 금액 (원)")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['round', 'shard'], name='unique_round_sales_counter_shard'),
+        ]
+
+    def __str__(self):
+        return f"제 {self.round.round} 회차 판매 카운터 #{self.shard}"
+
+
+# 진행 중(running) 상태인데 이 시간 동안 진행 기록이 없으면 중단된 작업으로 보고 다시 가져갑니다.
+# settings.LOTTO_DRAW_STALE_AFTER(초)로 변경할 수 있습니다.
+DEFAULT_STALE_AFTER = 300
+
+
+def get_stale_after():
+    """중단된 작업으로 판단하는 기준 시간을 반환합니다."""
+    return timedelta(seconds=getattr(settings, 'LOTTO_DRAW_STALE_AFTER', DEFAULT_STALE_AFTER))
+
+
+class DrawRun(models.Model):
+    """
+    회차 추첨 및 당첨 집계 작업의 진행 상태를 저장하는 모델 (관리자 기능)
+    작업은 요청 밖(백그라운드 스레드 또는 run_draws 명령어)에서 실행되며,
+    마지막으로 처리한 구매 id를 기록하므로 중단되더라도 이어서 실행할 수 있습니다.
+    """
+    STATE_PENDING = 'pending'
+    STATE_RUNNING = 'running'
+    STATE_DONE = 'done'
+    STATE_FAILED = 'failed'
+    STATE_CHOICES = [
+        (STATE_PENDING, '대기'),
+        (STATE_RUNNING, '진행 중'),
+        (STATE_DONE, '완료'),
+        (STATE_FAILED, '실패'),
+    ]
+
+    PHASE_DRAW = 'draw'
+    PHASE_RANK = 'rank'
+    PHASE_FINISH = 'finish'
+    PHASE_DONE = 'done'
+    PHASE_CHOICES = [
+        (PHASE_DRAW, '당첨 번호 추첨'),
+        (PHASE_RANK, '당첨 판정'),
+        (PHASE_FINISH, '판매 실적 저장'),
+        (PHASE_DONE, '완료'),
+    ]
+
+    # 회차당 하나의 작업만 존재하므로, 재실행은 항상 같은 기록을 이어서 진행합니다.
+    round = models.OneToOneField(LottoRound, on_delete=models.CASCADE, related_name='draw_run', verbose_name="회차")
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default=STATE_PENDING, verbose_name="상태")
+    phase = models.CharField(max_length=10, choices=PHASE_CHOICES, default=PHASE_DRAW, verbose_name="단계")
+
+    total_tickets = models.IntegerField(default=0, verbose_name="판정 대상 장수")
+    processed_tickets = models.IntegerField(default=0, verbose_name="판정 완료 장수")
+    last_processed_id = models.BigIntegerField(default=0, verbose_name="마지막 처리 구매 id")
+
+    # 판정이 끝난 청크까지의 등수별 당첨자 수 (청크 결과와 같은 트랜잭션에서 갱신)
+    rank1_count = models.IntegerField(default=0, verbose_name="1등")
+    rank2_count = models.IntegerField(default=0, verbose_name="2등")
+    rank3_count = models.IntegerField(default=0, verbose_name="3등")
+    rank4_count = models.IntegerField(default=0, verbose_name="4등")
+    rank5_count = models.IntegerField(default=0, verbose_name="5등")
+
+    # 단계별 누적 소요 시간(초). 예: {"draw": 0.01, "rank": 12.3, "finish": 0.02}
+    phase_timings = models.JSONField(default=dict, blank=True, verbose_name="단계별 소요 시간")
+    # 세부 단계별 프로파일 (draw_profile.py)
+    # 예: {"steps": {"fetch": {"seconds": 1.2, "rows": 100000}, ...}, "max_rss": 123456789, "artifacts": [...]}
+    profile = models.JSONField(default=dict, blank=True, verbose_name="단계별 프로파일")
+    error = models.TextField(blank=True, verbose_name="오류 메시지")
+    # 작업을 가져간 실행자의 토큰 (claim_draw_run). 진행 기록은 이 토큰이 일치할 때만 저장됩니다.
+    owner = models.CharField(max_length=32, blank=True, editable=False, verbose_name="실행자 토큰")
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성 일시")
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="마지막 진행 일시")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="완료 일시")
+
+    def get_rank_counts(self):
+        """등수별 당첨자 수를 {1: n1, ..., 5: n5} 형태로 반환"""
+        return {rank: getattr(self, f'rank{rank}_count') for rank in range(1, 6)}
+
+    def add_phase_time(self, phase, seconds):
+        """단계별 소요 시간에 seconds를 더합니다. (재개된 작업은 이전 시간에 누적)"""
+        self.phase_timings[phase] = round(self.phase_timings.get(phase, 0) + seconds, 4)
+
+    def get_profile_rows(self):
+        """단계별 소요 시간, 처리 행 수, 초당 처리 행 수, 최대 메모리 목록"""
+        return profile_rows(self.profile)
+
+    @property
+    def is_stale(self):
+        """진행 중인데 진행 기록이 오래되어 중단된 것으로 보는 작업인지 여부 (이어서 실행할 수 있음)"""
+        return (
+            self.state == self.STATE_RUNNING
+            and self.heartbeat_at is not None
+            and self.heartbeat_at < timezone.now() - get_stale_after()
+        )
+
+    @property
+    def progress_percent(self):
+        if self.state == self.STATE_DONE:
+            return 100
+        if not self.total_tickets:
+            return 0
+        return min(100, int(self.processed_tickets * 100 / self.total_tickets))
+
+    def to_status_dict(self):
+        """대시보드 진행률 조회(JSON)에 사용할 상태 정보"""
+        return {
+            'id': self.pk,
+            'round': self.round.round,
+            'state': self.state,
+            'state_display': self.get_state_display(),
+            'stale': self.is_stale,
+            'phase': self.phase,
+            'phase_display': self.get_phase_display(),
+            'total_tickets': self.total_tickets,
+            'processed_tickets': self.processed_tickets,
+            'progress_percent': self.progress_percent,
+            'rank_counts': self.get_rank_counts(),
+            'phase_timings': self.phase_timings,
+            'profile': self.profile,
+            'error': self.error,
+        }
+
+    def __str__(self):
+        return f"제 {self.round.round} 회차 추첨 작업 ({self.get_state_display()})"
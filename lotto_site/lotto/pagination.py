@@ -0,0 +1,63 @@
+# lotto/pagination.py
+"""
+구매 내역의 키셋(커서) 페이지네이션.
+
+OFFSET 방식은 뒤 페이지로 갈수록 앞의 행을 모두 건너뛰어야 하므로 느려집니다.
+키셋 방식은 이전 페이지 마지막 구매의 (purchase_date, id)를 커서로 넘겨 그보다 앞선 구매만 읽으므로,
+(user, purchase_date, id) 인덱스 위에서 페이지 깊이와 관계없이 한 번의 LIMIT 쿼리로 끝납니다.
+커서는 "구매 시각(에포크 마이크로초).구매 id" 형태의 문자열입니다.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+# 한 페이지에 보여 줄 구매 장수
+DEFAULT_PAGE_SIZE = 50
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_cursor(purchase):
+    """구매의 (purchase_date, id)를 URL에 넣을 커서 문자열로 변환합니다."""
+    return f"{(purchase.purchase_date - _EPOCH) // _MICROSECOND}.{purchase.pk}"
+
+
+def decode_cursor(value):
+    """
+    커서 문자열을 (purchase_date, id)로 되돌립니다.
+
+    :return: (datetime, int) 튜플, 형식이 잘못되었으면 None (첫 페이지로 처리)
+    """
+    try:
+        microseconds, pk = value.split('.')
+        return _EPOCH + timedelta(microseconds=int(microseconds)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, size=DEFAULT_PAGE_SIZE):
+    """
+    history_of()로 최신순 정렬된 구매 쿼리셋에서 커서 다음 페이지를 가져옵니다.
+    다음 페이지 존재 여부를 알기 위해 size + 1건을 읽으며, 쿼리는 한 번만 실행됩니다.
+
+    :param cursor: 이전 페이지가 넘겨준 커서 문자열 (없으면 첫 페이지)
+    :return: (구매 목록, 다음 페이지 커서 또는 None)
+    """
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        queryset = queryset.older_than(*position)
+    return _split_page(list(queryset[:size + 1]), size)
+
+
+async def akeyset_page(queryset, cursor=None, size=DEFAULT_PAGE_SIZE):
+    """keyset_page()의 비동기 버전 (비동기 ORM으로 한 번 조회)"""
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        queryset = queryset.older_than(*position)
+    return _split_page([item async for item in queryset[:size + 1]], size)
+
+
+def _split_page(items, size):
+    if len(items) > size:
+        items = items[:size]
+        return items, encode_cursor(items[-1])
+    return items, None
@@ -0,0 +1,58 @@
+# lotto/prizes.py
+"""
+회차의 등수별 당첨자 수와 판매 금액으로 당첨금을 계산하는 모듈.
+
+  - 총 당첨금(prize pool)은 판매 금액의 50%입니다.
+  - 4등(50,000원)과 5등(5,000원)은 고정 금액을 먼저 지급합니다.
+  - 남은 금액을 1등 75%, 2등 12.5%, 3등 12.5%로 나누고, 등수 안에서는 당첨자 수로 똑같이 나눕니다. (pari-mutuel)
+  - 당첨자가 없는 1~3등의 몫은 다음 회차 1등 당첨금으로 이월됩니다.
+1인당 당첨금의 원 단위 미만은 버리며, 나누고 남은 금액(원 단위 나머지)도 다음 회차로 이월하므로
+고정 당첨금이 총 당첨금을 넘지 않는 한 (총 당첨금 + 이월 받은 금액) = (총 지급액 + 이월금)이 항상 성립합니다.
+"""
+
+# 판매 금액 중 당첨금으로 쓰는 비율 (%)
+PRIZE_POOL_PERCENT = 50
+
+# 고정 당첨금 (원)
+FIXED_PRIZES = {4: 50_000, 5: 5_000}
+
+# 고정 당첨금을 뺀 나머지의 등수별 배분 비율 (만분율)
+POOL_SHARES = {1: 7_500, 2: 1_250, 3: 1_250}
+
+
+def compute_payouts(revenue, rank_counts, carryover_in=0):
+    """
+    등수별 1인당 당첨금과 총 지급액을 계산합니다.
+
+    :param revenue: 회차 판매 금액 (원)
+    :param rank_counts: {1: n1, ..., 5: n5} 등수별 당첨 장수
+    :param carryover_in: 이전 회차에서 이월되어 1등 당첨금에 더해지는 금액 (원)
+    :return: {'prize_pool', 'rank_prizes': {등수: 1인당 당첨금}, 'total_payout', 'carryover_out'}
+    """
+    prize_pool = revenue * PRIZE_POOL_PERCENT // 100
+    fixed_total = sum(prize * rank_counts.get(rank, 0) for rank, prize in FIXED_PRIZES.items())
+    # 고정 당첨금이 총 당첨금을 넘으면 1~3등 배분액은 0입니다.
+    remaining = max(prize_pool - fixed_total, 0)
+
+    rank_prizes = dict(FIXED_PRIZES)
+    # 등수별 배분에서 나누어떨어지지 않고 남은 금액은 이월금에 포함합니다.
+    carryover_out = remaining - sum(remaining * share // 10_000 for share in POOL_SHARES.values())
+    for rank, share in POOL_SHARES.items():
+        rank_pool = remaining * share // 10_000
+        if rank == 1:
+            rank_pool += carryover_in
+        winners = rank_counts.get(rank, 0)
+        if winners:
+            rank_prizes[rank] = rank_pool // winners
+            carryover_out += rank_pool - rank_prizes[rank] * winners
+        else:
+            rank_prizes[rank] = 0
+            carryover_out += rank_pool
+
+    total_payout = sum(rank_prizes[rank] * rank_counts.get(rank, 0) for rank in rank_prizes)
+    return {
+        'prize_pool': prize_pool,
+        'rank_prizes': {rank: rank_prizes[rank] for rank in sorted(rank_prizes)},
+        'total_payout': total_payout,
+        'carryover_out': carryover_out,
+    }
@@ -0,0 +1,124 @@
+# lotto/rank_engine.py
+"""
+로또 티켓을 45비트 정수 마스크로 표현하여 당첨 등수를 일괄 판정하는 배치 엔진.
+
+번호 n(1~45)은 마스크의 (n - 1)번째 비트에 대응합니다.
+티켓 마스크와 당첨 마스크의 AND 결과에서 켜진 비트 수(popcount)가 일치 개수가 되고,
+보너스 비트 검사로 2등과 3등을 구분합니다.
+"""
+import numpy as np
+
+NUMBER_COUNT = 45
+
+# (일치 개수 * 2 + 보너스 일치 여부)를 인덱스로 하는 등수 조회 테이블
+_RANK_TABLE = np.zeros(14, dtype=np.int8)
+_RANK_TABLE[3 * 2:3 * 2 + 2] = 5
+_RANK_TABLE[4 * 2:4 * 2 + 2] = 4
+_RANK_TABLE[5 * 2] = 3
+_RANK_TABLE[5 * 2 + 1] = 2
+_RANK_TABLE[6 * 2:6 * 2 + 2] = 1
+
+# numpy 2.0 미만을 위한 바이트 단위 popcount 조회 테이블
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def numbers_to_mask(numbers):
+    """번호 목록을 45비트 정수 마스크로 변환합니다."""
+    mask = 0
+    for number in numbers:
+        mask |= 1 << (number - 1)
+    return mask
+
+
+def mask_to_numbers(mask):
+    """45비트 정수 마스크를 오름차순 번호 리스트로 되돌립니다."""
+    return [number for number in range(1, NUMBER_COUNT + 1) if mask >> (number - 1) & 1]
+
+
+def masks_from_rows(rows):
+    """
+    (p_num1, ..., p_num6) 형태의 행 목록을 uint64 마스크 배열로 변환합니다.
+
+    :param rows: 6개 번호로 이루어진 튜플/리스트의 시퀀스 또는 (N, 6) 배열
+    :return: 길이 N의 numpy.uint64 배열
+    """
+    numbers = np.asarray(rows, dtype=np.uint64).reshape(-1, 6)
+    bits = np.left_shift(np.uint64(1), numbers - np.uint64(1))
+    return np.bitwise_or.reduce(bits, axis=1, initial=np.uint64(0))
+
+
+def popcount(masks):
+    """uint64 마스크 배열의 원소별 켜진 비트 수를 반환합니다."""
+    masks = np.asarray(masks, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks)
+    as_bytes = masks.reshape(-1, 1).view(np.uint8)
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=1, dtype=np.uint8).reshape(masks.shape)
+
+
+def match_and_rank(masks, winning_mask, bonus_number):
+    """
+    티켓 마스크 배열 전체의 일치 개수와 당첨 등수를 한 번의 벡터 연산으로 판정합니다.
+
+    :param masks: 티켓 마스크 배열 (numpy.uint64)
+    :param winning_mask: 당첨 번호 6개의 마스크 (정수)
+    :param bonus_number: 보너스 번호 1개 (정수)
+    :return: (일치 개수 배열, 등수 배열) 튜플 (둘 다 numpy.int8, 등수 0은 낙첨)
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    match_counts = popcount(masks & np.uint64(winning_mask)).astype(np.int8)
+    has_bonus = (masks >> np.uint64(bonus_number - 1)) & np.uint64(1)
+    ranks = _RANK_TABLE[match_counts.astype(np.intp) * 2 + has_bonus.astype(np.intp)]
+    return match_counts, ranks
+
+
+def rank_masks(masks, winning_mask, bonus_number):
+    """
+    티켓 마스크 배열 전체의 당첨 등수를 한 번의 벡터 연산으로 판정합니다.
+
+    :param masks: 티켓 마스크 배열 (numpy.uint64)
+    :param winning_mask: 당첨 번호 6개의 마스크 (정수)
+    :param bonus_number: 보너스 번호 1개 (정수)
+    :return: 등수 배열 (numpy.int8, 1~5 또는 0은 낙첨)
+    """
+    return match_and_rank(masks, winning_mask, bonus_number)[1]
+
+
+def rank_matrix(masks, winning_masks, bonus_numbers):
+    """
+    티켓 여러 장을 여러 회차의 당첨 번호와 한 번에 비교하여 (티켓 수, 회차 수) 등수 행렬을 만듭니다.
+
+    :param masks: 티켓 마스크 배열 (길이 T)
+    :param winning_masks: 회차별 당첨 마스크 배열 (길이 R)
+    :param bonus_numbers: 회차별 보너스 번호 배열 (길이 R)
+    :return: (T, R) 등수 배열 (numpy.int8, 1~5 또는 0은 낙첨)
+    """
+    masks = np.asarray(masks, dtype=np.uint64)[:, np.newaxis]
+    winning_masks = np.asarray(winning_masks, dtype=np.uint64)[np.newaxis, :]
+    bonus_shifts = np.asarray(bonus_numbers, dtype=np.uint64)[np.newaxis, :] - np.uint64(1)
+    match_counts = popcount(masks & winning_masks).astype(np.intp)
+    has_bonus = ((masks >> bonus_shifts) & np.uint64(1)).astype(np.intp)
+    return _RANK_TABLE[match_counts * 2 + has_bonus]
+
+
+def rank_tickets(rows, winning_numbers, bonus_number):
+    """번호 행 목록을 마스크로 변환한 뒤 등수 배열을 반환합니다."""
+    return rank_masks(masks_from_rows(rows), numbers_to_mask(winning_numbers), bonus_number)
+
+
+def count_ranks(ranks):
+    """등수 배열을 {1: n1, ..., 5: n5} 형태의 당첨자 수 딕셔너리로 집계합니다."""
+    counts = np.bincount(np.asarray(ranks, dtype=np.intp), minlength=6)
+    return {rank: int(counts[rank]) for rank in range(1, 6)}
+
+
+def rank_numbers(purchased_numbers, winning_numbers, bonus_number):
+    """
+    티켓 1장의 등수를 마스크 연산으로 판정합니다.
+    결과는 utils.determine_lotto_rank와 동일합니다.
+    """
+    ticket_mask = numbers_to_mask(purchased_numbers)
+    match_count = (ticket_mask & numbers_to_mask(winning_numbers)).bit_count()
+    has_bonus = bool(ticket_mask >> (bonus_number - 1) & 1)
+    return int(_RANK_TABLE[match_count * 2 + has_bonus])
+
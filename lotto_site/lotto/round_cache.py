@@ -0,0 +1,147 @@
+# lotto/round_cache.py
+"""
+거의 모든 요청이 읽는 회차 상태(구매 가능한 회차, 가장 최근 추첨 완료 회차)를 캐시하는 모듈.
+
+두 값은 관리자가 회차를 만들거나 추첨할 때만 바뀌므로, 캐시 키에 버전 번호를 넣고
+LottoRound가 저장/삭제되면(post_save/post_delete) 버전을 올려 이전 키를 한 번에 무효화합니다.
+버전 번호는 캐시 백엔드에 저장되므로 여러 워커 프로세스가 같은 공유 캐시(Redis, Memcached 등)를
+쓰면 모든 프로세스가 함께 무효화됩니다. (기본 LocMemCache는 프로세스 하나짜리 개발용 대체재)
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import LottoRound
+
+VERSION_KEY = 'lotto:round_state:version'
+STATE_KEY = 'lotto:round_state:{version}'
+
+# settings.LOTTO_ROUND_CACHE_*로 변경할 수 있습니다.
+DEFAULT_CACHE_ALIAS = 'default'
+DEFAULT_TIMEOUT = 300
+
+
+def round_cache_enabled():
+    """settings.LOTTO_ROUND_CACHE가 꺼져 있으면 매번 DB에서 읽습니다."""
+    return getattr(settings, 'LOTTO_ROUND_CACHE', True)
+
+
+def get_cache():
+    return caches[getattr(settings, 'LOTTO_ROUND_CACHE_ALIAS', DEFAULT_CACHE_ALIAS)]
+
+
+def _new_version():
+    # 버전 키가 캐시에서 밀려나도 이전에 쓰던 번호를 다시 쓰지 않도록 시각 기반 값으로 시작합니다.
+    return time.time_ns()
+
+
+def get_state_version():
+    """현재 회차 상태 캐시 버전을 반환합니다. (없으면 새로 만듦)"""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_round_state():
+    """버전을 올려 모든 프로세스의 회차 상태 캐시를 무효화합니다."""
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # 버전 키가 없으면 새 버전으로 시작합니다.
+        cache.set(VERSION_KEY, _new_version(), timeout=None)
+
+
+def query_current_round():
+    # num1이 null (추첨 번호가 정해지지 않음)인 회차 중 가장 높은 회차
+    return LottoRound.objects.filter(num1__isnull=True).order_by('-round').first()
+
+
+def query_latest_drawn_round():
+    return LottoRound.objects.filter(actual_draw_date__isnull=False).order_by('-round').first()
+
+
+def load_round_state():
+    """DB에서 회차 상태를 읽어 {'current': 구매 가능한 회차, 'latest_drawn': 최근 추첨 완료 회차}로 반환합니다."""
+    return {'current': query_current_round(), 'latest_drawn': query_latest_drawn_round()}
+
+
+def get_round_state():
+    """회차 상태를 캐시에서 읽고, 없으면 DB에서 읽어 현재 버전 키로 저장합니다."""
+    cache = get_cache()
+    key = STATE_KEY.format(version=get_state_version())
+    state = cache.get(key)
+    if state is None:
+        state = load_round_state()
+        cache.set(key, state, getattr(settings, 'LOTTO_ROUND_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+    return state
+
+
+def get_current_round():
+    """현재 구매 가능한 회차 (없으면 None)"""
+    if not round_cache_enabled():
+        return query_current_round()
+    return get_round_state()['current']
+
+
+def get_latest_drawn_round():
+    """가장 최근 추첨이 완료된 회차 (없으면 None)"""
+    if not round_cache_enabled():
+        return query_latest_drawn_round()
+    return get_round_state()['latest_drawn']
+
+
+# 비동기 뷰(async_views.py)용: 캐시는 비동기 API로, DB는 비동기 ORM으로 읽습니다.
+
+async def aget_state_version():
+    cache = get_cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, _new_version(), timeout=None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+async def aquery_current_round():
+    return await LottoRound.objects.filter(num1__isnull=True).order_by('-round').afirst()
+
+
+async def aquery_latest_drawn_round():
+    return await LottoRound.objects.filter(actual_draw_date__isnull=False).order_by('-round').afirst()
+
+
+async def aget_round_state():
+    cache = get_cache()
+    key = STATE_KEY.format(version=await aget_state_version())
+    state = await cache.aget(key)
+    if state is None:
+        state = {'current': await aquery_current_round(), 'latest_drawn': await aquery_latest_drawn_round()}
+        await cache.aset(key, state, getattr(settings, 'LOTTO_ROUND_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+    return state
+
+
+async def aget_current_round():
+    """get_current_round()의 비동기 버전"""
+    if not round_cache_enabled():
+        return await aquery_current_round()
+    return (await aget_round_state())['current']
+
+
+async def aget_latest_drawn_round():
+    """get_latest_drawn_round()의 비동기 버전"""
+    if not round_cache_enabled():
+        return await aquery_latest_drawn_round()
+    return (await aget_round_state())['latest_drawn']
+
+
+def invalidate_on_round_change(sender, **kwargs):
+    """
+    LottoRound post_save/post_delete 신호 처리기.
+    트랜잭션이 커밋된 뒤에 버전을 올려, 다른 요청이 커밋 전 값을 새 버전 키에 저장하지 못하게 합니다.
+    """
+    transaction.on_commit(invalidate_round_state)
@@ -0,0 +1,246 @@
+# lotto/sales.py
+"""
+로또 구매 저장과 회차별 실시간 판매 카운터(RoundSalesCounter)를 관리하는 모듈.
+
+구매가 저장되는 트랜잭션 안에서 record_sale()을 호출하면 임의의 샤드 행 하나를 F() 식으로 증가시킵니다.
+판매 장수를 읽을 때는 COUNT(*) 대신 회차의 샤드 행(기본 8개)만 합산합니다.
+여러 장 구매는 purchase_tickets()가 번호 생성, bulk_create, 카운터 증가를 한 트랜잭션으로 처리합니다.
+settings.LOTTO_GROUP_COMMIT를 켜면 구매는 그룹 커밋 큐(ingest.GroupCommitQueue)를 거쳐
+다른 요청의 구매와 함께 한 트랜잭션으로 저장됩니다.
+"""
+import random
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .ingest import GroupCommitQueue
+from .instrumentation import segment
+from .models import TICKET_PRICE, LottoRound, Purchase, RoundSalesCounter
+from .user_stats import record_purchases
+
+# settings.LOTTO_SALES_COUNTER_SHARDS로 변경할 수 있습니다.
+DEFAULT_SHARD_COUNT = 8
+
+COUNTER_FIELDS = ('tickets', 'auto_tickets', 'manual_tickets', 'revenue')
+
+# settings.LOTTO_GROUP_COMMIT_*로 변경할 수 있습니다.
+DEFAULT_GROUP_COMMIT_MAX_BATCH = 500
+DEFAULT_GROUP_COMMIT_MAX_DELAY = 0.005
+DEFAULT_GROUP_COMMIT_TIMEOUT = 30
+
+_ingest_queue = None
+_ingest_queue_lock = threading.Lock()
+
+
+class RoundClosedError(ValueError):
+    """구매를 저장하려는 회차가 이미 추첨된 경우"""
+
+
+def get_shard_count():
+    """설정된 카운터 샤드 수를 반환합니다."""
+    return getattr(settings, 'LOTTO_SALES_COUNTER_SHARDS', DEFAULT_SHARD_COUNT)
+
+
+def ensure_counter_shards(lotto_round):
+    """회차의 카운터 샤드 행을 미리 만들어 둡니다. (이미 있는 샤드는 건너뜀)"""
+    RoundSalesCounter.objects.bulk_create(
+        [RoundSalesCounter(round=lotto_round, shard=shard) for shard in range(get_shard_count())],
+        ignore_conflicts=True,
+    )
+
+
+def record_sale(lotto_round, auto=0, manual=0):
+    """
+    판매 장수를 카운터에 더합니다. 구매를 저장하는 트랜잭션 안에서 호출해야 구매와 카운터가 함께 커밋됩니다.
+
+    :param lotto_round: 구매 회차
+    :param auto: 자동 구매 장수
+    :param manual: 수동 구매 장수
+    """
+    tickets = auto + manual
+    shard = random.randrange(get_shard_count())
+    increments = {
+        'tickets': F('tickets') + tickets,
+        'auto_tickets': F('auto_tickets') + auto,
+        'manual_tickets': F('manual_tickets') + manual,
+        'revenue': F('revenue') + tickets * TICKET_PRICE,
+    }
+    counters = RoundSalesCounter.objects.filter(round=lotto_round, shard=shard)
+    if counters.update(**increments):
+        return
+
+    # 샤드 행이 아직 없는 회차(이전에 만들어진 회차 등)는 행을 만든 뒤 다시 증가시킵니다.
+    try:
+        with transaction.atomic():
+            RoundSalesCounter.objects.create(
+                round=lotto_round, shard=shard,
+                tickets=tickets, auto_tickets=auto, manual_tickets=manual,
+                revenue=tickets * TICKET_PRICE,
+            )
+    except IntegrityError:
+        # 다른 요청이 같은 샤드 행을 먼저 만든 경우
+        counters.update(**increments)
+
+
+def generate_auto_number_rows(count, rng=None):
+    """
+    자동 번호 count장을 한 번의 벡터 연산으로 생성합니다.
+    장마다 45개 난수의 정렬 순서에서 앞 6개를 골라 1~45 중 중복 없는 번호를 만듭니다.
+
+    :return: 오름차순 정렬된 (count, 6) 정수 배열
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    rows = np.argsort(rng.random((count, 45)), axis=1)[:, :6] + 1
+    rows.sort(axis=1)
+    return rows
+
+
+def build_purchases(user, lotto_round, auto_count=0, manual_rows=()):
+    """
+    자동 auto_count장과 수동 번호 목록으로 저장 전 Purchase 객체 목록을 만듭니다. (번호 마스크, 조합 번호 포함)
+
+    :param manual_rows: 정렬된 6개 번호 리스트의 목록 (폼에서 검증된 값)
+    :return: Purchase 목록 (자동 구매가 먼저, 이어서 수동 구매 순서)
+    """
+    tickets = [('A', numbers) for numbers in generate_auto_number_rows(auto_count).tolist()]
+    tickets += [('M', sorted(numbers)) for numbers in manual_rows]
+
+    purchases = []
+    for lotto_type, numbers in tickets:
+        purchase = Purchase(
+            user=user,
+            round=lotto_round,
+            lotto_type=lotto_type,
+            p_num1=numbers[0], p_num2=numbers[1], p_num3=numbers[2],
+            p_num4=numbers[3], p_num5=numbers[4], p_num6=numbers[5],
+        )
+        purchase.update_number_keys()
+        purchases.append(purchase)
+    return purchases
+
+
+def save_purchases(purchases):
+    """
+    Purchase 목록을 한 트랜잭션에서 bulk_create하고, 회차별로 판매 카운터를, 사용자별로 누적 통계를 한 번씩 올립니다.
+    여러 사용자·회차의 구매가 섞여 있어도 됩니다. (그룹 커밋 큐의 flush 함수)
+
+    :return: 저장된 Purchase 목록 (입력 순서 유지)
+    :raises RoundClosedError: 구매 회차 중 이미 추첨된 회차가 있는 경우 (아무것도 저장하지 않음)
+    """
+    sales = {}
+    tickets_by_user = {}
+    for purchase in purchases:
+        tickets_by_user[purchase.user_id] = tickets_by_user.get(purchase.user_id, 0) + 1
+        lotto_round, auto, manual = sales.get(purchase.round_id, (purchase.round, 0, 0))
+        if purchase.lotto_type == 'A':
+            auto += 1
+        else:
+            manual += 1
+        sales[purchase.round_id] = (lotto_round, auto, manual)
+
+    with transaction.atomic():
+        # 요청에서 읽은 회차(캐시 포함)는 그사이 추첨되었을 수 있으므로 트랜잭션 안에서 다시 확인합니다.
+        # 회차 행을 잠가 확인 후 저장 전에 추첨 결과가 저장되지 않게 합니다.
+        open_rounds = set(
+            LottoRound.objects.select_for_update()
+            .filter(pk__in=list(sales), num1__isnull=True)
+            .values_list('pk', flat=True)
+        )
+        closed = sorted(
+            lotto_round.round for round_id, (lotto_round, _, _) in sales.items() if round_id not in open_rounds
+        )
+        if closed:
+            raise RoundClosedError(f"{', '.join(map(str, closed))}회차는 이미 추첨되어 구매할 수 없습니다.")
+        purchases = Purchase.objects.bulk_create(purchases)
+        for lotto_round, auto, manual in sales.values():
+            record_sale(lotto_round, auto=auto, manual=manual)
+        for user_id, tickets in tickets_by_user.items():
+            record_purchases(user_id, tickets)
+    return purchases
+
+
+def group_commit_enabled():
+    """settings.LOTTO_GROUP_COMMIT가 켜져 있으면 구매를 그룹 커밋 큐로 저장합니다."""
+    return getattr(settings, 'LOTTO_GROUP_COMMIT', False)
+
+
+def get_ingest_queue():
+    """프로세스에 하나뿐인 구매 그룹 커밋 큐를 반환합니다. (처음 호출할 때 생성)"""
+    global _ingest_queue
+    with _ingest_queue_lock:
+        if _ingest_queue is None:
+            _ingest_queue = GroupCommitQueue(
+                save_purchases,
+                max_batch=getattr(settings, 'LOTTO_GROUP_COMMIT_MAX_BATCH', DEFAULT_GROUP_COMMIT_MAX_BATCH),
+                max_delay=getattr(settings, 'LOTTO_GROUP_COMMIT_MAX_DELAY', DEFAULT_GROUP_COMMIT_MAX_DELAY),
+                name='purchase-group-commit',
+            )
+        return _ingest_queue
+
+
+def purchase_tickets(user, lotto_round, auto_count=0, manual_rows=()):
+    """
+    자동 auto_count장과 수동 번호 목록을 한 번의 bulk_create와 한 번의 카운터 갱신으로 저장합니다.
+    그룹 커밋 모드에서는 다른 요청의 구매와 함께 커밋될 때까지 기다립니다.
+
+    :param manual_rows: 정렬된 6개 번호 리스트의 목록 (폼에서 검증된 값)
+    :return: 저장된 Purchase 목록 (자동 구매가 먼저, 이어서 수동 구매 순서)
+    :raises RoundClosedError: 저장하기 전에 회차가 추첨된 경우
+    """
+    purchases = build_purchases(user, lotto_round, auto_count, manual_rows)
+    # 요청 계측(Server-Timing)에 'purchase_save' 구간으로 표시됩니다. (그룹 커밋 대기 시간 포함)
+    with segment('purchase_save'):
+        if group_commit_enabled():
+            timeout = getattr(settings, 'LOTTO_GROUP_COMMIT_TIMEOUT', DEFAULT_GROUP_COMMIT_TIMEOUT)
+            return get_ingest_queue().submit(purchases, timeout=timeout)
+        return save_purchases(purchases)
+
+
+def get_round_sales(lotto_round):
+    """회차의 샤드 카운터를 합산하여 {'tickets', 'auto_tickets', 'manual_tickets', 'revenue'}를 반환합니다."""
+    totals = RoundSalesCounter.objects.filter(round=lotto_round).aggregate(
+        **{field: Sum(field) for field in COUNTER_FIELDS}
+    )
+    return {field: totals[field] or 0 for field in COUNTER_FIELDS}
+
+
+def count_round_sales(lotto_round):
+    """구매 테이블을 직접 집계하여 카운터와 같은 형태의 실제 판매 실적을 반환합니다. (정합성 검사용)"""
+    actual = {field: 0 for field in COUNTER_FIELDS}
+    rows = (
+        Purchase.objects.filter(round=lotto_round)
+        .values('lotto_type')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        actual['auto_tickets' if row['lotto_type'] == 'A' else 'manual_tickets'] += row['count']
+    actual['tickets'] = actual['auto_tickets'] + actual['manual_tickets']
+    actual['revenue'] = actual['tickets'] * TICKET_PRICE
+    return actual
+
+
+def reconcile_round_sales(lotto_round, fix=False):
+    """
+    카운터 합계와 실제 구매 집계를 비교합니다.
+    fix가 True이고 값이 다르면 0번 샤드에 실제 값을 저장하고 나머지 샤드를 0으로 초기화합니다.
+
+    :return: (카운터 합계, 실제 집계, 일치 여부)
+    """
+    with transaction.atomic():
+        if fix:
+            # 카운터 행을 잠가 재계산 중에 다른 구매가 카운터를 바꾸지 못하게 합니다.
+            list(RoundSalesCounter.objects.select_for_update().filter(round=lotto_round))
+        counted = get_round_sales(lotto_round)
+        actual = count_round_sales(lotto_round)
+        matches = counted == actual
+        if fix and not matches:
+            ensure_counter_shards(lotto_round)
+            RoundSalesCounter.objects.filter(round=lotto_round).exclude(shard=0).update(
+                **{field: 0 for field in COUNTER_FIELDS}
+            )
+            RoundSalesCounter.objects.filter(round=lotto_round, shard=0).update(**actual)
+    return counted, actual, matches
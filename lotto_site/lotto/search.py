@@ -0,0 +1,153 @@
+# lotto/search.py
+"""
+번호 부분집합으로 구매를 찾는 검색 모듈. (예: "N회차에서 7, 13, 42를 모두 포함한 티켓")
+
+  - 포함 검색  : number_mask & 질의 마스크 == 질의 마스크
+  - 최소 일치  : popcount(number_mask & 질의 마스크) >= min_matches
+회차 단위 검색은 프로세스 메모리에 올린 회차별 (pk, 마스크) 배열(RoundMaskIndex)에서 numpy로 한 번에 판정하므로
+수백만 장 회차에서도 수 ms 안에 끝납니다. 인덱스는 마지막으로 읽은 pk 이후의 구매만 읽어 이어 붙이고,
+그래도 회차의 구매 수와 맞지 않으면(구매가 삭제된 경우 등) 회차 전체를 다시 읽습니다.
+사용자 단위 검색은 사용자 인덱스로 범위가 좁으므로 SQL 비트 연산으로 처리합니다.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+from .draw import iter_purchase_chunks
+from .models import Purchase
+from .rank_engine import numbers_to_mask, popcount
+
+# settings.LOTTO_SEARCH_*로 변경할 수 있습니다.
+DEFAULT_INDEX_ROUNDS = 4
+DEFAULT_INDEX_CHUNK_SIZE = 100_000
+DEFAULT_LIMIT = 100
+
+# 검색 API 한 번에 돌려주는 최대 건수
+MAX_LIMIT = 1000
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def parse_numbers(value):
+    """'7, 13 42' 같은 문자열을 번호 리스트로 변환합니다. (이미 리스트면 그대로 정수 변환)"""
+    if isinstance(value, str):
+        value = [token for token in re.split(r'[\s,]+', value.strip()) if token]
+    try:
+        return [int(number) for number in value]
+    except (TypeError, ValueError):
+        raise ValueError("번호는 숫자로 입력해 주세요.")
+
+
+def validate_query(numbers, min_matches=None):
+    """
+    검색 조건을 검사하고 (정렬된 번호 리스트, 최소 일치 개수)를 반환합니다.
+    min_matches를 생략하면 모든 번호를 포함하는 티켓(포함 검색)을 찾습니다.
+
+    :raises ValueError: 조건이 잘못된 경우
+    """
+    numbers = sorted(set(numbers))
+    if not numbers:
+        raise ValueError("검색할 번호를 1개 이상 입력해 주세요.")
+    if numbers[0] < 1 or numbers[-1] > 45:
+        raise ValueError("번호는 1부터 45 사이여야 합니다.")
+    if min_matches is None:
+        min_matches = len(numbers)
+    if not 1 <= min_matches <= min(len(numbers), 6):
+        raise ValueError(f"최소 일치 개수는 1 이상 {min(len(numbers), 6)} 이하여야 합니다.")
+    return numbers, min_matches
+
+
+class RoundMaskIndex:
+    """회차 하나의 구매 (pk, 번호 마스크) 배열. pk 오름차순으로 쌓이며 refresh()로 새 구매를 이어 붙입니다."""
+
+    def __init__(self, round_id):
+        self.round_id = round_id
+        self.pks = np.empty(0, dtype=np.int64)
+        self.masks = np.empty(0, dtype=np.uint64)
+        self.lock = threading.Lock()
+
+    def refresh(self, chunk_size=None):
+        """
+        마지막으로 읽은 pk 이후에 저장된 구매를 읽어 배열에 추가합니다.
+        추가한 뒤에도 배열 길이가 회차의 구매 수와 다르면 삭제된 구매가 남아 있는 것이므로 처음부터 다시 읽습니다.
+        (다른 프로세스에서 삭제한 경우도 찾아내도록 신호 대신 구매 수를 비교합니다)
+        """
+        chunk_size = chunk_size or getattr(settings, 'LOTTO_SEARCH_INDEX_CHUNK_SIZE', DEFAULT_INDEX_CHUNK_SIZE)
+        self._append(chunk_size)
+        if len(self.pks) != Purchase.objects.filter(round_id=self.round_id).count():
+            self.pks = np.empty(0, dtype=np.int64)
+            self.masks = np.empty(0, dtype=np.uint64)
+            self._append(chunk_size)
+
+    def _append(self, chunk_size):
+        after_pk = int(self.pks[-1]) if len(self.pks) else 0
+        chunks = list(iter_purchase_chunks(self.round_id, chunk_size, after_pk=after_pk))
+        if chunks:
+            self.pks = np.concatenate([self.pks, *(pks for pks, _ in chunks)])
+            self.masks = np.concatenate([self.masks, *(masks for _, masks in chunks)])
+
+    def match(self, numbers, min_matches):
+        """조건에 맞는 구매의 pk 배열을 반환합니다. (pk 오름차순)"""
+        query_mask = np.uint64(numbers_to_mask(numbers))
+        hits = self.masks & query_mask
+        if min_matches == len(numbers):
+            selected = hits == query_mask
+        else:
+            selected = popcount(hits) >= min_matches
+        return self.pks[selected]
+
+
+def get_round_index(lotto_round):
+    """회차의 마스크 인덱스를 최신 상태로 만들어 반환합니다. (최근 사용한 회차 몇 개만 메모리에 유지)"""
+    with _indexes_lock:
+        index = _indexes.pop(lotto_round.pk, None) or RoundMaskIndex(lotto_round.pk)
+        _indexes[lotto_round.pk] = index
+        while len(_indexes) > getattr(settings, 'LOTTO_SEARCH_INDEX_ROUNDS', DEFAULT_INDEX_ROUNDS):
+            _indexes.popitem(last=False)
+    with index.lock:
+        index.refresh()
+    return index
+
+
+def clear_round_indexes():
+    """메모리에 올린 회차 인덱스를 모두 버립니다."""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def search_purchases(numbers, lotto_round=None, user=None, min_matches=None, limit=DEFAULT_LIMIT):
+    """
+    번호 부분집합 조건에 맞는 구매를 찾습니다.
+
+    :param numbers: 검색할 번호 목록
+    :param lotto_round: 회차 (지정하고 user가 없으면 메모리 인덱스 사용)
+    :param user: 구매자 (지정하면 사용자 인덱스 + SQL 비트 연산 사용)
+    :param min_matches: 최소 일치 개수 (생략하면 모든 번호 포함)
+    :param limit: 반환할 최대 구매 수 (최신 구매부터)
+    :return: (전체 일치 장수, 구매 목록, 사용한 방식 'index' 또는 'sql')
+    """
+    numbers, min_matches = validate_query(numbers, min_matches)
+
+    if lotto_round is not None and user is None:
+        index = get_round_index(lotto_round)
+        with index.lock:
+            pks = index.match(numbers, min_matches)
+        latest = pks[::-1][:limit].tolist()
+        purchases = Purchase.objects.filter(pk__in=latest).select_related('user', 'round').order_by('-pk')
+        return len(pks), list(purchases), 'index'
+
+    purchases = Purchase.objects.all()
+    if user is not None:
+        purchases = purchases.filter(user=user)
+    if lotto_round is not None:
+        purchases = purchases.filter(round=lotto_round)
+    if min_matches == len(numbers):
+        purchases = purchases.containing_numbers(numbers)
+    else:
+        purchases = purchases.overlapping_numbers(numbers, min_matches)
+    total = purchases.count()
+    return total, list(purchases.select_related('user', 'round').order_by('-pk')[:limit]), 'sql'
@@ -0,0 +1,212 @@
+# lotto/simulation.py
+"""
+추첨 전에 현재 판매된 티켓으로 무작위 추첨을 여러 번 시뮬레이션하여 등수별 당첨자 수의 분포를 구하는 모듈.
+
+티켓 스냅숏(번호 마스크 배열, draw.snapshot_round_masks)을 먼저 "번호 부분집합별 티켓 수" 표로 바꿔 둡니다.
+  - 3개/4개/5개 부분집합 표: 해당 번호를 모두 포함하는 티켓 수 (조합 순위로 인덱싱한 배열)
+  - 6개 조합: 조합 번호별 티켓 수 (정렬된 조합 번호 배열 + 장수, searchsorted로 조회)
+추첨 한 번의 당첨 번호 W에 대해 N_k = (W의 k개 부분집합별 티켓 수의 합) = sum_j C(j, k) * E_j 이므로
+(E_j: 정확히 j개 일치한 티켓 수) 포함-배제로 E_6, E_5, E_4, E_3을 구하고, 2등은 (W의 5개 + 보너스 번호) 조합
+6개를 조회합니다. 추첨 한 번에 배열 조회 48번이면 되므로 티켓 수와 관계없이 추첨 수십만 번을
+배치 단위 벡터 연산으로 빠르게 처리할 수 있습니다. (표를 만드는 비용만 티켓 수에 비례)
+
+배치는 workers > 1이면 프로세스 풀에 나누어 실행합니다. 배치마다 SeedSequence로 나눈 시드를 쓰므로
+같은 seed이면 workers 수와 관계없이 결과가 같습니다.
+이 모듈은 Django 모델을 가져오지 않습니다. (spawn 방식의 작업 프로세스에서도 그대로 import 가능)
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from .combination import NUMBER_COUNT, PICK_COUNT, rank_terms, subset_ranks
+from .prizes import FIXED_PRIZES, PRIZE_POOL_PERCENT
+
+# settings.LOTTO_SIMULATION_DRAWS / LOTTO_SIMULATION_WORKERS로 기본값을 변경할 수 있습니다.
+DEFAULT_DRAWS = 100_000
+DEFAULT_WORKERS = 1
+
+# 한 번의 벡터 연산으로 처리하는 추첨 수
+DEFAULT_BATCH_SIZE = 20_000
+
+# 부분집합 표를 만들 때 한 번에 펼치는 티켓 수 (중간 배열 크기 제한)
+TABLE_CHUNK_SIZE = 50_000
+
+RANKS = [1, 2, 3, 4, 5]
+
+# 정렬된 번호 6개 중 k개를 고르는 위치 조합 (k = 3, 4, 5)
+_SUBSET_POSITIONS = {
+    size: np.array(list(combinations(range(PICK_COUNT), size)), dtype=np.intp) for size in (3, 4, 5)
+}
+
+
+def masks_to_numbers(masks):
+    """
+    번호 6개짜리 티켓 마스크 배열을 (N, 6) 오름차순 번호 배열로 되돌립니다.
+
+    :raises ValueError: 켜진 비트가 6개가 아닌 마스크가 있는 경우
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    bits = np.unpackbits(
+        masks.astype('<u8').view(np.uint8).reshape(-1, 8), axis=1, bitorder='little',
+    )[:, :NUMBER_COUNT]
+    # np.nonzero는 행 순서대로, 행 안에서는 번호 오름차순으로 위치를 돌려줍니다.
+    rows, columns = np.nonzero(bits)
+    if len(columns) != len(masks) * PICK_COUNT or np.any(np.bincount(rows, minlength=len(masks)) != PICK_COUNT):
+        raise ValueError("번호가 6개가 아닌 티켓 마스크가 있습니다.")
+    return (columns + 1).reshape(-1, PICK_COUNT)
+
+
+def build_ticket_tables(masks):
+    """
+    티켓 마스크 배열을 부분집합별 티켓 수 표로 변환합니다.
+
+    :return: {'tickets': 티켓 수, 'subsets': {k: C(45, k) 길이의 티켓 수 배열},
+              'combinations': 정렬된 조합 번호 배열, 'combination_counts': 조합 번호별 티켓 수}
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    subsets = {size: np.zeros(comb(NUMBER_COUNT, size), dtype=np.int64) for size in _SUBSET_POSITIONS}
+    combination_parts = []
+    for start in range(0, len(masks), TABLE_CHUNK_SIZE):
+        terms = rank_terms(masks_to_numbers(masks[start:start + TABLE_CHUNK_SIZE]))
+        for size, positions in _SUBSET_POSITIONS.items():
+            # 부분집합마다 미리 계산한 항을 더해 순위를 구합니다. (번호 배열을 부분집합별로 복사하지 않음)
+            ranks = np.stack([
+                sum(terms[index][position] for index, position in enumerate(subset, start=1))
+                for subset in positions
+            ])
+            subsets[size] += np.bincount(ranks.ravel(), minlength=len(subsets[size]))
+        combination_parts.append(sum(terms[index][index - 1] for index in range(1, PICK_COUNT + 1)))
+
+    all_combinations = np.concatenate(combination_parts) if combination_parts else np.zeros(0, dtype=np.int64)
+    unique_combinations, counts = np.unique(all_combinations, return_counts=True)
+    return {
+        'tickets': len(masks),
+        'subsets': subsets,
+        'combinations': unique_combinations,
+        'combination_counts': counts.astype(np.int64),
+    }
+
+
+def _count_combinations(tables, ranks):
+    """조합 번호 배열의 각 원소를 가진 티켓 수를 돌려줍니다. (같은 모양의 배열)"""
+    keys = tables['combinations']
+    if not len(keys):
+        return np.zeros(np.shape(ranks), dtype=np.int64)
+    index = np.minimum(np.searchsorted(keys, ranks), len(keys) - 1)
+    return np.where(keys[index] == ranks, tables['combination_counts'][index], 0)
+
+
+def random_draws(rng, count):
+    """
+    1~45 중 중복 없는 7개를 count번 뽑아 (정렬된 당첨 번호 (count, 6) 배열, 보너스 번호 배열)을 반환합니다.
+    무작위 키의 가장 작은 7개 위치를 고르고, 7번째로 작은 키의 번호를 보너스 번호로 씁니다.
+    """
+    picks = rng.random((count, NUMBER_COUNT)).argpartition(PICK_COUNT, axis=1)[:, :PICK_COUNT + 1] + 1
+    return np.sort(picks[:, :PICK_COUNT], axis=1), picks[:, PICK_COUNT]
+
+
+def count_winners(tables, winning, bonus):
+    """
+    추첨 여러 번의 등수별 당첨자 수를 한 번에 계산합니다.
+
+    :param winning: (D, 6) 오름차순 당첨 번호 배열
+    :param bonus: 길이 D의 보너스 번호 배열
+    :return: (D, 5) 배열 (열 순서: 1등 ~ 5등)
+    """
+    winning = np.asarray(winning, dtype=np.intp)
+    bonus = np.asarray(bonus, dtype=np.intp)
+    totals = {
+        size: tables['subsets'][size][subset_ranks(winning[:, positions])].sum(axis=1)
+        for size, positions in _SUBSET_POSITIONS.items()
+    }
+    exact6 = _count_combinations(tables, subset_ranks(winning))
+    exact5 = totals[5] - 6 * exact6
+    exact4 = totals[4] - 5 * exact5 - 15 * exact6
+    exact3 = totals[3] - 4 * exact4 - 10 * exact5 - 20 * exact6
+
+    # 2등: 당첨 번호 5개 + 보너스 번호로 이루어진 조합 6가지
+    fives = winning[:, _SUBSET_POSITIONS[5]]
+    bonus_column = np.broadcast_to(bonus[:, np.newaxis, np.newaxis], fives.shape[:2] + (1,))
+    with_bonus = np.sort(np.concatenate([fives, bonus_column], axis=2), axis=2)
+    rank2 = _count_combinations(tables, subset_ranks(with_bonus)).sum(axis=1)
+
+    return np.stack([exact6, rank2, exact5 - rank2, exact4, exact3], axis=1)
+
+
+def _simulate_batch(tables, seed, count):
+    winning, bonus = random_draws(np.random.default_rng(seed), count)
+    return count_winners(tables, winning, bonus)
+
+
+# 작업 프로세스마다 한 번만 받아 두는 티켓 표
+_worker_tables = None
+
+
+def _init_worker(tables):
+    global _worker_tables
+    _worker_tables = tables
+
+
+def _run_worker_batch(seed, count):
+    return _simulate_batch(_worker_tables, seed, count)
+
+
+def simulate_draws(tables, draws, seed=None, batch_size=None, workers=1):
+    """
+    무작위 추첨을 draws번 시뮬레이션하여 (draws, 5) 등수별 당첨자 수 배열을 반환합니다.
+
+    :param workers: 2 이상이면 배치를 프로세스 풀에 나누어 실행
+    """
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    sizes = [min(batch_size, draws - start) for start in range(0, draws, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(sizes)), initializer=_init_worker, initargs=(tables,),
+        ) as pool:
+            results = list(pool.map(_run_worker_batch, seeds, sizes))
+    else:
+        results = [_simulate_batch(tables, batch_seed, size) for batch_seed, size in zip(seeds, sizes)]
+    return np.concatenate(results) if results else np.zeros((0, len(RANKS)), dtype=np.int64)
+
+
+def _distribution(values):
+    values = np.asarray(values, dtype=np.float64)
+    p50, p95, p99, p999 = np.percentile(values, [50, 95, 99, 99.9])
+    return {
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'p50': float(p50),
+        'p95': float(p95),
+        'p99': float(p99),
+        'p999': float(p999),
+        'max': int(values.max()),
+    }
+
+
+def summarize(winners, revenue):
+    """
+    시뮬레이션 결과를 등수별 당첨자 수 분포와 고정 당첨금(4, 5등) 부담으로 요약합니다.
+
+    :param winners: simulate_draws의 결과
+    :param revenue: 회차 판매 금액 (원)
+    :return: {'draws', 'ranks': [{'rank', 'mean', 'std', 'p50', 'p95', 'p99', 'p999', 'max', 'zero_probability'}],
+              'prize_pool', 'fixed_payout': 분포, 'fixed_overflow_probability'}
+             fixed_overflow_probability는 4, 5등 고정 당첨금이 총 당첨금을 넘어 1~3등 배분액이 0이 될 확률
+    """
+    ranks = []
+    for column, rank in enumerate(RANKS):
+        values = winners[:, column]
+        ranks.append(dict(_distribution(values), rank=rank, zero_probability=float(np.mean(values == 0))))
+
+    prize_pool = revenue * PRIZE_POOL_PERCENT // 100
+    fixed_payout = winners[:, 3] * FIXED_PRIZES[4] + winners[:, 4] * FIXED_PRIZES[5]
+    return {
+        'draws': len(winners),
+        'ranks': ranks,
+        'prize_pool': prize_pool,
+        'fixed_payout': _distribution(fixed_payout),
+        'fixed_overflow_probability': float(np.mean(fixed_payout > prize_pool)),
+    }
@@ -1,3 +1,847 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import draw, draw_profile, export, simulation, views, what_if
+from .combination import COMBINATION_COUNT, combination_numbers, combination_rank, combination_ranks
+from .db import get_sqlite_pragmas
+from .forms import MAX_TICKETS_PER_PURCHASE, BulkPurchaseForm
+from .history_import import import_draw_history, read_records
+from .ingest import GroupCommitQueue
+from .models import TICKET_PRICE, DrawRun, LottoRound, Purchase, RoundSalesCounter, SalesPerformance, UserStats
+from .pagination import keyset_page
+from .prizes import FIXED_PRIZES, compute_payouts
+from .rank_engine import masks_from_rows, numbers_to_mask, rank_masks, rank_numbers, rank_tickets
+from .search import clear_round_indexes, get_round_index, search_purchases
+from .sales import get_round_sales, purchase_tickets, reconcile_round_sales
+from .round_cache import invalidate_round_state
+from .user_stats import WIN_FIELDS, rebuild_user_stats
+from .utils import determine_lotto_rank
+
+WINNING_NUMBERS = [3, 11, 17, 25, 38, 45]
+BONUS_NUMBER = 7
+
+
+def sample_tickets(count=500, seed=0):
+    """
+    등수마다(1~5등, 낙첨) 최소 한 장씩 들어가도록 만든 티켓에 무작위 티켓을 더해 반환합니다.
+    당첨 번호는 WINNING_NUMBERS, 보너스 번호는 BONUS_NUMBER 기준입니다.
+    """
+    others = [number for number in range(1, 46) if number not in WINNING_NUMBERS and number != BONUS_NUMBER]
+    tickets = [
+        WINNING_NUMBERS,  # 1등
+        WINNING_NUMBERS[:5] + [BONUS_NUMBER],  # 2등
+        WINNING_NUMBERS[:5] + others[:1],  # 3등
+        WINNING_NUMBERS[:4] + [BONUS_NUMBER] + others[:1],  # 4등 (보너스 번호는 4개 일치에 영향 없음)
+        WINNING_NUMBERS[:3] + others[:3],  # 5등
+        WINNING_NUMBERS[:2] + [BONUS_NUMBER] + others[:3],  # 낙첨
+        others[:6],  # 낙첨
+    ]
+    rng = random.Random(seed)
+    tickets += [rng.sample(range(1, 46), 6) for _ in range(count)]
+    return [sorted(ticket) for ticket in tickets]
+
+
+def create_drawn_round(round_number=1):
+    """WINNING_NUMBERS와 BONUS_NUMBER로 추첨이 끝난 회차를 만듭니다."""
+    return LottoRound.objects.create(
+        round=round_number,
+        **{f'num{index}': number for index, number in enumerate(WINNING_NUMBERS, start=1)},
+        bonus_number=BONUS_NUMBER,
+    )
+
+
+def create_purchases(user, lotto_round, tickets):
+    """번호 목록으로 구매 기록을 한 번에 저장합니다. (번호 마스크와 조합 번호 포함)"""
+    purchases = []
+    for ticket in tickets:
+        purchase = Purchase(user=user, round=lotto_round, **{f'p_num{i}': n for i, n in enumerate(ticket, start=1)})
+        purchase.update_number_keys()
+        purchases.append(purchase)
+    return Purchase.objects.bulk_create(purchases)
+
+
+class RankEngineTests(TestCase):
+    """rank_engine의 벡터화 판정이 기존 determine_lotto_rank와 같은 결과를 내는지 확인합니다."""
+
+    def test_vectorized_ranks_match_determine_lotto_rank(self):
+        tickets = sample_tickets()
+        expected = [determine_lotto_rank(ticket, WINNING_NUMBERS, BONUS_NUMBER) for ticket in tickets]
+        self.assertEqual(rank_tickets(tickets, WINNING_NUMBERS, BONUS_NUMBER).tolist(), expected)
+        self.assertEqual(
+            rank_masks(masks_from_rows(tickets), numbers_to_mask(WINNING_NUMBERS), BONUS_NUMBER).tolist(),
+            expected,
+        )
+        self.assertEqual(set(expected), {0, 1, 2, 3, 4, 5})
+
+    def test_single_ticket_rank_matches_determine_lotto_rank(self):
+        for ticket in sample_tickets(count=100, seed=1):
+            self.assertEqual(
+                rank_numbers(ticket, WINNING_NUMBERS, BONUS_NUMBER),
+                determine_lotto_rank(ticket, WINNING_NUMBERS, BONUS_NUMBER),
+            )
+
+
+class PurchaseRankQueryTests(TestCase):
+    """DB 안에서 계산한 등수(with_rank)가 determine_lotto_rank와 같은지 확인합니다."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('buyer')
+        self.lotto_round = create_drawn_round()
+        self.tickets = sample_tickets(count=200)
+        create_purchases(self.user, self.lotto_round, self.tickets)
+
+    def expected_ranks(self):
+        return sorted(
+            (sorted(ticket), determine_lotto_rank(ticket, WINNING_NUMBERS, BONUS_NUMBER)) for ticket in self.tickets
+        )
+
+    def test_with_rank_matches_determine_lotto_rank(self):
+        # 회차를 넘기면 당첨 번호를 상수로, 생략하면 회차 JOIN으로 계산합니다. 두 경로 모두 확인합니다.
+        for lotto_round in (self.lotto_round, None):
+            purchases = Purchase.objects.filter(round=self.lotto_round).with_rank(lotto_round)
+            ranks = sorted((purchase.get_purchased_numbers(), purchase.winning_rank) for purchase in purchases)
+            self.assertEqual(ranks, self.expected_ranks())
+
+    def test_with_rank_marks_undrawn_round_as_pending(self):
+        open_round = LottoRound.objects.create(round=2)
+        create_purchases(self.user, open_round, self.tickets[:3])
+        for lotto_round in (open_round, None):
+            purchases = Purchase.objects.filter(round=open_round).with_rank(lotto_round)
+            self.assertEqual([purchase.winning_rank for purchase in purchases], [-1, -1, -1])
+
+
+class RecordResultsTests(TestCase):
+    """추첨 시 저장하는 구매별 결과(record_results)가 determine_lotto_rank와 같은지 확인합니다."""
+
+    def test_record_results_matches_determine_lotto_rank(self):
+        user = User.objects.create_user('buyer')
+        lotto_round = create_drawn_round()
+        create_purchases(user, lotto_round, sample_tickets(count=200))
+
+        updated = Purchase.objects.record_results(lotto_round)
+
+        self.assertEqual(updated, Purchase.objects.filter(round=lotto_round).count())
+        for purchase in Purchase.objects.filter(round=lotto_round):
+            numbers = purchase.get_purchased_numbers()
+            self.assertEqual(purchase.rank, determine_lotto_rank(numbers, WINNING_NUMBERS, BONUS_NUMBER))
+            self.assertEqual(purchase.match_count, len(set(numbers) & set(WINNING_NUMBERS)))
+
+
+class DrawRunResumeTests(TestCase):
+    """중간에 실패한 추첨 작업을 다시 실행해도 이미 처리한 청크를 두 번 세지 않는지 확인합니다."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('buyer')
+        self.lotto_round = LottoRound.objects.create(round=1)
+        create_purchases(self.user, self.lotto_round, sample_tickets(count=300))
+
+    def test_resumed_run_counts_each_ticket_once(self):
+        write_chunk_results = draw.write_chunk_results
+        calls = []
+
+        def fail_on_third_chunk(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 3:
+                raise RuntimeError("중단")
+            return write_chunk_results(*args, **kwargs)
+
+        run, _ = draw.start_draw_run(self.lotto_round)
+        with mock.patch.object(draw, 'write_chunk_results', side_effect=fail_on_third_chunk):
+            with self.assertRaises(RuntimeError):
+                draw.execute_draw_run(run.pk, chunk_size=50)
+
+        run.refresh_from_db()
+        self.assertEqual(run.state, DrawRun.STATE_FAILED)
+        self.assertEqual(run.processed_tickets, 100)
+
+        run, _ = draw.start_draw_run(self.lotto_round)
+        self.assertIsNotNone(draw.execute_draw_run(run.pk, chunk_size=50))
+        # 완료된 작업은 다시 실행되지 않습니다.
+        self.assertIsNone(draw.execute_draw_run(run.pk, chunk_size=50))
+
+        run.refresh_from_db()
+        self.lotto_round.refresh_from_db()
+        purchases = Purchase.objects.filter(round=self.lotto_round)
+        winning_numbers = self.lotto_round.get_winning_numbers()
+        expected = {rank: 0 for rank in range(1, 6)}
+        for purchase in purchases:
+            rank = determine_lotto_rank(
+                purchase.get_purchased_numbers(), winning_numbers, self.lotto_round.bonus_number,
+            )
+            self.assertEqual(purchase.rank, rank)
+            if rank:
+                expected[rank] += 1
+
+        self.assertEqual(run.state, DrawRun.STATE_DONE)
+        self.assertEqual(run.processed_tickets, purchases.count())
+        self.assertEqual(run.get_rank_counts(), expected)
+        self.assertEqual([row['step'] for row in run.get_profile_rows()], list(draw_profile.STEP_NAMES))
+        performance = SalesPerformance.objects.get(round=self.lotto_round)
+        self.assertEqual(performance.total_sales, purchases.count())
+        self.assertEqual({rank: getattr(performance, f'rank{rank}_winners') for rank in range(1, 6)}, expected)
+
+    def test_stale_worker_stops_after_takeover(self):
+        # 실행자 A가 둘째 청크 판정 중에 멈춘 사이, 실행자 B가 오래된 작업을 가져가 끝까지 실행합니다.
+        rank_masks = draw.rank_masks
+        calls = []
+
+        def stall_then_take_over(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                DrawRun.objects.filter(pk=run.pk).update(
+                    heartbeat_at=timezone.now() - draw.get_stale_after() - timedelta(seconds=1),
+                )
+                self.assertIsNotNone(draw.execute_draw_run(run.pk, chunk_size=50))
+            return rank_masks(*args, **kwargs)
+
+        user_ids = list(User.objects.values_list('pk', flat=True))
+        run, _ = draw.start_draw_run(self.lotto_round)
+        with mock.patch.object(draw, 'rank_masks', side_effect=stall_then_take_over):
+            # A는 다음 저장에서 작업을 잃은 것을 알고 아무것도 저장하지 않은 채 멈춥니다.
+            self.assertIsNone(draw.execute_draw_run(run.pk, chunk_size=50))
+
+        run.refresh_from_db()
+        self.lotto_round.refresh_from_db()
+        purchases = Purchase.objects.filter(round=self.lotto_round)
+        expected = Purchase.objects.filter(round=self.lotto_round).with_rank(self.lotto_round)
+        expected = {rank: sum(1 for purchase in expected if purchase.winning_rank == rank) for rank in range(1, 6)}
+        self.assertEqual(run.state, DrawRun.STATE_DONE)
+        self.assertEqual(run.processed_tickets, purchases.count())
+        self.assertEqual(run.get_rank_counts(), expected)
+        performance = SalesPerformance.objects.get(round=self.lotto_round)
+        self.assertEqual({rank: getattr(performance, f'rank{rank}_winners') for rank in range(1, 6)}, expected)
+
+        # 사용자 누적 통계에 당첨 결과가 한 번만 더해졌는지 전체 재계산 결과와 비교합니다.
+        # (create_purchases는 구매 장수를 통계에 더하지 않으므로 당첨 필드만 비교합니다)
+        stats = UserStats.objects.filter(user_id__in=user_ids).order_by('user_id')
+        wins = list(stats.values_list('user_id', *WIN_FIELDS))
+        self.assertTrue(any(row[-1] for row in wins))
+        rebuild_user_stats()
+        self.assertEqual(list(stats.values_list('user_id', *WIN_FIELDS)), wins)
+
+    def test_running_run_without_recent_heartbeat_is_stale(self):
+        run, _ = draw.start_draw_run(self.lotto_round)
+        self.assertFalse(run.is_stale)
+        run.state = DrawRun.STATE_RUNNING
+        run.heartbeat_at = timezone.now()
+        self.assertFalse(run.is_stale)
+        run.heartbeat_at = timezone.now() - draw.get_stale_after() - timedelta(seconds=1)
+        self.assertTrue(run.is_stale)
+        self.assertTrue(run.to_status_dict()['stale'])
+
+
+class RoundSalesCounterTests(TestCase):
+    """구매 시 올리는 샤드 카운터 합계가 구매 테이블 집계(reconcile_round_sales)와 같은지 확인합니다."""
+
+    def setUp(self):
+        self.lotto_round = LottoRound.objects.create(round=1)
+        users = [User.objects.create_user(f'buyer{index}') for index in range(3)]
+        for index, user in enumerate(users):
+            purchase_tickets(user, self.lotto_round, auto_count=index + 1)
+            purchase_tickets(user, self.lotto_round, manual_rows=sample_tickets(count=0)[:index + 2])
+
+    def test_counters_match_purchase_table(self):
+        counted, actual, matches = reconcile_round_sales(self.lotto_round)
+        self.assertTrue(matches)
+        self.assertEqual(counted, actual)
+        self.assertEqual(counted, {'tickets': 15, 'auto_tickets': 6, 'manual_tickets': 9, 'revenue': 15 * TICKET_PRICE})
+        self.assertEqual(Purchase.objects.filter(round=self.lotto_round).count(), counted['tickets'])
+
+    def test_reconcile_fixes_drifted_counters(self):
+        RoundSalesCounter.objects.filter(round=self.lotto_round).update(tickets=0)
+
+        counted, actual, matches = reconcile_round_sales(self.lotto_round, fix=True)
+        self.assertFalse(matches)
+        self.assertEqual(counted['tickets'], 0)
+        self.assertEqual(get_round_sales(self.lotto_round), actual)
+        self.assertTrue(reconcile_round_sales(self.lotto_round)[2])
+
+
+class GroupCommitQueueTests(SimpleTestCase):
+    """그룹 커밋 큐가 대기 시간이 지난 요청을 저장하지 않고, 실패한 묶음은 요청별로 다시 저장하는지 확인합니다."""
+
+    def submit_in_thread(self, commit_queue, items, results):
+        def submit():
+            try:
+                results[items[0]] = commit_queue.submit(items, timeout=5)
+            except Exception as error:
+                results[items[0]] = error
+
+        thread = threading.Thread(target=submit)
+        thread.start()
+        return thread
+
+    def test_timed_out_request_is_cancelled(self):
+        flushed = []
+        flushing = threading.Event()
+        release = threading.Event()
+
+        def flush(items):
+            flushed.append(list(items))
+            flushing.set()
+            release.wait(5)
+            return list(items)
+
+        commit_queue = GroupCommitQueue(flush, max_delay=0)
+        results = {}
+        # 첫 요청을 저장하는 동안 쓰기 스레드가 막혀 있으므로 둘째 요청은 대기 시간을 넘깁니다.
+        thread = self.submit_in_thread(commit_queue, ['first'], results)
+        self.assertTrue(flushing.wait(5))
+        with self.assertRaises(TimeoutError):
+            commit_queue.submit(['late'], timeout=0.05)
+        release.set()
+        thread.join(5)
+        commit_queue.stop(timeout=5)
+
+        self.assertEqual(results['first'], ['first'])
+        self.assertEqual(flushed, [['first']])
+        self.assertEqual(commit_queue.committed_items, 1)
+
+    def test_failed_batch_is_retried_per_request(self):
+        flushed = []
+
+        def flush(items):
+            flushed.append(list(items))
+            if 'bad' in items:
+                raise ValueError('bad')
+            return [item.upper() for item in items]
+
+        # 세 요청이 한 묶음으로 모이도록 대기 시간을 넉넉히 둡니다.
+        commit_queue = GroupCommitQueue(flush, max_batch=3, max_delay=2)
+        results = {}
+        with self.assertLogs('lotto.ingest', level='WARNING'):
+            threads = [self.submit_in_thread(commit_queue, [item], results) for item in ('a', 'bad', 'c')]
+            for thread in threads:
+                thread.join(5)
+            commit_queue.stop(timeout=5)
+
+        self.assertEqual(sorted(flushed[0]), ['a', 'bad', 'c'])
+        self.assertEqual(len(flushed), 4)
+        self.assertEqual(results['a'], ['A'])
+        self.assertEqual(results['c'], ['C'])
+        self.assertIsInstance(results['bad'], ValueError)
+        self.assertEqual(commit_queue.committed_items, 2)
+
+
+class PurchaseTimeoutTests(TestCase):
+    """그룹 커밋 대기 시간이 초과된 구매가 500 오류 대신 안내 메시지/503 응답이 되는지 확인합니다."""
+
+    def setUp(self):
+        LottoRound.objects.create(round=1)
+        self.user = User.objects.create_user('buyer')
+        self.client.force_login(self.user)
+
+    def test_form_purchase_shows_message(self):
+        with mock.patch.object(views, 'purchase_tickets', side_effect=TimeoutError("대기 시간 초과")):
+            response = self.client.post(reverse('lotto_purchase'), {'auto_purchase': '1'})
+        self.assertRedirects(response, reverse('lotto_purchase'), fetch_redirect_response=False)
+        self.assertEqual([str(message) for message in response.wsgi_request._messages], ["대기 시간 초과"])
+
+    def test_bulk_api_returns_503(self):
+        with mock.patch.object(views, 'purchase_tickets', side_effect=TimeoutError("대기 시간 초과")):
+            response = self.client.post(
+                reverse('lotto_bulk_purchase_api'), json.dumps({'auto': 2}), content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'errors': {'__all__': ["대기 시간 초과"]}})
+        self.assertFalse(Purchase.objects.exists())
+
+
+class SqliteTuningTests(SimpleTestCase):
+    """journal_mode는 서버 실행에서만 바꾸고, 다른 관리 명령어에서는 DB 파일을 그대로 두는지 확인합니다."""
+
+    def journal_mode(self, argv):
+        return dict(get_sqlite_pragmas(argv))['journal_mode']
+
+    def test_journal_mode_only_for_servers(self):
+        self.assertEqual(self.journal_mode(['/srv/venv/bin/gunicorn', 'lotto_site.wsgi']), 'WAL')
+        self.assertEqual(self.journal_mode(['manage.py', 'runserver']), 'WAL')
+        self.assertIsNone(self.journal_mode(['manage.py', 'migrate']))
+        self.assertIsNone(self.journal_mode(['/usr/bin/django-admin', 'shell']))
+        with self.settings(LOTTO_SQLITE_JOURNAL_MODE_COMMANDS=['runserver', 'migrate']):
+            self.assertEqual(self.journal_mode(['manage.py', 'migrate']), 'WAL')
+
+
+class BulkPurchaseFormTests(TestCase):
+    """다중 구매 폼이 잘못된 줄을 거부하고 올바른 줄은 정렬된 번호로 바꾸는지 확인합니다."""
+
+    def assert_rejected(self, auto_count, manual_numbers):
+        form = BulkPurchaseForm({'auto_count': auto_count, 'manual_numbers': manual_numbers})
+        self.assertFalse(form.is_valid(), manual_numbers)
+
+    def test_accepts_text_and_json_rows(self):
+        form = BulkPurchaseForm({'auto_count': 2, 'manual_numbers': '45 3 17, 22 31 38\n1,2,3,4,5,6'})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['manual_numbers'], [[3, 17, 22, 31, 38, 45], [1, 2, 3, 4, 5, 6]])
+
+        form = BulkPurchaseForm({'auto_count': 0, 'manual_numbers': [[45, 3, 17, 22, 31, 38]]})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['manual_numbers'], [[3, 17, 22, 31, 38, 45]])
+
+    def test_rejects_bad_text_rows(self):
+        for text in ['1 2 3 4 5', '1 2 3 4 5 6 7', '1 2 3 4 5 46', '0 2 3 4 5 6', '1 1 2 3 4 5', '1 2 3 4 5 x']:
+            self.assert_rejected(0, text)
+
+    def test_rejects_bad_json_rows(self):
+        for rows in [
+            ['123456'],  # 줄이 리스트가 아님
+            [[1.0, 2, 3, 4, 5, 6]],  # 실수
+            [[True, 2, 3, 4, 5, 6]],  # 불리언
+            [['1', 2, 3, 4, 5, 6]],  # 문자열
+            [[1, 2, 3, 4, 5, 6], [1, 2, 3]],  # 둘째 줄 개수 부족
+            {'row': [1, 2, 3, 4, 5, 6]},  # 목록이 아님
+        ]:
+            self.assert_rejected(0, rows)
+
+    def test_rejects_empty_and_oversized_purchases(self):
+        self.assert_rejected(0, '')
+        self.assert_rejected(MAX_TICKETS_PER_PURCHASE, [[1, 2, 3, 4, 5, 6]])
+        self.assert_rejected(MAX_TICKETS_PER_PURCHASE + 1, '')
+
+
+class KeysetPaginationTests(TestCase):
+    """키셋 페이지를 끝까지 넘기면 모든 구매를 최신순으로 정확히 한 번씩 보여주는지 확인합니다."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('buyer')
+        lotto_round = LottoRound.objects.create(round=1)
+        purchases = create_purchases(self.user, lotto_round, sample_tickets(count=3))
+        # 구매 시각이 같은 구매(id로만 순서가 갈림)가 페이지 경계에 걸치도록 시각을 세 개로 나눕니다.
+        now = timezone.now()
+        for index, purchase in enumerate(purchases):
+            Purchase.objects.filter(pk=purchase.pk).update(purchase_date=now - timedelta(seconds=index % 3))
+        self.expected = list(Purchase.objects.history_of(self.user).values_list('pk', flat=True))
+        self.assertEqual(len(self.expected), 10)
+
+    def walk(self, size):
+        pages = []
+        cursor = None
+        while True:
+            page, cursor = keyset_page(Purchase.objects.history_of(self.user), cursor, size=size)
+            pages.append([purchase.pk for purchase in page])
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_purchase_once(self):
+        for size in (1, 3, 4, 9, 10, 11):
+            pages = self.walk(size)
+            self.assertEqual([pk for page in pages for pk in page], self.expected, size)
+            self.assertTrue(all(len(page) == size for page in pages[:-1]), size)
+
+    def test_last_full_page_has_no_next_cursor(self):
+        # 전체 장수가 페이지 크기의 배수여도 빈 페이지를 만들지 않습니다.
+        pages = self.walk(5)
+        self.assertEqual([len(page) for page in pages], [5, 5])
+
+    def test_invalid_cursor_returns_first_page(self):
+        for cursor in ('', 'abc', '1.2.3', '99999999999999999999999.1'):
+            page, _ = keyset_page(Purchase.objects.history_of(self.user), cursor, size=4)
+            self.assertEqual([purchase.pk for purchase in page], self.expected[:4], cursor)
+
+    def test_empty_history(self):
+        other = User.objects.create_user('nobody')
+        self.assertEqual(keyset_page(Purchase.objects.history_of(other)), ([], None))
+
+
+class CombinationIndexTests(TestCase):
+    """조합 번호 변환(combination_rank)과 역변환(combination_numbers)이 서로 되돌려지는지 확인합니다."""
+
+    def test_rank_unrank_round_trip(self):
+        rng = random.Random(0)
+        ranks = [0, 1, 2, COMBINATION_COUNT - 2, COMBINATION_COUNT - 1]
+        ranks += [rng.randrange(COMBINATION_COUNT) for _ in range(2000)]
+        for rank in ranks:
+            numbers = combination_numbers(rank)
+            self.assertEqual(numbers, sorted(set(numbers)))
+            self.assertTrue(1 <= numbers[0] and numbers[-1] <= 45, numbers)
+            self.assertEqual(combination_rank(numbers), rank)
+
+    def test_boundaries(self):
+        self.assertEqual(combination_numbers(0), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(combination_numbers(COMBINATION_COUNT - 1), [40, 41, 42, 43, 44, 45])
+        for rank in (-1, COMBINATION_COUNT):
+            with self.assertRaises(ValueError):
+                combination_numbers(rank)
+
+    def test_vectorized_ranks_match_single_rank(self):
+        tickets = sample_tickets(count=300)
+        # 행 안의 순서와 관계없이 같은 조합 번호가 나와야 합니다.
+        shuffled = [random.Random(index).sample(ticket, 6) for index, ticket in enumerate(tickets)]
+        expected = [combination_rank(ticket) for ticket in tickets]
+        self.assertEqual(combination_ranks(shuffled).tolist(), expected)
+        self.assertEqual([combination_numbers(rank) for rank in expected], tickets)
+
+    def test_with_combination_finds_identical_tickets(self):
+        user = User.objects.create_user('buyer')
+        lotto_round = create_drawn_round()
+        create_purchases(user, lotto_round, [WINNING_NUMBERS, WINNING_NUMBERS, [1, 2, 3, 4, 5, 6]])
+        self.assertEqual(Purchase.objects.with_combination(list(reversed(WINNING_NUMBERS))).count(), 2)
+        self.assertEqual(Purchase.objects.jackpot_winners(lotto_round).count(), 2)
+
+
+class NumberSearchTests(TestCase):
+    """번호 부분집합 검색(메모리 인덱스와 SQL 비트 연산)이 번호를 하나씩 비교한 결과와 같은지 확인합니다."""
+
+    QUERIES = [([3, 11], None), ([17], None), ([3, 11, 17, 25], 2), ([1, 2, 3, 4, 5, 6], 3), ([7, 45, 22], 1)]
+
+    def setUp(self):
+        clear_round_indexes()
+        self.addCleanup(clear_round_indexes)
+        self.user = User.objects.create_user('buyer')
+        self.lotto_round = LottoRound.objects.create(round=1)
+        create_purchases(self.user, self.lotto_round, sample_tickets(count=400))
+
+    def brute_force(self, numbers, min_matches):
+        min_matches = min_matches or len(numbers)
+        return sorted(
+            purchase.pk for purchase in Purchase.objects.filter(round=self.lotto_round)
+            if len(set(purchase.get_purchased_numbers()) & set(numbers)) >= min_matches
+        )
+
+    def assert_matches_brute_force(self):
+        purchases = Purchase.objects.filter(round=self.lotto_round)
+        for numbers, min_matches in self.QUERIES:
+            expected = self.brute_force(numbers, min_matches)
+            if min_matches is None:
+                found = purchases.containing_numbers(numbers)
+            else:
+                found = purchases.overlapping_numbers(numbers, min_matches)
+            self.assertEqual(sorted(found.values_list('pk', flat=True)), expected, numbers)
+            total, results, method = search_purchases(
+                numbers, lotto_round=self.lotto_round, min_matches=min_matches, limit=1000,
+            )
+            self.assertEqual(method, 'index')
+            self.assertEqual((total, sorted(purchase.pk for purchase in results)), (len(expected), expected), numbers)
+
+    def test_index_and_sql_match_brute_force(self):
+        self.assert_matches_brute_force()
+
+    def test_index_drops_deleted_purchases(self):
+        self.assert_matches_brute_force()
+        pks = list(Purchase.objects.filter(round=self.lotto_round).values_list('pk', flat=True))
+        Purchase.objects.filter(pk__in=pks[::3]).delete()
+        create_purchases(self.user, self.lotto_round, sample_tickets(count=50, seed=1))
+        self.assert_matches_brute_force()
+        self.assertEqual(len(get_round_index(self.lotto_round).pks), Purchase.objects.filter(round=self.lotto_round).count())
+
+
+class PayoutTests(TestCase):
+    """당첨금 정산(compute_payouts)에서 총 당첨금과 이월금이 원 단위까지 맞는지 확인합니다."""
+
+    def assert_balanced(self, payouts, carryover_in):
+        self.assertEqual(
+            payouts['prize_pool'] + carryover_in, payouts['total_payout'] + payouts['carryover_out'], payouts,
+        )
+
+    def test_rounding_remainders_are_carried_over(self):
+        # 총 당첨금 5,500원: 1등 4,125원, 2등 687원, 3등 687원(나머지 1원) / 3등 2명이면 1인당 343원(나머지 1원)
+        payouts = compute_payouts(11_000, {1: 3, 2: 1, 3: 2, 4: 0, 5: 0})
+        self.assertEqual(payouts['rank_prizes'], {1: 1375, 2: 687, 3: 343, 4: 50_000, 5: 5_000})
+        self.assertEqual(payouts['total_payout'], 5_498)
+        self.assertEqual(payouts['carryover_out'], 2)
+        self.assert_balanced(payouts, 0)
+
+    def test_unclaimed_ranks_carry_over(self):
+        payouts = compute_payouts(1_000_000, {1: 0, 2: 0, 3: 0, 4: 1, 5: 2}, carryover_in=777)
+        self.assertEqual(payouts['total_payout'], FIXED_PRIZES[4] + 2 * FIXED_PRIZES[5])
+        self.assertEqual(payouts['carryover_out'], 500_000 - 60_000 + 777)
+        self.assert_balanced(payouts, 777)
+
+    def test_random_rounds_balance(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            revenue = rng.randrange(0, 10_000_000_000, 1000)
+            rank_counts = {rank: rng.randrange(0, 7) for rank in range(1, 4)}
+            rank_counts.update({4: rng.randrange(0, 50), 5: rng.randrange(0, 500)})
+            carryover_in = rng.randrange(0, 1_000_000)
+            payouts = compute_payouts(revenue, rank_counts, carryover_in)
+            fixed_total = sum(prize * rank_counts[rank] for rank, prize in FIXED_PRIZES.items())
+            if fixed_total <= payouts['prize_pool']:
+                self.assert_balanced(payouts, carryover_in)
+            self.assertGreaterEqual(payouts['carryover_out'], 0)
+
+    def test_sales_performance_chains_carryover(self):
+        previous = create_drawn_round(1)
+        draw.save_sales_performance(previous, 11, {1: 3, 2: 1, 3: 2, 4: 0, 5: 0})
+        current = LottoRound.objects.create(round=2)
+        performance = draw.save_sales_performance(current, 11, {1: 1, 2: 0, 3: 0, 4: 0, 5: 0})
+        self.assertEqual(performance.carryover_in, 2)
+        self.assertEqual(
+            performance.prize_pool + performance.carryover_in,
+            performance.total_payout + performance.carryover_out,
+        )
+
+
+class UserStatsTests(TestCase):
+    """구매/추첨 때마다 갱신한 사용자 누적 통계가 전체 재계산(rebuild_user_stats) 결과와 같은지 확인합니다."""
+
+    FIELDS = ('user_id', 'tickets', 'spend', 'rank1_wins', 'rank2_wins', 'rank3_wins', 'rank4_wins', 'rank5_wins',
+              'prize_won')
+
+    def snapshot(self):
+        return list(UserStats.objects.order_by('user_id').values_list(*self.FIELDS))
+
+    def test_incremental_stats_match_rebuild(self):
+        users = [User.objects.create_user(f'buyer{index}') for index in range(5)]
+        for round_number in (1, 2, 3):
+            lotto_round = LottoRound.objects.create(round=round_number)
+            for index, user in enumerate(users):
+                purchase_tickets(user, lotto_round, auto_count=40 + index)
+            purchase_tickets(users[0], lotto_round, manual_rows=sample_tickets(count=0))
+            if round_number < 3:
+                # 3회차는 추첨 전이므로 구매 장수만 반영됩니다.
+                draw.finalize_round(lotto_round)
+
+        incremental = self.snapshot()
+        self.assertEqual(len(incremental), len(users))
+        self.assertTrue(any(row[-1] for row in incremental))
+
+        self.assertEqual(rebuild_user_stats(), len(users))
+        self.assertEqual(self.snapshot(), incremental)
+
+
+@override_settings(LOTTO_EXPORT_CHUNK_SIZE=7)
+class ExportTests(TestCase):
+    """회차 내보내기가 청크 크기보다 많은 구매를 빠짐없이, 한 번씩만 내보내는지 확인합니다."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.admin)
+        self.lotto_round = create_drawn_round(round_number=1)
+        create_purchases(self.admin, self.lotto_round, sample_tickets(count=43))
+        create_purchases(self.admin, LottoRound.objects.create(round=2), sample_tickets(count=5, seed=1))
+        self.expected = {
+            purchase.pk: purchase.get_purchased_numbers()
+            for purchase in Purchase.objects.filter(round=self.lotto_round)
+        }
+
+    def download(self, export_format, **params):
+        response = self.client.get(
+            reverse('export_round_purchases', args=[self.lotto_round.round]), {'format': export_format, **params},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_stream_reads_in_chunks(self):
+        chunks = []
+        pieces = list(export.stream_round_export(self.lotto_round, 'ndjson', on_chunk=chunks.append))
+        self.assertEqual(chunks, [7] * 7 + [1])
+        self.assertEqual(len(pieces), len(chunks))
+
+    def test_csv_export(self):
+        content = self.download('csv')
+        self.assertTrue(content.startswith('\ufeff'.encode('utf-8')))
+        rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+        self.assertEqual(rows[0], export.COLUMNS)
+        exported = [int(row[0]) for row in rows[1:]]
+        self.assertEqual(sorted(exported), sorted(self.expected))
+        for row in rows[1:]:
+            self.assertEqual([int(number) for number in row[4:10]], self.expected[int(row[0])])
+
+        self.assertEqual(gzip.decompress(self.download('csv', gzip='1')), content)
+
+    def test_ndjson_export(self):
+        records = [json.loads(line) for line in self.download('ndjson').decode('utf-8').splitlines()]
+        self.assertEqual(sorted(record['id'] for record in records), sorted(self.expected))
+        for record in records:
+            self.assertEqual(list(record), export.COLUMNS)
+            self.assertEqual(record['round'], self.lotto_round.round)
+            self.assertEqual([record[f'num{index}'] for index in range(1, 7)], self.expected[record['id']])
+
+
+class HistoryImportTests(TestCase):
+    """추첨 이력 불러오기가 잘못된 행과 이 서비스가 다루는 회차를 거부하고, 같은 파일을 다시 불러와도 결과가 같은지 확인합니다."""
+
+    def history_row(self, round_number, numbers=(1, 2, 3, 4, 5, 6), bonus=7, **extra):
+        row = {'round': round_number, **{f'num{i}': n for i, n in enumerate(numbers, start=1)}, 'bonus_number': bonus}
+        row.update(extra)
+        return row
+
+    def import_rows(self, rows, **kwargs):
+        return import_draw_history(enumerate(rows, start=1), **kwargs)
+
+    def rejected_lines(self, result):
+        return {line: reason for line, _, reason in result['rejects']}
+
+    def test_rejects_malformed_rows(self):
+        rows = [
+            self.history_row(1),
+            {'round': 2, 'num1': 1},  # 번호 누락
+            self.history_row(3, numbers=(1, 2, 3, 4, 5, 46)),  # 범위 밖
+            self.history_row(4, numbers=(1, 1, 3, 4, 5, 6)),  # 당첨 번호 중복
+            self.history_row(5, bonus=6),  # 보너스 번호 중복
+            self.history_row('x'),  # 정수가 아닌 회차
+            self.history_row(7, draw_date='2020-13-40'),  # 잘못된 날짜
+            self.history_row(8, total_sales=-1),  # 음수 판매 실적
+        ]
+        result = self.import_rows(rows)
+        self.assertEqual(sorted(self.rejected_lines(result)), [2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual(list(LottoRound.objects.values_list('round', flat=True)), [1])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'history.jsonl')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self.history_row(9)) + '\n{"round": 10,\n' + json.dumps(self.history_row(11)) + '\n')
+            result = import_draw_history(read_records(path))
+        self.assertEqual(list(self.rejected_lines(result)), [2])
+        self.assertEqual(result['imported'], 2)
+
+    def test_rejects_duplicate_rounds_in_file(self):
+        result = self.import_rows([self.history_row(1), self.history_row(2), self.history_row(1, numbers=(7, 8, 9, 10, 11, 12))])
+        self.assertEqual(list(self.rejected_lines(result)), [3])
+        self.assertEqual(LottoRound.objects.get(round=1).get_winning_numbers(), [1, 2, 3, 4, 5, 6])
+
+    def test_refuses_rounds_used_by_the_service(self):
+        user = User.objects.create_user('buyer')
+        sold = create_drawn_round(round_number=1)
+        create_purchases(user, sold, sample_tickets(count=3))
+        drawing = create_drawn_round(round_number=2)
+        DrawRun.objects.create(round=drawing)
+        counted = create_drawn_round(round_number=3)
+        RoundSalesCounter.objects.create(round=counted, shard=0)
+        LottoRound.objects.create(round=6)  # 판매 중인 회차
+
+        rows = [self.history_row(number, numbers=(40, 41, 42, 43, 44, 45), bonus=1) for number in (1, 2, 3, 4, 6, 7)]
+        result = self.import_rows(rows)
+        self.assertEqual(sorted(self.rejected_lines(result)), [1, 2, 3, 5, 6])
+        self.assertEqual(result['imported'], 1)
+        for number in (1, 2, 3):
+            self.assertEqual(LottoRound.objects.get(round=number).get_winning_numbers(), WINNING_NUMBERS)
+        self.assertEqual(LottoRound.objects.get(round=4).get_winning_numbers(), [40, 41, 42, 43, 44, 45])
+        self.assertEqual(LottoRound.objects.get(round=6).get_winning_numbers(), [])
+        self.assertFalse(LottoRound.objects.filter(round=7).exists())
+
+    def test_reimport_is_idempotent(self):
+        rows = [
+            self.history_row(1, draw_date='2020-01-04', total_sales=1000, rank1_winners=2),
+            self.history_row(2, numbers=(10, 20, 30, 40, 41, 42), bonus=1),
+        ]
+
+        def snapshot():
+            return (
+                list(LottoRound.objects.order_by('round').values_list(
+                    'round', 'actual_draw_date', 'num1', 'num6', 'bonus_number', 'winning_mask', 'combination',
+                )),
+                list(SalesPerformance.objects.values_list('round__round', 'total_sales', 'rank1_winners')),
+            )
+
+        first = self.import_rows(rows)
+        state = snapshot()
+        second = self.import_rows(rows)
+        self.assertEqual((first['created'], first['updated'], first['sales']), (2, 0, 1))
+        self.assertEqual((second['created'], second['updated'], second['sales']), (0, 2, 1))
+        self.assertEqual(snapshot(), state)
+        self.assertEqual(LottoRound.objects.count(), 2)
+
+
+class WhatIfTests(TestCase):
+    """만약에 당첨 확인(rank_matrix)이 회차마다 determine_lotto_rank로 판정한 결과와 같은지 확인합니다."""
+
+    def setUp(self):
+        patcher = mock.patch.object(what_if, '_history', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        create_drawn_round(round_number=1)
+        rng = random.Random(2)
+        for round_number in range(2, 31):
+            numbers = rng.sample(range(1, 46), 7)
+            LottoRound.objects.create(
+                round=round_number,
+                **{f'num{index}': number for index, number in enumerate(numbers[:6], start=1)},
+                bonus_number=numbers[6],
+            )
+        LottoRound.objects.create(round=31)  # 판매 중인 회차는 비교하지 않습니다.
+
+    def expected_ranks(self, numbers):
+        return {
+            lotto_round.round: determine_lotto_rank(numbers, lotto_round.get_winning_numbers(), lotto_round.bonus_number)
+            for lotto_round in LottoRound.objects.filter(num1__isnull=False)
+        }
+
+    def test_histogram_matches_per_round_rank(self):
+        tickets = sample_tickets(count=5)
+        result = what_if.check_tickets(tickets, win_rank_limit=5)
+        self.assertEqual((result['rounds'], result['first_round'], result['last_round']), (30, 1, 30))
+
+        totals = {rank: 0 for rank in what_if.RANKS}
+        for numbers, ticket in zip(tickets, result['tickets']):
+            ranks = self.expected_ranks(numbers)
+            histogram = {rank: list(ranks.values()).count(rank) for rank in what_if.RANKS}
+            self.assertEqual(ticket['histogram'], histogram, numbers)
+            self.assertEqual(sorted(ticket['wins']), sorted((number, rank) for number, rank in ranks.items() if rank))
+            self.assertEqual(ticket['best_rank'], min([rank for rank in ranks.values() if rank], default=0))
+            for rank, count in histogram.items():
+                totals[rank] += count
+        self.assertEqual(result['totals'], totals)
+        self.assertEqual(result['tickets'][0]['best_rank'], 1)
+
+    def test_history_reloads_after_version_bump(self):
+        self.assertEqual(len(what_if.get_history()['rounds']), 30)
+        # update()는 신호를 보내지 않으므로 버전을 올리기 전까지는 메모리의 이력을 그대로 씁니다.
+        LottoRound.objects.filter(round=31).update(
+            **{f'num{index}': number for index, number in enumerate(WINNING_NUMBERS, start=1)},
+            bonus_number=BONUS_NUMBER,
+            winning_mask=numbers_to_mask(WINNING_NUMBERS),
+        )
+        self.assertEqual(len(what_if.get_history()['rounds']), 30)
+        invalidate_round_state()
+        history = what_if.get_history()
+        self.assertEqual(history['rounds'].tolist(), list(range(1, 32)))
+        self.assertEqual(what_if.check_tickets([WINNING_NUMBERS])['tickets'][0]['histogram'][1], 2)
+
+
+class SimulationTests(SimpleTestCase):
+    """추첨 시뮬레이션의 등수별 당첨자 수가 티켓을 하나씩 판정해 센 결과와 같은지 확인합니다."""
+
+    def setUp(self):
+        # 같은 조합을 여러 장 산 경우도 세도록 앞의 티켓 몇 장을 한 번 더 넣습니다.
+        self.tickets = sample_tickets(count=300, seed=3)
+        self.tickets += self.tickets[:20]
+        self.tables = simulation.build_ticket_tables(masks_from_rows(self.tickets))
+
+    def brute_force(self, winning, bonus):
+        counts = np.zeros((len(winning), 5), dtype=np.int64)
+        for draw_index, (numbers, bonus_number) in enumerate(zip(winning.tolist(), bonus.tolist())):
+            for ticket in self.tickets:
+                rank = determine_lotto_rank(ticket, numbers, bonus_number)
+                if rank:
+                    counts[draw_index, rank - 1] += 1
+        return counts
+
+    def test_count_winners_matches_brute_force(self):
+        winning, bonus = simulation.random_draws(np.random.default_rng(7), 40)
+        # 설계된 티켓이 1~5등에 모두 당첨되는 추첨도 함께 확인합니다.
+        winning = np.vstack([winning, [WINNING_NUMBERS]])
+        bonus = np.append(bonus, BONUS_NUMBER)
+        counts = simulation.count_winners(self.tables, winning, bonus)
+        self.assertTrue(np.all(counts[-1] >= 1))
+        np.testing.assert_array_equal(counts, self.brute_force(winning, bonus))
+
+    def test_seeded_simulation_matches_brute_force(self):
+        winners = simulation.simulate_draws(self.tables, 30, seed=11, batch_size=12)
+        np.testing.assert_array_equal(winners, simulation.simulate_draws(self.tables, 30, seed=11, batch_size=12))
+
+        # simulate_draws와 같은 방식으로 배치별 시드를 나누어 같은 추첨을 다시 뽑습니다.
+        draws = [
+            simulation.random_draws(np.random.default_rng(batch_seed), size)
+            for batch_seed, size in zip(np.random.SeedSequence(11).spawn(3), [12, 12, 6])
+        ]
+        winning = np.vstack([numbers for numbers, _ in draws])
+        bonus = np.concatenate([bonus for _, bonus in draws])
+        np.testing.assert_array_equal(winners, self.brute_force(winning, bonus))
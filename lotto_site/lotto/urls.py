@@ -1,16 +1,27 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# settings.LOTTO_ASYNC_VIEWS = True이면 메인/구매/당첨 확인을 비동기 뷰(ASGI용)로 연결합니다.
+user_views = async_views if getattr(settings, 'LOTTO_ASYNC_VIEWS', False) else views
 
 urlpatterns = [
     # --------------------------------------------------------
     # 사용자 기능
     # --------------------------------------------------------
     # 메인 페이지
-    path('', views.lotto_home, name='lotto_home'), 
+    path('', user_views.lotto_home, name='lotto_home'), 
     # 로또 구매 페이지
-    path('purchase/', views.lotto_purchase, name='lotto_purchase'),
+    path('purchase/', user_views.lotto_purchase, name='lotto_purchase'),
+    # 여러 장 한 번에 구매 (폼 / JSON API) 및 영수증
+    path('purchase/bulk/', views.lotto_bulk_purchase, name='lotto_bulk_purchase'),
+    path('purchase/receipt/', views.purchase_receipt, name='purchase_receipt'),
+    path('api/purchase/bulk/', views.lotto_bulk_purchase_api, name='lotto_bulk_purchase_api'),
     # 당첨 확인 페이지
-    path('winnings/', views.check_winnings, name='check_winnings'),
+    path('winnings/', user_views.check_winnings, name='check_winnings'),
+    # 지난 모든 회차에 번호를 대입해 보는 "만약에" 당첨 확인 (페이지 / JSON API)
+    path('what-if/', views.what_if_check, name='what_if'),
+    path('api/what-if/', views.what_if_api, name='what_if_api'),
     path('signup/', views.SignUpView.as_view(), name='signup'),
     # --------------------------------------------------------
     # 관리자 기능 (로또 시스템 흐름을 따름)
@@ -25,5 +36,15 @@ urlpatterns = [
     # 2. 현재 회차 추첨 및 마감 (당첨 번호 확정)
     # 뷰 이름: finalize_lotto_round 신규 추가
     path('admin_panel/finalize_round/', views.finalize_lotto_round, name='finalize_lotto_round'), 
+    # 추첨 작업 진행 상황 조회 (대시보드에서 주기적으로 호출)
+    path('admin_panel/draw_status/', views.draw_run_status, name='draw_run_status'),
+    # 번호 부분집합 검색 API (관리자 전용)
+    path('admin_panel/search/', views.purchase_search, name='purchase_search'),
+    # 요청 계측 통계 (관리자 전용)
+    path('admin_panel/metrics/', views.request_metrics, name='request_metrics'),
+    # 회차별 구매/당첨 결과 내보내기 (CSV/NDJSON 스트리밍, 관리자 전용)
+    path('admin_panel/export/<int:round_number>/', views.export_round_purchases, name='export_round_purchases'),
+    # 추첨 전 당첨자 수 몬테카를로 시뮬레이션 (관리자 전용)
+    path('admin_panel/simulate/', views.draw_simulation, name='draw_simulation'),
     
 ]
\ No newline at end of file
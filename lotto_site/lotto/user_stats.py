@@ -0,0 +1,129 @@
+# lotto/user_stats.py
+"""
+사용자별 누적 통계(UserStats)를 갱신하는 모듈.
+
+  - 구매 저장 시      : record_purchases()가 구매 장수/금액을 F() 식으로 더합니다. (구매와 같은 트랜잭션)
+  - 추첨 완료 시      : apply_round_results()가 회차 당첨 구매만 (round, rank) 인덱스로 읽어 사용자별로 모은 뒤
+                        증가분이 같은 사용자끼리 묶어 F() 식 UPDATE로 당첨 장수/당첨금을 더합니다.
+                        (낙첨 구매는 당첨 통계를 바꾸지 않으므로 읽지 않습니다)
+  - 전체 재계산       : rebuild_user_stats()가 구매 테이블을 한 번 집계하여 표를 다시 만듭니다.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Case, Count, F, Q, Sum, Value, When
+from django.utils import timezone
+
+from .models import TICKET_PRICE, Purchase, UserStats
+
+WIN_FIELDS = ('rank1_wins', 'rank2_wins', 'rank3_wins', 'rank4_wins', 'rank5_wins', 'prize_won')
+
+# 재계산 시 한 번에 INSERT하는 행 수
+REBUILD_BATCH_SIZE = 5000
+
+
+def get_user_stats(user):
+    """사용자의 누적 통계를 기본 키 조회 한 번으로 가져옵니다. 구매 기록이 없으면 None을 반환합니다."""
+    return UserStats.objects.filter(user_id=user.pk).first()
+
+
+async def aget_user_stats(user):
+    """get_user_stats()의 비동기 버전"""
+    return await UserStats.objects.filter(user_id=user.pk).afirst()
+
+
+def record_purchases(user_id, tickets):
+    """사용자의 누적 구매 장수와 금액을 더합니다. 구매를 저장하는 트랜잭션 안에서 호출해야 합니다."""
+    increments = {
+        'tickets': F('tickets') + tickets,
+        'spend': F('spend') + tickets * TICKET_PRICE,
+    }
+    stats = UserStats.objects.filter(user_id=user_id)
+    if stats.update(**increments):
+        return
+
+    # 첫 구매라면 행을 만듭니다.
+    try:
+        with transaction.atomic():
+            UserStats.objects.create(user_id=user_id, tickets=tickets, spend=tickets * TICKET_PRICE)
+    except IntegrityError:
+        # 다른 요청이 같은 사용자 행을 먼저 만든 경우
+        stats.update(**increments)
+
+
+def apply_round_results(lotto_round, performance):
+    """
+    추첨이 끝난 회차의 당첨 결과를 사용자별 누적 통계에 더합니다.
+    추첨 작업의 완료 처리와 같은 트랜잭션에서 호출해야 재실행 시 중복 반영되지 않습니다.
+
+    :param performance: 회차의 SalesPerformance (등수별 1인당 당첨금)
+    :return: 갱신한 사용자 수
+    """
+    prizes = {rank: getattr(performance, f'rank{rank}_prize') for rank in range(1, 6)}
+    winners = (
+        Purchase.objects.filter(round=lotto_round, rank__gte=1)
+        .values('user_id', 'rank')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    deltas = {}
+    for row in winners:
+        delta = deltas.setdefault(row['user_id'], dict.fromkeys(WIN_FIELDS, 0))
+        delta[f"rank{row['rank']}_wins"] += row['count']
+        delta['prize_won'] += row['count'] * prizes[row['rank']]
+    if not deltas:
+        return 0
+
+    # 통계 행이 없는 사용자는 빈 행을 먼저 만들고, 모든 사용자에게 같은 방식으로 증가분을 더합니다.
+    UserStats.objects.bulk_create([UserStats(user_id=user_id) for user_id in deltas], ignore_conflicts=True)
+
+    # 대부분의 당첨자는 증가분이 같으므로(예: 5등 1장) 같은 증가분끼리 UPDATE 한 번으로 처리합니다.
+    # 읽은 값을 덮어쓰지 않고 F() 식으로 더하므로, 동시에 진행되는 다른 갱신과 충돌하지 않습니다.
+    users_by_delta = {}
+    for user_id, delta in deltas.items():
+        users_by_delta.setdefault(tuple(delta[field] for field in WIN_FIELDS), []).append(user_id)
+    now = timezone.now()
+    for values, user_ids in users_by_delta.items():
+        UserStats.objects.filter(user_id__in=user_ids).update(
+            updated_at=now,
+            **{field: F(field) + value for field, value in zip(WIN_FIELDS, values) if value},
+        )
+    return len(deltas)
+
+
+def rebuild_user_stats():
+    """
+    구매 테이블 전체를 사용자별로 한 번 집계하여 누적 통계 표를 처음부터 다시 만듭니다.
+    당첨금은 각 구매 회차의 SalesPerformance 1인당 당첨금을 JOIN하여 합산합니다.
+    판매 실적이 저장되지 않은(추첨 작업이 끝나지 않은) 회차의 등수는 완료 시 apply_round_results()가 더하므로 세지 않습니다.
+
+    :return: 만든 통계 행 수
+    """
+    prize = Case(
+        *[When(rank=rank, then=F(f'round__salesperformance__rank{rank}_prize')) for rank in range(1, 6)],
+        default=Value(0),
+        output_field=BigIntegerField(),
+    )
+    settled = Q(round__salesperformance__isnull=False)
+    aggregates = (
+        Purchase.objects.values('user_id')
+        .annotate(
+            ticket_count=Count('id'),
+            **{f'rank{rank}_count': Count('id', filter=settled & Q(rank=rank)) for rank in range(1, 6)},
+            prize_total=Sum(prize),
+        )
+        .order_by()
+    )
+    # 집계와 교체를 한 트랜잭션에서 수행하여, 집계 후 커밋된 구매/추첨 결과가 사라지지 않게 합니다.
+    with transaction.atomic():
+        rows = [
+            UserStats(
+                user_id=row['user_id'],
+                tickets=row['ticket_count'],
+                spend=row['ticket_count'] * TICKET_PRICE,
+                prize_won=row['prize_total'] or 0,
+                **{f'rank{rank}_wins': row[f'rank{rank}_count'] for rank in range(1, 6)},
+            )
+            for row in aggregates.iterator()
+        ]
+        UserStats.objects.all().delete()
+        UserStats.objects.bulk_create(rows, batch_size=REBUILD_BATCH_SIZE)
+    return len(rows)
@@ -4,17 +4,28 @@ from django.contrib import messages
 from django.db.models import Prefetch
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.utils import timezone # timezone 모듈을 사용하여 현재 시간을 가져옵니다.
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.conf import settings
 from datetime import date, timedelta
-import random
+import json
+import time
 from django.urls import reverse_lazy 
 from django.views.generic.edit import CreateView
 from django.contrib.auth.forms import UserCreationForm 
+from django.contrib.auth.models import User
 
 # 로또 앱 내에서 정의된 모델과 폼, 유틸리티 함수를 import합니다.
-from .models import Purchase, LottoRound, SalesPerformance 
-from .forms import ManualPurchaseForm
-from .utils import determine_lotto_rank 
+from .models import TICKET_PRICE, Purchase, LottoRound, SalesPerformance, DrawRun
+from .forms import BulkPurchaseForm, ManualPurchaseForm, WhatIfForm
+from .draw import start_draw_run, execute_draw_run_in_background, simulate_round
+from .sales import RoundClosedError, ensure_counter_shards, get_round_sales, purchase_tickets
+from .pagination import keyset_page
+from .search import DEFAULT_LIMIT as DEFAULT_SEARCH_LIMIT, MAX_LIMIT as MAX_SEARCH_LIMIT, parse_numbers, search_purchases
+from .user_stats import get_user_stats
+from .instrumentation import instrumentation_enabled, registry as request_metrics_registry, segment
+from .what_if import check_tickets
+from . import simulation
+from . import export, round_cache
 
 # ----------------------------------------------------------------------
 # 헬퍼 함수
@@ -23,20 +34,10 @@ from .utils import determine_lotto_rank
 def get_current_round():
     """
     현재 시점에서 구매 가능한 (가장 최근의) 로또 회차를 반환합니다.
-    (당첨 번호가 아직 확정되지 않은 회차 중 가장 높은 회차)
+    (당첨 번호가 아직 확정되지 않은 회차 중 가장 높은 회차, 없으면 None)
+    회차가 바뀔 때만 무효화되는 캐시에서 읽으므로 보통은 DB 쿼리가 없습니다.
     """
-    try:
-        # num1이 null (추첨 번호가 정해지지 않음)인 회차 중 가장 높은 회차를 찾습니다.
-        current_round = LottoRound.objects.filter(num1__isnull=True).latest('round')
-    except LottoRound.DoesNotExist:
-        # 구매 가능한 회차가 없으면 None 반환
-        return None
-    
-    return current_round
-
-def generate_auto_numbers():
-    """1부터 45 사이의 중복 없는 랜덤한 6개 번호를 생성하고 정렬하여 반환합니다."""
-    return sorted(random.sample(range(1, 46), 6))
+    return round_cache.get_current_round()
 
 # generate_winning_numbers 헬퍼 함수는 finalize_lotto_round 함수 내에서 직접 처리되므로 제거합니다.
 
@@ -57,12 +58,16 @@ def lotto_home(request):
     else:
         message = '로또 서비스를 이용하려면 로그인해 주세요.'
     
-    # ✨ [추가] 가장 최근 추첨 완료된 회차 정보를 가져옵니다.
-    latest_drawn_round = LottoRound.objects.filter(actual_draw_date__isnull=False).order_by('-round').first()
+    # ✨ [추가] 가장 최근 추첨 완료된 회차 정보를 가져옵니다. (회차 상태 캐시)
+    latest_drawn_round = round_cache.get_latest_drawn_round()
+
+    # 누적 통계 표에서 한 행만 읽습니다. (구매 기록 집계 없음)
+    user_stats = get_user_stats(request.user) if request.user.is_authenticated else None
     
     return render(request, 'lotto/index.html', {
         'message': message,
         'latest_drawn_round': latest_drawn_round,
+        'user_stats': user_stats,
     }) 
 
 @login_required
@@ -87,28 +92,24 @@ def lotto_purchase(request):
                     form.cleaned_data['p_num4'], form.cleaned_data['p_num5'], form.cleaned_data['p_num6']
                 ])
 
-                Purchase.objects.create(
-                    user=request.user,
-                    round=current_round,
-                    lotto_type='M', # Manual
-                    p_num1=sorted_numbers[0], p_num2=sorted_numbers[1], p_num3=sorted_numbers[2],
-                    p_num4=sorted_numbers[3], p_num5=sorted_numbers[4], p_num6=sorted_numbers[5],
-                )
+                # 구매 기록과 판매 카운터를 같은 트랜잭션에서 저장합니다. (그룹 커밋 모드에서는 큐를 거침)
+                try:
+                    purchase_tickets(request.user, current_round, manual_rows=[sorted_numbers])
+                except (RoundClosedError, TimeoutError) as error:
+                    messages.error(request, str(error))
+                    return redirect('lotto_purchase')
                 messages.success(request, f"로또 (수동) 구매가 완료되었습니다. 번호: {sorted_numbers}")
                 return redirect('lotto_purchase') # 중복 제출 방지
             
         # 3. 자동 구매 처리
         elif 'auto_purchase' in request.POST:
-            # 6개의 랜덤 번호를 생성합니다.
-            auto_numbers = generate_auto_numbers() 
-            
-            Purchase.objects.create(
-                user=request.user,
-                round=current_round,
-                lotto_type='A', # Auto
-                p_num1=auto_numbers[0], p_num2=auto_numbers[1], p_num3=auto_numbers[2],
-                p_num4=auto_numbers[3], p_num5=auto_numbers[4], p_num6=auto_numbers[5],
-            )
+            # 6개의 랜덤 번호를 생성하여 저장합니다.
+            try:
+                purchase = purchase_tickets(request.user, current_round, auto_count=1)[0]
+            except (RoundClosedError, TimeoutError) as error:
+                messages.error(request, str(error))
+                return redirect('lotto_purchase')
+            auto_numbers = purchase.get_purchased_numbers()
             messages.success(request, f"로또 (자동) 구매가 완료되었습니다. 번호: {auto_numbers}")
             return redirect('lotto_purchase') 
 
@@ -118,52 +119,230 @@ def lotto_purchase(request):
     
     context = {
         'form': form,
+        'bulk_form': BulkPurchaseForm(),
         'current_round': current_round,
     }
     return render(request, 'lotto/purchase.html', context)
 
 
+def _purchase_receipt(purchases, lotto_round):
+    """여러 장 구매 결과를 하나의 영수증(딕셔너리)으로 정리합니다."""
+    auto_count = sum(1 for purchase in purchases if purchase.lotto_type == 'A')
+    return {
+        'round': lotto_round.round,
+        'count': len(purchases),
+        'auto_count': auto_count,
+        'manual_count': len(purchases) - auto_count,
+        'total_price': len(purchases) * TICKET_PRICE,
+        'tickets': [
+            {
+                'id': purchase.pk,
+                'lotto_type': purchase.lotto_type,
+                'numbers': purchase.get_purchased_numbers(),
+            }
+            for purchase in purchases
+        ],
+    }
+
+
 @login_required
-def check_winnings(request):
-    """사용자의 전체 구매 내역을 조회하고 당첨 결과를 판정하는 뷰입니다."""
-    
-    # 구매 기록과 해당 회차 정보를 한 번의 쿼리로 가져옵니다.
-    purchases = Purchase.objects.filter(user=request.user).select_related('round').order_by('-purchase_date')
+def lotto_bulk_purchase(request):
+    """여러 장(자동 N장 + 수동 여러 줄)을 한 번에 구매하는 폼 처리 뷰입니다."""
+    current_round = get_current_round()
+    if not current_round:
+        messages.error(request, "현재 구매 가능한 로또 회차가 없습니다. 관리자에게 문의하세요.")
+        return redirect('lotto_home')
 
-    results = []
-    
-    for purchase in purchases:
-        purchased_numbers = purchase.get_purchased_numbers() 
-        winning_numbers = []
-        bonus_number = None
-        rank = -1 # 초기값: -1 (추첨 대기 중)
-
-        if purchase.round:
-            # LottoRound가 존재하고, 당첨 번호가 확정된 경우에만 판정 시도
-            # ✨ [수정] draw_date 필드 대신 actual_draw_date가 NULL이 아닌지 확인
-            if purchase.round.actual_draw_date is not None:
-                try:
-                    winning_round = purchase.round
-                    winning_numbers = winning_round.get_winning_numbers()
-                    bonus_number = winning_round.bonus_number
-                    
-                    # 3. 당첨 판정 로직 실행
-                    rank = determine_lotto_rank(purchased_numbers, winning_numbers, bonus_number)
-                    
-                except AttributeError:
-                    rank = -2 # 오류 상태 (회차 정보는 있지만 번호 가져오기 오류)
-        
-        results.append({
-            'purchase': purchase,
-            'purchased_numbers': purchased_numbers,
-            'winning_numbers': winning_numbers,
-            'bonus_number': bonus_number,
-            'rank': rank,
+    if request.method != 'POST':
+        return redirect('lotto_purchase')
+
+    bulk_form = BulkPurchaseForm(request.POST)
+    if not bulk_form.is_valid():
+        return render(request, 'lotto/purchase.html', {
+            'form': ManualPurchaseForm(),
+            'bulk_form': bulk_form,
+            'current_round': current_round,
         })
-        
-    context = {
-        'results': results,
+
+    try:
+        purchases = purchase_tickets(
+            request.user,
+            current_round,
+            auto_count=bulk_form.cleaned_data['auto_count'],
+            manual_rows=bulk_form.cleaned_data['manual_numbers'],
+        )
+    except (RoundClosedError, TimeoutError) as error:
+        messages.error(request, str(error))
+        return redirect('lotto_purchase')
+    # 영수증은 세션에 저장하고 리다이렉트하여 새로 고침 시 중복 구매를 방지합니다.
+    request.session['last_receipt'] = _purchase_receipt(purchases, current_round)
+    messages.success(request, f"로또 {len(purchases)}장 구매가 완료되었습니다.")
+    return redirect('purchase_receipt')
+
+
+@login_required
+def purchase_receipt(request):
+    """마지막 다중 구매의 영수증을 보여주는 뷰입니다."""
+    receipt = request.session.get('last_receipt')
+    if not receipt:
+        return redirect('lotto_purchase')
+    return render(request, 'lotto/receipt.html', {'receipt': receipt})
+
+
+@login_required
+def lotto_bulk_purchase_api(request):
+    """
+    여러 장 구매 JSON API입니다.
+    요청 본문: {"auto": 5, "manual": [[1, 2, 3, 4, 5, 6], ...]}
+    응답: 구매 영수증 JSON (실패 시 400과 오류 목록)
+    """
+    if request.method != 'POST':
+        return JsonResponse({'errors': {'__all__': ["POST 요청만 허용됩니다."]}}, status=405)
+
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'errors': {'__all__': ["JSON 형식이 올바르지 않습니다."]}}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'errors': {'__all__': ["JSON 객체를 보내 주세요."]}}, status=400)
+
+    current_round = get_current_round()
+    if not current_round:
+        return JsonResponse({'errors': {'__all__': ["현재 구매 가능한 로또 회차가 없습니다."]}}, status=409)
+
+    bulk_form = BulkPurchaseForm({
+        'auto_count': payload.get('auto', 0),
+        'manual_numbers': payload.get('manual', []),
+    })
+    if not bulk_form.is_valid():
+        return JsonResponse({'errors': bulk_form.errors}, status=400)
+
+    try:
+        purchases = purchase_tickets(
+            request.user,
+            current_round,
+            auto_count=bulk_form.cleaned_data['auto_count'],
+            manual_rows=bulk_form.cleaned_data['manual_numbers'],
+        )
+    except RoundClosedError as error:
+        return JsonResponse({'errors': {'__all__': [str(error)]}}, status=409)
+    except TimeoutError as error:
+        # 그룹 커밋 큐가 밀려 대기 시간 안에 저장하지 못한 경우 (구매는 저장되지 않음)
+        return JsonResponse({'errors': {'__all__': [str(error)]}}, status=503)
+    return JsonResponse(_purchase_receipt(purchases, current_round), status=201)
+
+
+@login_required
+def what_if_check(request):
+    """
+    입력한 번호가 지난 모든 회차에서 몇 등이었을지 보여주는 "만약에" 당첨 확인 페이지입니다.
+    한 줄만 입력하면 당첨된 회차 목록(5등까지)도 함께 보여줍니다.
+    """
+    form = WhatIfForm(request.GET or None)
+    result = None
+    if form.is_valid():
+        tickets = form.cleaned_data['tickets']
+        with segment('what_if'):
+            result = check_tickets(tickets, win_rank_limit=5 if len(tickets) == 1 else 3)
+    return render(request, 'lotto/what_if.html', {
+        'form': form,
+        'result': result,
+    })
+
+
+@login_required
+def what_if_api(request):
+    """
+    "만약에" 당첨 확인 JSON API입니다.
+    GET ?numbers=3,17,22,31,38,44 (numbers를 여러 번 지정 가능) 또는
+    POST {"tickets": [[3, 17, 22, 31, 38, 44], ...]}
+    응답: 티켓별 등수 분포(histogram), 최고 등수(best_rank), 3등 이내 당첨 회차(wins)
+    """
+    if request.method == 'POST':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'errors': {'__all__': ["JSON 형식이 올바르지 않습니다."]}}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({'errors': {'__all__': ["JSON 객체를 보내 주세요."]}}, status=400)
+        tickets = payload.get('tickets', [])
+    else:
+        tickets = '\n'.join(request.GET.getlist('numbers'))
+
+    form = WhatIfForm({'tickets': tickets})
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    started = time.perf_counter()
+    result = check_tickets(form.cleaned_data['tickets'])
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    for ticket in result['tickets']:
+        ticket['wins'] = [{'round': round_number, 'rank': rank} for round_number, rank in ticket['wins']]
+    return JsonResponse(result)
+
+
+WINNINGS_RANK_CHOICES = [('win', '당첨 전체'), ('1', '1등'), ('2', '2등'), ('3', '3등'),
+                         ('4', '4등'), ('5', '5등'), ('0', '낙첨'), ('pending', '추첨 대기')]
+
+
+def filter_winnings(request, user):
+    """
+    당첨 확인 페이지의 구매 쿼리셋을 ?round=와 ?rank= 필터로 만듭니다. (동기/비동기 뷰 공용, DB 조회 없음)
+
+    :return: (쿼리셋, 적용된 회차 필터, 적용된 등수 필터)
+    """
+    # 당첨 등수는 추첨 시점에 저장된 값(rank)을 그대로 읽고, 회차 정보는 같은 쿼리에서 JOIN합니다.
+    purchases = Purchase.objects.history_of(user).select_related('round')
+
+    round_filter = request.GET.get('round', '').strip()
+    if round_filter.isdigit():
+        purchases = purchases.filter(round__round=int(round_filter))
+    else:
+        round_filter = ''
+
+    rank_filter = request.GET.get('rank', '')
+    if rank_filter == 'pending':
+        purchases = purchases.filter(rank__isnull=True)
+    elif rank_filter == 'win':
+        purchases = purchases.filter(rank__gte=1)
+    elif rank_filter in ('0', '1', '2', '3', '4', '5'):
+        purchases = purchases.filter(rank=int(rank_filter))
+    else:
+        rank_filter = ''
+    return purchases, round_filter, rank_filter
+
+
+def winnings_context(request, page, next_cursor, round_filter, rank_filter, user_stats):
+    """당첨 확인 페이지의 템플릿 컨텍스트 (동기/비동기 뷰 공용)"""
+    # 다음 페이지 링크에 현재 필터를 유지합니다.
+    next_query = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['after'] = next_cursor
+        next_query = params.urlencode()
+
+    return {
+        'purchases': page,
+        'round_filter': round_filter,
+        'rank_filter': rank_filter,
+        'rank_choices': WINNINGS_RANK_CHOICES,
+        'is_first_page': not request.GET.get('after'),
+        'next_query': next_query,
+        'user_stats': user_stats,
     }
+
+
+@login_required
+def check_winnings(request):
+    """
+    사용자의 구매 내역과 당첨 결과를 최신순으로 한 페이지씩 보여주는 뷰입니다.
+    ?after=<커서>로 다음 페이지를, ?round=<회차>와 ?rank=<등수|win|pending>으로 필터를 지정합니다.
+    """
+    purchases, round_filter, rank_filter = filter_winnings(request, request.user)
+    page, next_cursor = keyset_page(purchases, request.GET.get('after'))
+    context = winnings_context(
+        request, page, next_cursor, round_filter, rank_filter, get_user_stats(request.user),
+    )
     return render(request, 'lotto/winnings.html', context)
 
 # ----------------------------------------------------------------------
@@ -181,24 +360,29 @@ def admin_dashboard(request):
         latest_round = LottoRound.objects.latest('round')
         next_round_number = latest_round.round + 1
         
-        # 2. 현재 회차의 총 판매 장수 계산
-        current_round_sales_count = Purchase.objects.filter(round=latest_round).count()
+        # 2. 현재 회차의 판매 실적 (COUNT(*) 대신 실시간 판매 카운터 샤드 합계)
+        current_round_sales = get_round_sales(latest_round)
         
     except LottoRound.DoesNotExist:
         latest_round = None
         next_round_number = 1
-        current_round_sales_count = 0 # 회차가 없으면 판매 장수도 0
+        current_round_sales = None # 회차가 없으면 판매 실적도 없음
 
     # 3. 전체 판매 실적 목록
     # SalesPerformance는 LottoRound와 OneToOne 관계이므로, select_related('round')로 LottoRound 정보를 효율적으로 가져옵니다.
     all_sales_performance = SalesPerformance.objects.select_related('round').order_by('-round__round')
 
+    # 4. 가장 최근 추첨 작업 (진행률 표시용)
+    latest_draw_run = DrawRun.objects.select_related('round').order_by('-created_at').first()
+
     context = {
         'latest_round': latest_round,
         'next_round_number': next_round_number,
-        # 현재 회차의 총 판매 장수
-        'current_round_sales_count': current_round_sales_count, 
+        # 현재 회차의 총 판매 장수와 자동/수동 장수, 판매 금액
+        'current_round_sales_count': current_round_sales['tickets'] if current_round_sales else 0, 
+        'current_round_sales': current_round_sales,
         'all_sales_performance': all_sales_performance, 
+        'latest_draw_run': latest_draw_run,
     }
     
     return render(request, 'lotto/admin_dashboard.html', context)
@@ -220,11 +404,13 @@ def create_next_round(request):
             next_round_number = 1
         
         # 새로운 회차를 당첨 번호 및 실제 추첨일 없이 생성
-        LottoRound.objects.create(
+        new_round = LottoRound.objects.create(
             round=next_round_number,
             # ✨ [수정] draw_date 필드에 대한 저장을 제거했습니다.
             # actual_draw_date는 null 상태로 유지됩니다.
         )
+        # 판매 카운터 샤드 행을 미리 만들어 구매 시에는 UPDATE만 수행하도록 합니다.
+        ensure_counter_shards(new_round)
         
         messages.success(request, f"**제 {next_round_number} 회차**가 성공적으로 생성되었으며, 지금부터 구매 가능합니다.")
         return redirect('admin_dashboard')
@@ -234,74 +420,202 @@ def create_next_round(request):
 @user_passes_test(lambda u: u.is_superuser)
 @login_required
 def finalize_lotto_round(request):
+    """
+    현재 회차의 추첨 작업(DrawRun)을 등록하고 요청 밖에서 실행되도록 넘깁니다.
+    진행 상황은 대시보드가 draw_run_status를 주기적으로 조회하여 표시합니다.
+    """
     if request.method == 'POST':
-        try:
-            # 1. 추첨 대상 회차 찾기 (가장 최근에 생성되었지만, 아직 당첨 번호가 없는 회차)
+        # 1. 완료되지 않은 추첨 작업이 있으면 그 작업을 이어서 실행합니다. (실패 후 재시도 포함)
+        unfinished_run = DrawRun.objects.exclude(state=DrawRun.STATE_DONE).select_related('round').order_by('-created_at').first()
+        if unfinished_run is not None:
+            current_round = unfinished_run.round
+        else:
+            # 2. 추첨 대상 회차 찾기 (가장 최근에 생성되었지만, 아직 당첨 번호가 없는 회차)
             current_round = LottoRound.objects.filter(num1__isnull=True).order_by('-round').first()
             if not current_round:
                 messages.error(request, "현재 추첨을 진행할 로또 회차가 없습니다. 먼저 다음 회차를 생성해 주세요.")
                 return redirect('admin_dashboard')
+
+        # 추첨 작업 등록 (이미 등록된 작업이 있으면 그 작업을 사용하며, 실패한 작업은 대기 상태로 되돌림)
+        run, _ = start_draw_run(current_round)
+
+        if run.state == DrawRun.STATE_RUNNING:
+            # 진행 기록이 오래 멈춰 있는 작업(서버 재시작 등으로 중단된 작업)은 이어서 실행합니다.
+            if not run.is_stale:
+                messages.warning(request, f"제 {current_round.round} 회차 추첨 작업이 이미 진행 중입니다.")
+                return redirect('admin_dashboard')
+
+        # 3. 백그라운드 실행 (설정에서 끈 경우 run_draws 명령어/워커가 처리)
+        if getattr(settings, 'LOTTO_DRAW_IN_BACKGROUND', True):
+            execute_draw_run_in_background(run.pk)
+
+        messages.success(request,
+            f"✅ **제 {current_round.round} 회차** 추첨 및 판매 실적 집계 작업이 시작되었습니다. "
+            f"진행 상황은 아래에서 확인할 수 있으며, 완료되면 다음 회차를 생성하여 판매를 시작해 주세요."
+        )
+        return redirect('admin_dashboard')
             
-            round_number = current_round.round
-            
-            # 2. 당첨 번호 생성 및 LottoRound에 저장 (추첨 및 마감)
-            all_numbers = list(range(1, 46))
-            # 7개의 번호를 동시에 뽑아 6개는 당첨, 1개는 보너스로 사용
-            winning_set = set(random.sample(all_numbers, 7)) 
-            
-            winning_numbers = sorted(list(winning_set)[:6])
-            # 보너스 번호는 7개의 뽑힌 번호 중 당첨 번호 6개에 포함되지 않은 것
-            bonus_number = list(winning_set - set(winning_numbers))[0] 
-            
-            current_round.num1, current_round.num2, current_round.num3 = winning_numbers[0], winning_numbers[1], winning_numbers[2]
-            current_round.num4, current_round.num5, current_round.num6 = winning_numbers[3], winning_numbers[4], winning_numbers[5]
-            current_round.bonus_number = bonus_number
-            
-            # ✨ [추가] 실제 추첨이 완료된 시점의 날짜/시간을 기록
-            current_round.actual_draw_date = timezone.now() 
-            current_round.save()
-            
-            # --------------------------------------------------------
-            # 3. 실적 및 당첨자 집계 (자동 실행)
-            # --------------------------------------------------------
-            
-            all_purchases = Purchase.objects.filter(round=current_round)
-            total_sales = all_purchases.count()
-            
-            rank_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-            total_winners = 0
-
-            for purchase in all_purchases:
-                purchased_numbers = purchase.get_purchased_numbers()
-                
-                # utils.py의 당첨 판정 로직 사용
-                rank = determine_lotto_rank(purchased_numbers, winning_numbers, bonus_number)
-                
-                if rank > 0:
-                    if rank in rank_counts:
-                        rank_counts[rank] += 1
-                    total_winners += 1
-                    
-            # 4. SalesPerformance 모델에 저장
-            SalesPerformance.objects.create(
-                round=current_round,
-                total_sales=total_sales,
-                total_winners=total_winners,
-                rank1_winners=rank_counts[1],
-                rank2_winners=rank_counts[2],
-                rank3_winners=rank_counts[3],
+    return redirect('admin_dashboard') # GET 요청 처리
+
+
+@user_passes_test(lambda u: u.is_superuser)
+@login_required
+def draw_run_status(request):
+    """가장 최근 추첨 작업(또는 ?run=<id>로 지정한 작업)의 진행 상황을 JSON으로 반환합니다."""
+    runs = DrawRun.objects.select_related('round').order_by('-created_at')
+    if request.GET.get('run'):
+        try:
+            runs = runs.filter(pk=int(request.GET['run']))
+        except ValueError:
+            return JsonResponse({'error': "작업 번호는 정수여야 합니다."}, status=400)
+    run = runs.first()
+    if run is None:
+        return JsonResponse({'run': None})
+    return JsonResponse({'run': run.to_status_dict()})
+
+
+@user_passes_test(lambda u: u.is_superuser)
+@login_required
+def purchase_search(request):
+    """
+    번호 부분집합으로 구매를 검색하는 JSON API입니다. (고객 지원/부정 사용 조사용)
+    ?numbers=7,13,42 [&round=<회차>] [&user=<아이디>] [&min=<최소 일치 개수>] [&limit=<최대 건수>]
+    min을 생략하면 모든 번호를 포함한 티켓을 찾습니다.
+    """
+    started = time.perf_counter()
+    try:
+        numbers = parse_numbers(request.GET.get('numbers', ''))
+        min_matches = int(request.GET['min']) if request.GET.get('min') else None
+        limit = max(1, min(int(request.GET.get('limit') or DEFAULT_SEARCH_LIMIT), MAX_SEARCH_LIMIT))
+        round_number = int(request.GET['round']) if request.GET.get('round') else None
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    lotto_round = None
+    if round_number is not None:
+        lotto_round = LottoRound.objects.filter(round=round_number).first()
+        if lotto_round is None:
+            return JsonResponse({'error': "해당 회차가 없습니다."}, status=404)
+    user = None
+    if request.GET.get('user'):
+        user = User.objects.filter(username=request.GET['user']).first()
+        if user is None:
+            return JsonResponse({'error': "해당 사용자가 없습니다."}, status=404)
+
+    try:
+        with segment('search'):
+            count, purchases, source = search_purchases(
+                numbers, lotto_round=lotto_round, user=user, min_matches=min_matches, limit=limit,
             )
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    return JsonResponse({
+        'count': count,
+        'source': source,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+        'tickets': [
+            {
+                'id': purchase.pk,
+                'user': purchase.user.username,
+                'round': purchase.round.round if purchase.round else None,
+                'numbers': purchase.get_purchased_numbers(),
+                'rank': purchase.rank,
+                'purchase_date': purchase.purchase_date.isoformat(),
+            }
+            for purchase in purchases
+        ],
+    })
+
+
+@user_passes_test(lambda u: u.is_superuser)
+@login_required
+def request_metrics(request):
+    """
+    요청 계측 미들웨어가 URL 이름별로 모은 최근 요청의 p50/p95/p99를 보여주는 관리자 페이지입니다.
+    ?format=json이면 같은 내용을 JSON으로 반환하고, POST 요청은 통계를 초기화합니다.
+    """
+    if request.method == 'POST':
+        request_metrics_registry.reset()
+        messages.success(request, "요청 통계를 초기화했습니다.")
+        return redirect('request_metrics')
+
+    rows = request_metrics_registry.summary()
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'enabled': instrumentation_enabled(), 'views': rows})
+    return render(request, 'lotto/request_metrics.html', {
+        'enabled': instrumentation_enabled(),
+        'rows': rows,
+        'window': request_metrics_registry.window,
+    })
+
 
-            # 5. 메시지 및 리다이렉션
-            messages.success(request, 
-                f"✅ **제 {round_number} 회차** 추첨 및 판매 실적 집계가 완료되었습니다! "
-                f"추첨 일시: {current_round.actual_draw_date.strftime('%Y-%m-%d %H:%M')}"
-                f"이제 다음 회차를 생성하여 판매를 시작해 주세요."
+@user_passes_test(lambda u: u.is_superuser)
+@login_required
+def export_round_purchases(request, round_number):
+    """
+    회차의 구매/당첨 결과 전체를 내려받는 관리자 전용 뷰입니다.
+    ?format=csv(기본) 또는 ndjson, &gzip=1이면 gzip으로 압축합니다.
+    구매 기록을 청크 단위로 읽어 바로 전송하므로 큰 회차도 메모리 사용량이 일정합니다.
+    """
+    lotto_round = get_object_or_404(LottoRound, round=round_number)
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in export.FORMATS:
+        return JsonResponse({'error': f"지원하지 않는 형식입니다: {export_format}"}, status=400)
+    use_gzip = request.GET.get('gzip') in ('1', 'true')
+
+    response = StreamingHttpResponse(
+        export.stream_round_export(lotto_round, export_format, gzip=use_gzip),
+        content_type='application/gzip' if use_gzip else export.FORMATS[export_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export.export_filename(lotto_round, export_format, use_gzip)}"'
+    )
+    return response
+
+
+@user_passes_test(lambda u: u.is_superuser)
+@login_required
+def draw_simulation(request):
+    """
+    추첨 전에 현재 티켓으로 무작위 추첨을 여러 번 시뮬레이션하여 등수별 당첨자 수 분포를 보여주는 관리자 페이지입니다.
+    ?draws=추첨 횟수&seed=시드&round=회차 (회차를 생략하면 판매 중인 회차), ?format=json이면 JSON으로 반환합니다.
+    """
+    default_draws = getattr(settings, 'LOTTO_SIMULATION_DRAWS', simulation.DEFAULT_DRAWS)
+    max_draws = getattr(settings, 'LOTTO_SIMULATION_MAX_DRAWS', simulation.DEFAULT_DRAWS * 10)
+    as_json = request.GET.get('format') == 'json'
+
+    error = None
+    result = None
+    try:
+        draws = int(request.GET.get('draws') or default_draws)
+        seed = int(request.GET['seed']) if request.GET.get('seed') else None
+        round_number = int(request.GET['round']) if request.GET.get('round') else None
+    except ValueError:
+        draws, seed, round_number = default_draws, None, None
+        error = "추첨 횟수, 시드와 회차는 숫자로 입력해 주세요."
+    lotto_round = get_object_or_404(LottoRound, round=round_number) if round_number is not None else get_current_round()
+    if error is None and not 1 <= draws <= max_draws:
+        error = f"추첨 횟수는 1 이상 {max_draws:,} 이하여야 합니다."
+    if error is None and lotto_round is None:
+        error = "시뮬레이션할 회차가 없습니다. 먼저 다음 회차를 생성해 주세요."
+
+    if error is None:
+        with segment('draw_simulation'):
+            result = simulate_round(
+                lotto_round, draws, seed=seed,
+                workers=getattr(settings, 'LOTTO_SIMULATION_WORKERS', simulation.DEFAULT_WORKERS),
             )
-            return redirect('admin_dashboard')
-            
-        except Exception as e:
-            messages.error(request, f"추첨 및 실적 집계 중 오류가 발생했습니다: {e}")
-            return redirect('admin_dashboard')
-            
-    return redirect('admin_dashboard') # GET 요청 처리
\ No newline at end of file
+
+    if as_json:
+        if error:
+            return JsonResponse({'error': error}, status=400)
+        return JsonResponse(result)
+    return render(request, 'lotto/draw_simulation.html', {
+        'lotto_round': lotto_round,
+        'draws': draws,
+        'seed': seed,
+        'max_draws': max_draws,
+        'error': error,
+        'result': result,
+    })
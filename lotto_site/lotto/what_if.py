@@ -0,0 +1,120 @@
+# lotto/what_if.py
+"""
+임의의 번호 조합이 지난 모든 회차에서 몇 등이었을지 확인하는 "만약에" 당첨 확인 모듈.
+
+추첨이 끝난 회차의 당첨 마스크와 보너스 번호를 프로세스 메모리에 배열로 보관하고,
+티켓 여러 장을 전체 회차와 rank_engine.rank_matrix 한 번의 벡터 연산으로 비교합니다.
+배열은 회차 상태 캐시 버전(round_cache.get_state_version)과 함께 보관하므로,
+추첨 완료나 이력 불러오기로 버전이 바뀌면 다음 요청에서 DB를 다시 읽습니다.
+버전은 프로세스별 캐시에 있어 다른 프로세스의 변경을 알 수 없으므로, 회차 캐시 유효 시간
+(LOTTO_ROUND_CACHE_TIMEOUT)이 지난 배열도 다시 읽습니다.
+"""
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .models import LottoRound
+from .rank_engine import masks_from_rows, rank_matrix
+from .round_cache import DEFAULT_TIMEOUT, get_state_version
+
+# 한 번에 확인할 수 있는 최대 티켓 수 (settings.LOTTO_WHAT_IF_MAX_TICKETS로 변경 가능)
+DEFAULT_MAX_TICKETS = 5000
+
+# 한 번의 벡터 연산에서 다루는 티켓 수. (티켓 수 x 회차 수) 중간 배열의 크기를 제한합니다.
+BLOCK_SIZE = 512
+
+RANKS = [1, 2, 3, 4, 5, 0]
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_max_tickets():
+    return getattr(settings, 'LOTTO_WHAT_IF_MAX_TICKETS', DEFAULT_MAX_TICKETS)
+
+
+def load_history():
+    """추첨이 끝난 회차를 회차 순서대로 읽어 회차 번호, 당첨 마스크, 보너스 번호 배열로 반환합니다."""
+    rows = list(
+        LottoRound.objects.filter(winning_mask__isnull=False, bonus_number__isnull=False)
+        .order_by('round')
+        .values_list('round', 'winning_mask', 'bonus_number')
+    )
+    columns = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    return {
+        'rounds': columns[:, 0],
+        'winning_masks': columns[:, 1].astype(np.uint64),
+        'bonus_numbers': columns[:, 2],
+    }
+
+
+def _is_fresh(history, version):
+    if history is None or history['version'] != version:
+        return False
+    timeout = getattr(settings, 'LOTTO_ROUND_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+    return time.monotonic() - history['loaded_at'] < timeout
+
+
+def get_history():
+    """
+    메모리에 보관한 당첨 이력 배열을 반환합니다.
+    회차 상태 버전이 바뀌었거나 회차 캐시 유효 시간이 지났으면 다시 읽습니다.
+    """
+    global _history
+    version = get_state_version()
+    history = _history
+    if not _is_fresh(history, version):
+        with _history_lock:
+            if not _is_fresh(_history, version):
+                _history = dict(load_history(), version=version, loaded_at=time.monotonic())
+            history = _history
+    return history
+
+
+def check_tickets(rows, win_rank_limit=3, history=None):
+    """
+    티켓들을 지난 모든 회차와 비교합니다.
+
+    :param rows: 번호 6개로 이루어진 행 목록
+    :param win_rank_limit: 이 등수 이내로 당첨된 회차는 목록(wins)으로도 돌려줌
+    :return: {'rounds': 비교한 회차 수, 'first_round', 'last_round',
+              'tickets': [{'numbers', 'histogram': {등수: 회차 수}, 'best_rank', 'wins': [(회차, 등수), ...]}],
+              'totals': 전체 티켓의 {등수: 횟수}}
+             best_rank는 한 번도 당첨되지 않았으면 0
+    """
+    history = history or get_history()
+    rounds = history['rounds']
+    rows = [sorted(row) for row in rows]
+    masks = masks_from_rows(rows) if rows else np.zeros(0, dtype=np.uint64)
+
+    histograms = np.zeros((len(rows), 6), dtype=np.int64)
+    wins = [[] for _ in rows]
+    for start in range(0, len(rows), BLOCK_SIZE):
+        ranks = rank_matrix(masks[start:start + BLOCK_SIZE], history['winning_masks'], history['bonus_numbers'])
+        # 티켓마다 등수 값에 (티켓 위치 * 6)을 더해 bincount 한 번으로 티켓별 등수 분포를 셉니다.
+        offsets = np.arange(len(ranks), dtype=np.intp)[:, np.newaxis] * 6
+        histograms[start:start + len(ranks)] = np.bincount(
+            (ranks + offsets).ravel(), minlength=len(ranks) * 6,
+        ).reshape(-1, 6)
+        for ticket, column in zip(*np.nonzero((ranks > 0) & (ranks <= win_rank_limit))):
+            wins[start + ticket].append((int(rounds[column]), int(ranks[ticket, column])))
+
+    tickets = []
+    for numbers, histogram, ticket_wins in zip(rows, histograms, wins):
+        won = [rank for rank in range(1, 6) if histogram[rank]]
+        tickets.append({
+            'numbers': numbers,
+            'histogram': {rank: int(histogram[rank]) for rank in RANKS},
+            'best_rank': won[0] if won else 0,
+            'wins': sorted(ticket_wins, key=lambda win: (win[1], -win[0])),
+        })
+    totals = histograms.sum(axis=0)
+    return {
+        'rounds': len(rounds),
+        'first_round': int(rounds[0]) if len(rounds) else None,
+        'last_round': int(rounds[-1]) if len(rounds) else None,
+        'tickets': tickets,
+        'totals': {rank: int(totals[rank]) for rank in RANKS},
+    }
@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 요청 계측 (LOTTO_INSTRUMENTATION = False이면 체인에서 빠짐). 전체 시간을 재기 위해 맨 앞에 둡니다.
+    'lotto.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,6 +79,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # 쓰기 트랜잭션이 처음부터 쓰기 잠금을 잡도록 하여, 읽기 후 쓰기로 전환할 때
+            # busy_timeout을 기다리지 않고 바로 "database is locked"가 나는 문제를 막습니다.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -129,4 +136,84 @@ LOGIN_REDIRECT_URL = 'lotto_purchase'
 # **[추가/수정된 부분]** 로그아웃 성공 후 이동할 URL
 # 로그아웃 후 관리자 로그인 페이지로 가는 문제를 해결합니다.
 # 장고 기본 로그인 뷰의 URL인 '/accounts/login/'으로 설정합니다.
-LOGOUT_REDIRECT_URL = '/accounts/login/'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = '/accounts/login/'
+
+# 로또 추첨 작업 설정
+# 추첨 버튼을 누르면 웹 프로세스의 백그라운드 스레드에서 추첨 작업을 실행합니다.
+# False로 설정하면 작업만 등록되고, `python manage.py run_draws --watch` 워커가 처리합니다.
+LOTTO_DRAW_IN_BACKGROUND = True
+# 한 번에 판정/저장하는 구매 장수
+LOTTO_FINALIZE_CHUNK_SIZE = 5000
+# 진행 기록이 이 시간(초) 이상 없으면 중단된 작업으로 보고 다시 실행할 수 있습니다.
+LOTTO_DRAW_STALE_AFTER = 300
+# 추첨 작업 프로파일링 (lotto/draw_profile.py)
+# 단계별 시간/처리 행 수/최대 RSS는 항상 DrawRun.profile에 기록됩니다.
+# True로 설정하면 작업마다 cProfile 결과와 tracemalloc 스냅숏도 LOTTO_DRAW_PROFILE_DIR에 저장합니다. (작업이 느려짐)
+LOTTO_DRAW_PROFILE = False
+LOTTO_DRAW_PROFILE_DIR = BASE_DIR / 'draw_profiles'
+
+# 구매 그룹 커밋 설정
+# True로 설정하면 구매 요청을 프로세스 내부 큐에 모아 쓰기 스레드가 한 트랜잭션으로 저장합니다.
+# (SQLite에서 구매가 몰릴 때 "database is locked" 오류를 줄입니다.)
+LOTTO_GROUP_COMMIT = False
+# 한 번에 커밋할 최대 구매 장수
+LOTTO_GROUP_COMMIT_MAX_BATCH = 500
+# 첫 요청 이후 다른 요청을 더 모으는 최대 대기 시간(초)
+LOTTO_GROUP_COMMIT_MAX_DELAY = 0.005
+# 요청이 저장을 기다리는 최대 시간(초). 넘으면 구매를 취소하고 오류를 알립니다.
+LOTTO_GROUP_COMMIT_TIMEOUT = 30
+
+# SQLite 연결 튜닝 설정 (lotto/db.py)
+# 연결마다 아래 PRAGMA를 적용합니다. False로 설정하면 SQLite 기본값을 그대로 사용합니다.
+LOTTO_SQLITE_TUNING = True
+# WAL 모드: 읽기와 쓰기가 서로를 막지 않습니다.
+LOTTO_SQLITE_JOURNAL_MODE = 'WAL'
+# 저널 모드는 DB 파일에 기록되므로 서버 실행과 아래 관리 명령어에서만 바꿉니다. (migrate 등은 파일을 그대로 둠)
+LOTTO_SQLITE_JOURNAL_MODE_COMMANDS = ('runserver',)
+# WAL 모드에서는 NORMAL로도 커밋된 데이터가 손상되지 않습니다. (정전 시 마지막 커밋만 유실 가능)
+LOTTO_SQLITE_SYNCHRONOUS = 'NORMAL'
+# 잠금을 만났을 때 기다리는 최대 시간(ms)
+LOTTO_SQLITE_BUSY_TIMEOUT = 5000
+# 메모리 매핑 크기(바이트)
+LOTTO_SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+# 페이지 캐시 크기 (음수는 KiB 단위, -64000은 약 64MB)
+LOTTO_SQLITE_CACHE_SIZE = -64000
+
+# 캐시 설정
+# 회차 상태 캐시(lotto/round_cache.py)는 캐시에 저장된 버전 번호로 무효화됩니다.
+# 워커 프로세스가 여러 개라면 모든 프로세스가 같은 캐시를 보도록 공유 백엔드를 사용하세요.
+#   예) 'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379'
+# 기본값인 LocMemCache는 프로세스별 메모리 캐시이므로 단일 프로세스 개발 서버용 대체재입니다.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'lotto',
+    }
+}
+# False로 설정하면 회차 상태를 매 요청 DB에서 읽습니다.
+LOTTO_ROUND_CACHE = True
+# 무효화 신호를 놓친 경우를 대비한 최대 캐시 유지 시간(초)
+LOTTO_ROUND_CACHE_TIMEOUT = 300
+
+# 요청 계측 설정 (lotto/instrumentation.py)
+# True로 설정하면 요청마다 SQL 개수/시간, 뷰 시간, 템플릿 렌더링 시간을 Server-Timing 헤더로 보내고
+# URL 이름별 p50/p95/p99를 /admin_panel/metrics/에서 보여줍니다.
+LOTTO_INSTRUMENTATION = False
+# URL 이름별로 보관할 최근 요청 수
+LOTTO_INSTRUMENTATION_WINDOW = 1000
+
+# 비동기 뷰 설정 (lotto/async_views.py)
+# ASGI 서버(lotto_site/asgi.py)로 실행할 때 True로 설정하면 메인/구매/당첨 확인 페이지를 비동기 뷰로 처리합니다.
+LOTTO_ASYNC_VIEWS = False
+
+# 회차별 구매/당첨 결과 내보내기(lotto/export.py)에서 DB에서 한 번에 읽는 구매 수
+LOTTO_EXPORT_CHUNK_SIZE = 10_000
+
+# "만약에" 당첨 확인(lotto/what_if.py)에서 한 번에 확인할 수 있는 최대 티켓 수
+LOTTO_WHAT_IF_MAX_TICKETS = 5000
+
+# 추첨 전 당첨자 수 시뮬레이션(lotto/simulation.py)의 기본 추첨 횟수와 관리자 화면에서 허용하는 최대 횟수
+LOTTO_SIMULATION_DRAWS = 100_000
+LOTTO_SIMULATION_MAX_DRAWS = 1_000_000
+# 2 이상이면 추첨 배치를 프로세스 풀에 나누어 실행합니다.
+LOTTO_SIMULATION_WORKERS = 1